@@ -2,19 +2,36 @@
 Validator for tracked changes in Word documents.
 """
 
-import subprocess
-import tempfile
+import hashlib
+import re
 import zipfile
 from pathlib import Path
 
+import lxml.etree
+
+# Give up on a minimal diff beyond this many edits and report a block replacement
+MAX_DIFF_EDITS = 2000
+
+# Fall back from character to word granularity above this many change hunks
+# per 100 characters of paragraph text
+MAX_CHAR_HUNK_DENSITY = 5
+
+# Changed spans longer than this are shown word by word instead of being
+# refined to character level
+MAX_REFINE_CHARS = 200
+
+WORD_PATTERN = re.compile(r"\s+|\w+|[^\w\s]")
+WORD_CHAR = re.compile(r"\w")
+
 
 class RedliningValidator:
     """Validator for tracked changes in Word documents."""
 
-    def __init__(self, unpacked_dir, original_docx, verbose=False):
+    def __init__(self, unpacked_dir, original_docx, verbose=False, author="Claude"):
         self.unpacked_dir = Path(unpacked_dir)
         self.original_docx = Path(original_docx)
         self.verbose = verbose
+        self.author = author
         self.namespaces = {
             "w": "http://schemas.openxmlformats.org/wordprocessingml/2006/main"
         }
@@ -27,94 +44,59 @@ class RedliningValidator:
             print(f"FAILED - Modified document.xml not found at {modified_file}")
             return False
 
-        # First, check if there are any tracked changes by Claude to validate
+        # Stream the modified document once: paragraph hashes with the author's
+        # changes reverted, and whether the author made any tracked changes
         try:
-            import xml.etree.ElementTree as ET
-
-            tree = ET.parse(modified_file)
-            root = tree.getroot()
-
-            # Check for w:del or w:ins tags authored by Claude
-            del_elements = root.findall(".//w:del", self.namespaces)
-            ins_elements = root.findall(".//w:ins", self.namespaces)
-
-            # Filter to only include changes by Claude
-            claude_del_elements = [
-                elem
-                for elem in del_elements
-                if elem.get(f"{{{self.namespaces['w']}}}author") == "Claude"
-            ]
-            claude_ins_elements = [
-                elem
-                for elem in ins_elements
-                if elem.get(f"{{{self.namespaces['w']}}}author") == "Claude"
-            ]
-
-            # Redlining validation is only needed if tracked changes by Claude have been used.
-            if not claude_del_elements and not claude_ins_elements:
-                if self.verbose:
-                    print("PASSED - No tracked changes by Claude found.")
-                return True
-
-        except Exception:
-            # If we can't parse the XML, continue with full validation
-            pass
-
-        # Create temporary directory for unpacking original docx
-        with tempfile.TemporaryDirectory() as temp_dir:
-            temp_path = Path(temp_dir)
-
-            # Unpack original docx
-            try:
-                with zipfile.ZipFile(self.original_docx, "r") as zip_ref:
-                    zip_ref.extractall(temp_path)
-            except Exception as e:
-                print(f"FAILED - Error unpacking original docx: {e}")
-                return False
-
-            original_file = temp_path / "word" / "document.xml"
-            if not original_file.exists():
-                print(
-                    f"FAILED - Original document.xml not found in {self.original_docx}"
-                )
-                return False
-
-            # Parse both XML files using xml.etree.ElementTree for redlining validation
-            try:
-                import xml.etree.ElementTree as ET
-
-                modified_tree = ET.parse(modified_file)
-                modified_root = modified_tree.getroot()
-                original_tree = ET.parse(original_file)
-                original_root = original_tree.getroot()
-            except ET.ParseError as e:
-                print(f"FAILED - Error parsing XML files: {e}")
-                return False
-
-            # Remove Claude's tracked changes from both documents
-            self._remove_claude_tracked_changes(original_root)
-            self._remove_claude_tracked_changes(modified_root)
-
-            # Extract and compare text content
-            modified_text = self._extract_text_content(modified_root)
-            original_text = self._extract_text_content(original_root)
-
-            if modified_text != original_text:
-                # Show detailed character-level differences for each paragraph
-                error_message = self._generate_detailed_diff(
-                    original_text, modified_text
-                )
-                print(error_message)
-                return False
+            modified_hashes, _, has_changes = self._scan_document(modified_file)
+        except lxml.etree.XMLSyntaxError as e:
+            print(f"FAILED - Error parsing XML files: {e}")
+            return False
 
+        # Redlining validation is only needed if the author's tracked changes have been used.
+        if not has_changes:
             if self.verbose:
-                print("PASSED - All changes by Claude are properly tracked")
+                print(f"PASSED - No tracked changes by {self.author} found.")
             return True
 
+        # Stream the original document.xml straight out of the archive
+        try:
+            with zipfile.ZipFile(self.original_docx, "r") as zip_ref:
+                if "word/document.xml" not in zip_ref.namelist():
+                    print(
+                        f"FAILED - Original document.xml not found in {self.original_docx}"
+                    )
+                    return False
+                with zip_ref.open("word/document.xml") as original_file:
+                    original_hashes, _, _ = self._scan_document(original_file)
+        except lxml.etree.XMLSyntaxError as e:
+            print(f"FAILED - Error parsing XML files: {e}")
+            return False
+        except Exception as e:
+            print(f"FAILED - Error reading original docx: {e}")
+            return False
+
+        if modified_hashes != original_hashes:
+            # Only now collect the text, to show character-level differences
+            _, modified_paras, _ = self._scan_document(modified_file, keep_text=True)
+            with zipfile.ZipFile(self.original_docx, "r") as zip_ref:
+                with zip_ref.open("word/document.xml") as original_file:
+                    _, original_paras, _ = self._scan_document(
+                        original_file, keep_text=True
+                    )
+            error_message = self._generate_detailed_diff(
+                "\n".join(original_paras), "\n".join(modified_paras)
+            )
+            print(error_message)
+            return False
+
+        if self.verbose:
+            print(f"PASSED - All changes by {self.author} are properly tracked")
+        return True
+
     def _generate_detailed_diff(self, original_text, modified_text):
-        """Generate detailed word-level differences using git word diff."""
+        """Generate detailed character/word-level differences."""
         error_parts = [
-            "FAILED - Document text doesn't match after removing Claude's tracked changes",
+            f"FAILED - Document text doesn't match after removing {self.author}'s tracked changes",
             "",
             "Likely causes:",
             "  1. Modified text inside another author's <w:ins> or <w:del> tags",
@@ -127,152 +109,303 @@ class RedliningValidator:
             "",
         ]
 
-        # Show git word diff
-        git_diff = self._get_git_word_diff(original_text, modified_text)
-        if git_diff:
-            error_parts.extend(["Differences:", "============", git_diff])
+        word_diff = self._get_word_diff(original_text, modified_text)
+        if word_diff:
+            error_parts.extend(["Differences:", "============", word_diff])
         else:
-            error_parts.append("Unable to generate word diff (git not available)")
+            error_parts.append("Unable to generate word diff")
 
         return "\n".join(error_parts)
 
-    def _get_git_word_diff(self, original_text, modified_text):
-        """Generate word diff using git with character-level precision."""
-        try:
-            with tempfile.TemporaryDirectory() as temp_dir:
-                temp_path = Path(temp_dir)
-
-                # Create two files
-                original_file = temp_path / "original.txt"
-                modified_file = temp_path / "modified.txt"
-
-                original_file.write_text(original_text, encoding="utf-8")
-                modified_file.write_text(modified_text, encoding="utf-8")
-
-                # Try character-level diff first for precise differences
-                result = subprocess.run(
-                    [
-                        "git",
-                        "diff",
-                        "--word-diff=plain",
-                        "--word-diff-regex=.",  # Character-by-character diff
-                        "-U0",  # Zero lines of context - show only changed lines
-                        "--no-index",
-                        str(original_file),
-                        str(modified_file),
-                    ],
-                    capture_output=True,
-                    text=True,
-                )
-
-                if result.stdout.strip():
-                    # Clean up the output - remove git diff header lines
-                    lines = result.stdout.split("\n")
-                    # Skip the header lines (diff --git, index, +++, ---, @@)
-                    content_lines = []
-                    in_content = False
-                    for line in lines:
-                        if line.startswith("@@"):
-                            in_content = True
-                            continue
-                        if in_content and line.strip():
-                            content_lines.append(line)
-
-                    if content_lines:
-                        return "\n".join(content_lines)
-
-                # Fallback to word-level diff if character-level is too verbose
-                result = subprocess.run(
-                    [
-                        "git",
-                        "diff",
-                        "--word-diff=plain",
-                        "-U0",  # Zero lines of context
-                        "--no-index",
-                        str(original_file),
-                        str(modified_file),
-                    ],
-                    capture_output=True,
-                    text=True,
-                )
-
-                if result.stdout.strip():
-                    lines = result.stdout.split("\n")
-                    content_lines = []
-                    in_content = False
-                    for line in lines:
-                        if line.startswith("@@"):
-                            in_content = True
-                            continue
-                        if in_content and line.strip():
-                            content_lines.append(line)
-                    return "\n".join(content_lines)
-
-        except (subprocess.CalledProcessError, FileNotFoundError, Exception):
-            # Git not available or other error, return None to use fallback
-            pass
-
-        return None
-
-    def _remove_claude_tracked_changes(self, root):
-        """Remove tracked changes authored by Claude from the XML root."""
-        ins_tag = f"{{{self.namespaces['w']}}}ins"
-        del_tag = f"{{{self.namespaces['w']}}}del"
-        author_attr = f"{{{self.namespaces['w']}}}author"
-
-        # Remove w:ins elements
-        for parent in root.iter():
-            to_remove = []
-            for child in parent:
-                if child.tag == ins_tag and child.get(author_attr) == "Claude":
-                    to_remove.append(child)
-            for elem in to_remove:
-                parent.remove(elem)
-
-        # Unwrap content in w:del elements where author is "Claude"
-        deltext_tag = f"{{{self.namespaces['w']}}}delText"
-        t_tag = f"{{{self.namespaces['w']}}}t"
-
-        for parent in root.iter():
-            to_process = []
-            for child in parent:
-                if child.tag == del_tag and child.get(author_attr) == "Claude":
-                    to_process.append((child, list(parent).index(child)))
-
-            # Process in reverse order to maintain indices
-            for del_elem, del_index in reversed(to_process):
-                # Convert w:delText to w:t before moving
-                for elem in del_elem.iter():
-                    if elem.tag == deltext_tag:
-                        elem.tag = t_tag
-
-                # Move all children of w:del to its parent before removing w:del
-                for child in reversed(list(del_elem)):
-                    parent.insert(del_index, child)
-                parent.remove(del_elem)
-
-    def _extract_text_content(self, root):
-        """Extract text content from Word XML, preserving paragraph structure.
-
-        Empty paragraphs are skipped to avoid false positives when tracked
-        insertions add only structural elements without text content.
+    def _get_word_diff(self, original_text, modified_text):
+        """Generate an inline diff of the paragraphs that differ.
+
+        Paragraphs are first matched by content hash; only unmatched paragraphs
+        are diffed further, at character level, or at word level when the
+        character diff is too fragmented to read. Changes are shown in git's
+        --word-diff=plain style: [-removed-]{+added+}.
+        """
+        original_paras = original_text.split("\n")
+        modified_paras = modified_text.split("\n")
+
+        # Intern paragraphs so the paragraph-level diff compares ints
+        para_ids = {}
+        a = [para_ids.setdefault(p, len(para_ids)) for p in original_paras]
+        b = [para_ids.setdefault(p, len(para_ids)) for p in modified_paras]
+
+        lines = []
+        for tag, i1, i2, j1, j2 in _myers_opcodes(a, b):
+            if tag == "equal":
+                continue
+            old = original_paras[i1:i2]
+            new = modified_paras[j1:j2]
+            paired = min(len(old), len(new))
+            for old_para, new_para in zip(old[:paired], new[:paired]):
+                lines.append(_inline_diff(old_para, new_para))
+            lines.extend(f"[-{para}-]" for para in old[paired:] if para)
+            lines.extend(f"{{+{para}+}}" for para in new[paired:] if para)
+
+        return "\n".join(lines) if lines else None
+
+    def _scan_document(self, source, keep_text=False):
+        """Stream document.xml with the author's tracked changes reverted.
+
+        Uses iterparse and discards elements as soon as they are processed, so no
+        tree is built: the author's w:ins subtrees are skipped and w:delText inside
+        the author's w:del is read as regular w:t text. Empty paragraphs are skipped
+        to avoid false positives when tracked insertions add only structural
+        elements without text content. Nested paragraphs (e.g. in text boxes) also
+        count toward their enclosing paragraph.
+
+        Args:
+            source: Path or binary file object of a document.xml
+            keep_text: If True, also return the paragraph texts
+
+        Returns:
+            tuple: (list of per-paragraph text hashes, list of paragraph texts if
+                keep_text else [], True if the author has any w:ins/w:del)
         """
-        p_tag = f"{{{self.namespaces['w']}}}p"
-        t_tag = f"{{{self.namespaces['w']}}}t"
-
-        paragraphs = []
-        for p_elem in root.findall(f".//{p_tag}"):
-            # Get all text elements within this paragraph
-            text_parts = []
-            for t_elem in p_elem.findall(f".//{t_tag}"):
-                if t_elem.text:
-                    text_parts.append(t_elem.text)
-            paragraph_text = "".join(text_parts)
-            # Skip empty paragraphs - they don't affect content validation
-            if paragraph_text:
-                paragraphs.append(paragraph_text)
-
-        return "\n".join(paragraphs)
+        w = self.namespaces["w"]
+        p_tag = f"{{{w}}}p"
+        t_tag = f"{{{w}}}t"
+        deltext_tag = f"{{{w}}}delText"
+        ins_tag = f"{{{w}}}ins"
+        del_tag = f"{{{w}}}del"
+        author_attr = f"{{{w}}}author"
+
+        hashes = []
+        texts = []
+        has_changes = False
+        skipped = None  # The author's w:ins currently being skipped
+        del_depth = 0  # Nesting depth of the author's w:del elements
+        open_paragraphs = []  # (slot in pending, text parts) of each enclosing w:p
+        pending = []  # Texts of paragraphs inside the current outermost w:p
+
+        source = str(source) if isinstance(source, Path) else source
+        for event, elem in lxml.etree.iterparse(source, events=("start", "end")):
+            tag = elem.tag
+            if event == "start":
+                if skipped is not None:
+                    continue
+                if tag == ins_tag and elem.get(author_attr) == self.author:
+                    has_changes = True
+                    skipped = elem
+                elif tag == del_tag and elem.get(author_attr) == self.author:
+                    has_changes = True
+                    del_depth += 1
+                elif tag == p_tag:
+                    # Reserve the paragraph's slot in document (start tag) order
+                    open_paragraphs.append((len(pending), []))
+                    pending.append("")
+                continue
+
+            if skipped is not None:
+                if elem is skipped:
+                    skipped = None
+            elif tag == t_tag or (tag == deltext_tag and del_depth):
+                if elem.text:
+                    for _, parts in open_paragraphs:
+                        parts.append(elem.text)
+            elif tag == del_tag and elem.get(author_attr) == self.author:
+                del_depth -= 1
+            elif tag == p_tag:
+                slot, parts = open_paragraphs.pop()
+                pending[slot] = "".join(parts)
+                if not open_paragraphs:
+                    # Outermost paragraph closed: emit it and any nested ones
+                    for text in pending:
+                        if text:
+                            hashes.append(
+                                hashlib.blake2b(text.encode(), digest_size=16).digest()
+                            )
+                            if keep_text:
+                                texts.append(text)
+                    pending.clear()
+
+            # Drop processed elements so memory stays flat
+            elem.clear(keep_tail=False)
+            while elem.getprevious() is not None:
+                del elem.getparent()[0]
+
+        return hashes, texts, has_changes
+
+
+def _myers_opcodes(a, b, max_edits=MAX_DIFF_EDITS):
+    """Diff two sequences with Myers' O((N+M)D) algorithm.
+
+    Returns difflib-style opcodes (tag, i1, i2, j1, j2) with tags "equal",
+    "delete", "insert" and "replace". If more than max_edits edits are needed,
+    the differing middle is reported as a single replacement.
+    """
+    # Trim common prefix and suffix; typical validation failures touch little text
+    n, m = len(a), len(b)
+    prefix = 0
+    while prefix < n and prefix < m and a[prefix] == b[prefix]:
+        prefix += 1
+    suffix = 0
+    while (
+        suffix < n - prefix
+        and suffix < m - prefix
+        and a[n - 1 - suffix] == b[m - 1 - suffix]
+    ):
+        suffix += 1
+    core_a = a[prefix : n - suffix]
+    core_b = b[prefix : m - suffix]
+
+    ops = []
+    if prefix:
+        ops.append(("equal", 0, prefix, 0, prefix))
+    for tag, i1, i2, j1, j2 in _myers_core(core_a, core_b, max_edits):
+        ops.append((tag, i1 + prefix, i2 + prefix, j1 + prefix, j2 + prefix))
+    if suffix:
+        ops.append(("equal", n - suffix, n, m - suffix, m))
+    return ops
+
+
+def _myers_core(a, b, max_edits):
+    """Myers diff of two sequences without common prefix/suffix handling."""
+    n, m = len(a), len(b)
+    if not n and not m:
+        return []
+    if not n:
+        return [("insert", 0, 0, 0, m)]
+    if not m:
+        return [("delete", 0, n, 0, 0)]
+
+    # Forward greedy search over diagonals k stored at v[k + offset]; each round
+    # keeps only the slice of diagonals it can reach, so the trace stays compact
+    max_d = min(n + m, max_edits)
+    offset = max_d + 1
+    v = [0] * (2 * offset + 1)
+    trace = []
+    found = False
+    for d in range(max_d + 1):
+        trace.append(v[offset - d - 1 : offset + d + 2])
+        for k in range(-d, d + 1, 2):
+            if k == -d or (k != d and v[offset + k - 1] < v[offset + k + 1]):
+                x = v[offset + k + 1]
+            else:
+                x = v[offset + k - 1] + 1
+            y = x - k
+            while x < n and y < m and a[x] == b[y]:
+                x += 1
+                y += 1
+            v[offset + k] = x
+            if x >= n and y >= m:
+                found = True
+                break
+        if found:
+            break
+    if not found:
+        return [("replace", 0, n, 0, m)]
+
+    # Backtrack into single-element steps, then merge them into opcodes
+    steps = []
+    x, y = n, m
+    for d in range(len(trace) - 1, -1, -1):
+        # trace[d] holds diagonals -d - 1 .. d + 1
+        v = trace[d]
+        k = x - y
+        if k == -d or (k != d and v[k + d] < v[k + d + 2]):
+            prev_k = k + 1
+        else:
+            prev_k = k - 1
+        prev_x = v[prev_k + d + 1]
+        prev_y = prev_x - prev_k
+        while x > prev_x and y > prev_y:
+            x -= 1
+            y -= 1
+            steps.append(("equal", x, y))
+        if d > 0:
+            if x == prev_x:
+                steps.append(("insert", x, prev_y))
+            else:
+                steps.append(("delete", prev_x, y))
+        x, y = prev_x, prev_y
+    steps.reverse()
+
+    ops = []
+    for tag, i, j in steps:
+        di = 0 if tag == "insert" else 1
+        dj = 0 if tag == "delete" else 1
+        if ops and ops[-1][0] == tag:
+            last = ops[-1]
+            ops[-1] = (tag, last[1], i + di, last[3], j + dj)
+        elif (
+            ops
+            and {ops[-1][0], tag} <= {"delete", "insert", "replace"}
+            and ops[-1][0] != "equal"
+        ):
+            last = ops[-1]
+            ops[-1] = ("replace", last[1], i + di, last[3], j + dj)
+        else:
+            ops.append((tag, i, i + di, j, j + dj))
+    return ops
+
+
+def _render_inline(a, b, ops):
+    """Render opcodes over token sequences as [-removed-]{+added+} text."""
+    parts = []
+    for tag, i1, i2, j1, j2 in ops:
+        if tag == "equal":
+            parts.append("".join(a[i1:i2]))
+            continue
+        if i2 > i1:
+            parts.append(f"[-{''.join(a[i1:i2])}-]")
+        if j2 > j1:
+            parts.append(f"{{+{''.join(b[j1:j2])}+}}")
+    return "".join(parts)
+
+
+def _inline_diff(original, modified):
+    """Diff one paragraph pair by word, refining changed spans by character.
+
+    Changes separated by a single space or punctuation mark are refined as one
+    span, so an edit joining or splitting words still reads as a character
+    change. The whole paragraph is shown word by word if the character
+    rendering is too fragmented to read.
+    """
+    original_words = WORD_PATTERN.findall(original)
+    modified_words = WORD_PATTERN.findall(modified)
+    # A paragraph needing more edits than half its words is shown as rewritten
+    budget = min(MAX_DIFF_EDITS, max(len(original_words), len(modified_words)) // 2 + 1)
+    word_ops = _myers_opcodes(original_words, modified_words, max_edits=budget)
+
+    # Group change opcodes with the separators between them
+    groups = []
+    for op in word_ops:
+        if (
+            op[0] != "equal"
+            and len(groups) >= 2
+            and groups[-1][0][0] == "equal"
+            and groups[-1][0][2] - groups[-1][0][1] == 1
+            and not WORD_CHAR.match(original_words[groups[-1][0][1]])
+        ):
+            separator = groups.pop()
+            groups[-1].extend(separator + [op])
+        else:
+            groups.append([op])
+
+    max_hunks = MAX_CHAR_HUNK_DENSITY * max(len(original), len(modified), 1) / 100
+    parts = []
+    hunks = 0
+    for group in groups:
+        if group[0][0] == "equal":
+            parts.append(_render_inline(original_words, modified_words, group))
+            continue
+        old = "".join(original_words[group[0][1] : group[-1][2]])
+        new = "".join(modified_words[group[0][3] : group[-1][4]])
+        if max(len(old), len(new)) <= MAX_REFINE_CHARS:
+            char_ops = _myers_opcodes(old, new)
+            parts.append(_render_inline(old, new, char_ops))
+        else:
+            char_ops = group
+            parts.append(_render_inline(original_words, modified_words, group))
+        hunks += sum(1 for op in char_ops if op[0] != "equal")
+        if hunks > max_hunks:
+            return _render_inline(original_words, modified_words, word_ops)
+
+    return "".join(parts)
 
 
 if __name__ == "__main__":
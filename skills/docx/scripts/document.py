@@ -27,10 +27,11 @@ Usage:
 """
 
 import html
+import os
 import random
 import shutil
 import tempfile
-from datetime import datetime, timezone
+import xml.etree.ElementTree as ET
 from pathlib import Path
 
 from defusedxml import minidom
@@ -54,10 +55,16 @@ class DocxXMLEditor(XMLEditor):
 
     Attributes:
         dom (defusedxml.minidom.Document): The DOM document for direct manipulation
+        ids (IdAllocator): Source of unique w:id, w14:paraId and w14:textId values
     """
 
     def __init__(
-        self, xml_path, rsid: str, author: str = "Claude", initials: str = "C"
+        self,
+        xml_path,
+        rsid: str,
+        author: str = "Claude",
+        initials: str = "C",
+        ids=None,
     ):
         """Initialize with required RSID and optional author.
 
@@ -66,29 +73,22 @@ class DocxXMLEditor(XMLEditor):
             rsid: RSID to automatically apply to new elements
             author: Author name for tracked changes and comments (default: "Claude")
             initials: Author initials (default: "C")
+            ids: IdAllocator shared with the other parts of the document. If not
+                provided, one is built from this file alone.
         """
         super().__init__(xml_path)
         self.rsid = rsid
         self.author = author
         self.initials = initials
+        self.ids = ids if ids is not None else IdAllocator([self.xml_path])
 
     def _get_next_change_id(self):
-        """Get the next available change ID by checking all tracked change elements."""
-        max_id = -1
-        for tag in ("w:ins", "w:del"):
-            elements = self.dom.getElementsByTagName(tag)
-            for elem in elements:
-                change_id = elem.getAttribute("w:id")
-                if change_id:
-                    try:
-                        max_id = max(max_id, int(change_id))
-                    except ValueError:
-                        pass
-        return max_id + 1
+        """Get the next available change ID from the shared allocator."""
+        return self.ids.next_change_id()
 
     def _ensure_w16du_namespace(self):
         """Ensure w16du namespace is declared on the root element."""
-        root = self.dom.documentElement
+        root = self.root
         if not root.hasAttribute("xmlns:w16du"):  # type: ignore
             root.setAttribute(  # type: ignore
                 "xmlns:w16du",
@@ -97,7 +97,7 @@ class DocxXMLEditor(XMLEditor):
 
     def _ensure_w16cex_namespace(self):
         """Ensure w16cex namespace is declared on the root element."""
-        root = self.dom.documentElement
+        root = self.root
         if not root.hasAttribute("xmlns:w16cex"):  # type: ignore
             root.setAttribute(  # type: ignore
                 "xmlns:w16cex",
@@ -106,7 +106,7 @@ class DocxXMLEditor(XMLEditor):
 
     def _ensure_w14_namespace(self):
         """Ensure w14 namespace is declared on the root element."""
-        root = self.dom.documentElement
+        root = self.root
         if not root.hasAttribute("xmlns:w14"):  # type: ignore
             root.setAttribute(  # type: ignore
                 "xmlns:w14",
@@ -150,10 +150,10 @@ class DocxXMLEditor(XMLEditor):
             # Add w14:paraId and w14:textId if not present
             if not elem.hasAttribute("w14:paraId"):
                 self._ensure_w14_namespace()
-                elem.setAttribute("w14:paraId", _generate_hex_id())
+                elem.setAttribute("w14:paraId", self.ids.next_hex_id())
             if not elem.hasAttribute("w14:textId"):
                 self._ensure_w14_namespace()
-                elem.setAttribute("w14:textId", _generate_hex_id())
+                elem.setAttribute("w14:textId", self.ids.next_hex_id())
 
         def add_rsid_to_r(elem):
             # Use w:rsidDel for <w:r> inside <w:del>, otherwise w:rsidR
@@ -165,9 +165,11 @@ class DocxXMLEditor(XMLEditor):
                     elem.setAttribute("w:rsidR", self.rsid)
 
         def add_tracked_change_attrs(elem):
-            # Auto-assign w:id if not present
+            # Auto-assign w:id if not present, otherwise keep the allocator past it
             if not elem.hasAttribute("w:id"):
                 elem.setAttribute("w:id", str(self._get_next_change_id()))
+            else:
+                self.ids.reserve_change_id(elem.getAttribute("w:id"))
             if not elem.hasAttribute("w:author"):
                 elem.setAttribute("w:author", self.author)
             if not elem.hasAttribute("w:date"):
@@ -306,7 +308,7 @@ class DocxXMLEditor(XMLEditor):
                 continue
 
             # Create deletion wrapper
-            del_wrapper = self.dom.createElement("w:del")
+            del_wrapper = self._dom.createElement("w:del")
 
             # Process each run
             for run in runs:
@@ -318,7 +320,7 @@ class DocxXMLEditor(XMLEditor):
                     run.setAttribute("w:rsidDel", self.rsid)
 
                 for t_elem in list(run.getElementsByTagName("w:t")):
-                    del_text = self.dom.createElement("w:delText")
+                    del_text = self._dom.createElement("w:delText")
                     # Copy ALL child nodes (not just firstChild) to handle entities
                     while t_elem.firstChild:
                         del_text.appendChild(t_elem.firstChild)
@@ -336,6 +338,7 @@ class DocxXMLEditor(XMLEditor):
 
             # Inject attributes to the deletion wrapper
             self._inject_attributes_to_nodes([del_wrapper])
+            self.mark_dirty()
 
         return [elem]
 
@@ -391,7 +394,7 @@ class DocxXMLEditor(XMLEditor):
                 continue
 
             # Create insertion wrapper
-            ins_elem = self.dom.createElement("w:ins")
+            ins_elem = self._dom.createElement("w:ins")
 
             for run in runs:
                 # Clone the run
@@ -399,7 +402,7 @@ class DocxXMLEditor(XMLEditor):
 
                 # Convert w:delText → w:t
                 for del_text in list(new_run.getElementsByTagName("w:delText")):
-                    t_elem = self.dom.createElement("w:t")
+                    t_elem = self._dom.createElement("w:t")
                     # Copy ALL child nodes (not just firstChild) to handle entities
                     while del_text.firstChild:
                         t_elem.appendChild(del_text.firstChild)
@@ -502,7 +505,7 @@ class DocxXMLEditor(XMLEditor):
 
             # Convert w:t → w:delText
             for t_elem in list(elem.getElementsByTagName("w:t")):
-                del_text = self.dom.createElement("w:delText")
+                del_text = self._dom.createElement("w:delText")
                 # Copy ALL child nodes (not just firstChild) to handle entities
                 while t_elem.firstChild:
                     del_text.appendChild(t_elem.firstChild)
@@ -520,7 +523,7 @@ class DocxXMLEditor(XMLEditor):
                 elem.setAttribute("w:rsidDel", self.rsid)
 
             # Wrap in w:del
-            del_wrapper = self.dom.createElement("w:del")
+            del_wrapper = self._dom.createElement("w:del")
             parent = elem.parentNode
             parent.insertBefore(del_wrapper, elem)
             parent.removeChild(elem)
@@ -528,6 +531,7 @@ class DocxXMLEditor(XMLEditor):
 
             # Inject attributes to the deletion wrapper
             self._inject_attributes_to_nodes([del_wrapper])
+            self.mark_dirty()
 
             return del_wrapper
 
@@ -546,20 +550,20 @@ class DocxXMLEditor(XMLEditor):
                 rPr_list = pPr.getElementsByTagName("w:rPr")
 
                 if not rPr_list:
-                    rPr = self.dom.createElement("w:rPr")
+                    rPr = self._dom.createElement("w:rPr")
                     pPr.appendChild(rPr)
                 else:
                     rPr = rPr_list[0]
 
                 # Add <w:del/> marker
-                del_marker = self.dom.createElement("w:del")
+                del_marker = self._dom.createElement("w:del")
                 rPr.insertBefore(
                     del_marker, rPr.firstChild
                 ) if rPr.firstChild else rPr.appendChild(del_marker)
 
             # Convert w:t → w:delText in all runs
             for t_elem in list(elem.getElementsByTagName("w:t")):
-                del_text = self.dom.createElement("w:delText")
+                del_text = self._dom.createElement("w:delText")
                 # Copy ALL child nodes (not just firstChild) to handle entities
                 while t_elem.firstChild:
                     del_text.appendChild(t_elem.firstChild)
@@ -578,7 +582,7 @@ class DocxXMLEditor(XMLEditor):
                     run.setAttribute("w:rsidDel", self.rsid)
 
             # Wrap all non-pPr children in <w:del>
-            del_wrapper = self.dom.createElement("w:del")
+            del_wrapper = self._dom.createElement("w:del")
             for child in [c for c in elem.childNodes if c.nodeName != "w:pPr"]:
                 elem.removeChild(child)
                 del_wrapper.appendChild(child)
@@ -586,6 +590,7 @@ class DocxXMLEditor(XMLEditor):
 
             # Inject attributes to the deletion wrapper
             self._inject_attributes_to_nodes([del_wrapper])
+            self.mark_dirty()
 
             return elem
 
@@ -609,6 +614,177 @@ def _generate_rsid() -> str:
     return "".join(random.choices("0123456789ABCDEF", k=8))
 
 
+class IdAllocator:
+    """Hands out IDs that are unique across all parts of a document.
+
+    The parts are scanned once on construction; afterwards every allocation is O(1)
+    and no DOM is rescanned. Tracked by kind:
+    - w:id of w:comment, w:commentRangeStart/End, w:commentReference (comment IDs)
+    - w:id of every other element: w:ins, w:del, bookmarks, ... (change IDs)
+    - w14:paraId, w14:textId, w15:paraId, w16cid:durableId (hex IDs, one shared pool)
+    - w:rsid* attributes and w:rsid/w:rsidRoot values (RSIDs)
+    """
+
+    W_NS = "http://schemas.openxmlformats.org/wordprocessingml/2006/main"
+    HEX_ID_ATTRS = {
+        "{http://schemas.microsoft.com/office/word/2010/wordml}paraId",
+        "{http://schemas.microsoft.com/office/word/2010/wordml}textId",
+        "{http://schemas.microsoft.com/office/word/2012/wordml}paraId",
+        "{http://schemas.microsoft.com/office/word/2016/wordml/cid}durableId",
+        "{http://schemas.microsoft.com/office/word/2018/wordml/cex}durableId",
+    }
+    COMMENT_TAGS = {
+        f"{{{W_NS}}}comment",
+        f"{{{W_NS}}}commentRangeStart",
+        f"{{{W_NS}}}commentRangeEnd",
+        f"{{{W_NS}}}commentReference",
+    }
+
+    def __init__(self, xml_files):
+        """Scan the given XML parts for IDs already in use.
+
+        Args:
+            xml_files: Iterable of paths to XML parts (missing files are skipped)
+        """
+        self._next_comment_id = 0
+        self._next_change_id = 0
+        self._hex_ids = set()
+        self._rsids = set()
+        for xml_file in xml_files:
+            self._scan(Path(xml_file))
+
+    @classmethod
+    def for_package(cls, unpacked_path):
+        """Build an allocator from every XML part under word/."""
+        return cls(sorted((Path(unpacked_path) / "word").rglob("*.xml")))
+
+    def _scan(self, xml_file):
+        """Record all IDs used in one XML part (streaming, constant memory)."""
+        if not xml_file.exists():
+            return
+        id_attr = f"{{{self.W_NS}}}id"
+        val_attr = f"{{{self.W_NS}}}val"
+        rsid_prefix = f"{{{self.W_NS}}}rsid"
+        rsid_tags = {f"{{{self.W_NS}}}rsid", f"{{{self.W_NS}}}rsidRoot"}
+
+        try:
+            for _, elem in ET.iterparse(xml_file):
+                for attr, value in elem.attrib.items():
+                    if attr == id_attr:
+                        if elem.tag in self.COMMENT_TAGS:
+                            self.reserve_comment_id(value)
+                        else:
+                            self.reserve_change_id(value)
+                    elif attr in self.HEX_ID_ATTRS:
+                        self._hex_ids.add(value.upper())
+                    elif attr.startswith(rsid_prefix):
+                        self._rsids.add(value.upper())
+                if elem.tag in rsid_tags and elem.get(val_attr):
+                    self._rsids.add(elem.get(val_attr).upper())
+                elem.clear()
+        except ET.ParseError:
+            # Unparseable parts are reported by validation, not here
+            pass
+
+    def reserve_comment_id(self, value):
+        """Mark a comment ID (int or numeric string) as used."""
+        try:
+            self._next_comment_id = max(self._next_comment_id, int(value) + 1)
+        except ValueError:
+            pass
+
+    def reserve_change_id(self, value):
+        """Mark a change ID (int or numeric string) as used."""
+        try:
+            self._next_change_id = max(self._next_change_id, int(value) + 1)
+        except ValueError:
+            pass
+
+    def next_comment_id(self) -> int:
+        """Return an unused comment ID."""
+        comment_id = self._next_comment_id
+        self._next_comment_id += 1
+        return comment_id
+
+    def next_change_id(self) -> int:
+        """Return an unused w:id for a tracked change or other annotation."""
+        change_id = self._next_change_id
+        self._next_change_id += 1
+        return change_id
+
+    def next_hex_id(self) -> str:
+        """Return an unused 8-character hex ID for paraId/textId/durableId."""
+        while True:
+            hex_id = _generate_hex_id()
+            if hex_id not in self._hex_ids:
+                self._hex_ids.add(hex_id)
+                return hex_id
+
+    def next_rsid(self) -> str:
+        """Return an RSID not yet used anywhere in the document."""
+        while True:
+            rsid = _generate_rsid()
+            if rsid not in self._rsids:
+                self._rsids.add(rsid)
+                return rsid
+
+    def reserve_rsid(self, rsid: str):
+        """Mark an RSID as used."""
+        self._rsids.add(rsid.upper())
+
+
+def _snapshot_tree(root: Path) -> dict:
+    """Map each file under root (relative path) to its (mtime_ns, size, inode).
+
+    XMLEditor.save() replaces files via rename, so every write changes the inode
+    even when mtime and size happen to match.
+    """
+    snapshot = {}
+    for dirpath, _, filenames in os.walk(root):
+        for name in filenames:
+            path = os.path.join(dirpath, name)
+            st = os.stat(path)
+            snapshot[os.path.relpath(path, root)] = (
+                st.st_mtime_ns,
+                st.st_size,
+                st.st_ino,
+            )
+    return snapshot
+
+
+def _atomic_copy(src: Path, dst: Path) -> None:
+    """Copy src to dst through a temporary file in dst's directory and a rename."""
+    dst.parent.mkdir(parents=True, exist_ok=True)
+    fd, temp_path = tempfile.mkstemp(
+        dir=dst.parent, prefix=f".{dst.name}.", suffix=".tmp"
+    )
+    os.close(fd)
+    try:
+        shutil.copy2(src, temp_path)
+        os.replace(temp_path, dst)
+    except BaseException:
+        Path(temp_path).unlink(missing_ok=True)
+        raise
+
+
+def _insert_nodes_before(anchor, nodes):
+    """Insert already-imported DOM nodes before anchor, in order."""
+    parent = anchor.parentNode
+    for node in nodes:
+        parent.insertBefore(node, anchor)
+
+
+def _insert_nodes_after(anchor, nodes):
+    """Insert already-imported DOM nodes after anchor, in order."""
+    parent = anchor.parentNode
+    next_sibling = anchor.nextSibling
+    for node in nodes:
+        if next_sibling:
+            parent.insertBefore(node, next_sibling)
+        else:
+            parent.appendChild(node)
+
+
 class Document:
     """Manages comments in unpacked Word documents."""
 
@@ -641,14 +817,24 @@ class Document:
         self.unpacked_path = Path(self.temp_dir) / "unpacked"
         shutil.copytree(self.original_path, self.unpacked_path)
 
+        # File stats of the temp tree as last synced to each destination, so that
+        # save() only copies files that changed since then
+        self._synced = {
+            self.original_path.resolve(): _snapshot_tree(self.unpacked_path)
+        }
+
         # Pack original directory into temporary .docx for validation baseline (outside unpacked dir)
         self.original_docx = Path(self.temp_dir) / "original.docx"
         pack_document(self.original_path, self.original_docx, validate=False)
 
         self.word_path = self.unpacked_path / "word"
 
+        # Scan all parts once for IDs already in use
+        self.ids = IdAllocator.for_package(self.unpacked_path)
+
         # Generate RSID if not provided
-        self.rsid = rsid if rsid else _generate_rsid()
+        self.rsid = rsid if rsid else self.ids.next_rsid()
+        self.ids.reserve_rsid(self.rsid)
         print(f"Using RSID: {self.rsid}")
 
         # Set default author and initials
@@ -664,9 +850,8 @@ class Document:
         self.comments_ids_path = self.word_path / "commentsIds.xml"
         self.comments_extensible_path = self.word_path / "commentsExtensible.xml"
 
-        # Load existing comments and determine next ID (before setup modifies files)
+        # Load existing comments (before setup modifies files)
         self.existing_comments = self._load_existing_comments()
-        self.next_comment_id = self._get_next_comment_id()
 
         # Convenient access to document.xml editor (semi-private)
         self._document = self["word/document.xml"]
@@ -706,7 +891,11 @@ class Document:
                 raise ValueError(f"XML file not found: {xml_path}")
             # Use DocxXMLEditor with RSID, author, and initials for all editors
             self._editors[xml_path] = DocxXMLEditor(
-                file_path, rsid=self.rsid, author=self.author, initials=self.initials
+                file_path,
+                rsid=self.rsid,
+                author=self.author,
+                initials=self.initials,
+                ids=self.ids,
             )
         return self._editors[xml_path]
 
@@ -727,40 +916,61 @@ class Document:
             end_node = cm.get_document_node(tag="w:ins", id="2")
             cm.add_comment(start=start_node, end=end_node, text="Explanation")
         """
-        comment_id = self.next_comment_id
-        para_id = _generate_hex_id()
-        durable_id = _generate_hex_id()
-        timestamp = datetime.now(timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ")
-
-        # Add comment ranges to document.xml immediately
-        self._document.insert_before(start, self._comment_range_start_xml(comment_id))
+        return self.add_comments([{"start": start, "end": end, "text": text}])[0]
 
-        # If end node is a paragraph, append comment markup inside it
-        # Otherwise insert after it (for run-level anchors)
-        if end.tagName == "w:p":
-            self._document.append_to(end, self._comment_range_end_xml(comment_id))
-        else:
-            self._document.insert_after(end, self._comment_range_end_xml(comment_id))
+    def add_comments(self, comments) -> list[int]:
+        """
+        Add many comments at once.
 
-        # Add to comments.xml immediately
-        self._add_to_comments_xml(
-            comment_id, para_id, text, self.author, self.initials, timestamp
-        )
+        Produces the same markup as calling add_comment() for each entry in order,
+        but each comment part is extended with a single fragment and the range
+        markers are placed in document.xml in one pass over the anchors.
 
-        # Add to commentsExtended.xml immediately
-        self._add_to_comments_extended_xml(para_id, parent_para_id=None)
+        Args:
+            comments: Iterable of dicts with "start", "end" and "text" keys, with the
+                same meaning as the add_comment() arguments
 
-        # Add to commentsIds.xml immediately
-        self._add_to_comments_ids_xml(para_id, durable_id)
+        Returns:
+            List of created comment IDs, in input order
 
-        # Add to commentsExtensible.xml immediately
-        self._add_to_comments_extensible_xml(durable_id)
+        Example:
+            paras = [doc["word/document.xml"].get_node(tag="w:p", contains=t) for t in terms]
+            doc.add_comments([{"start": p, "end": p, "text": "Defined term"} for p in paras])
+        """
+        comments = list(comments)
+        if not comments:
+            return []
+
+        entries = self._new_comment_entries(comments)
+
+        # Build all range markers with one fragment parse
+        fragments = []
+        for entry in entries:
+            fragments.append(self._comment_range_start_xml(entry["id"]))
+            fragments.append(self._comment_range_end_xml(entry["id"]))
+        groups = self._parse_fragment_groups(self._document, fragments)
+
+        # Place the markers, one anchor pair at a time in input order
+        inserted = []
+        for i, comment in enumerate(comments):
+            start_nodes, end_nodes = groups[2 * i], groups[2 * i + 1]
+            _insert_nodes_before(comment["start"], start_nodes)
+
+            # If end node is a paragraph, append comment markup inside it
+            # Otherwise insert after it (for run-level anchors)
+            end = comment["end"]
+            if end.tagName == "w:p":
+                for node in end_nodes:
+                    end.appendChild(node)
+            else:
+                _insert_nodes_after(end, end_nodes)
+            inserted.extend(start_nodes + end_nodes)
 
-        # Update existing_comments so replies work
-        self.existing_comments[comment_id] = {"para_id": para_id}
+        self._document._inject_attributes_to_nodes(inserted)
+        self._document.mark_dirty()
 
-        self.next_comment_id += 1
-        return comment_id
+        self._add_comment_parts(entries)
+        return [entry["id"] for entry in entries]
 
     def reply_to_comment(
         self,
@@ -780,55 +990,91 @@ class Document:
         Example:
             cm.reply_to_comment(parent_comment_id=0, text="I agree with this change")
         """
-        if parent_comment_id not in self.existing_comments:
-            raise ValueError(f"Parent comment with id={parent_comment_id} not found")
+        return self.reply_to_comments(
+            [{"parent_comment_id": parent_comment_id, "text": text}]
+        )[0]
 
-        parent_info = self.existing_comments[parent_comment_id]
-        comment_id = self.next_comment_id
-        para_id = _generate_hex_id()
-        durable_id = _generate_hex_id()
-        timestamp = datetime.now(timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ")
+    def reply_to_comments(self, replies) -> list[int]:
+        """
+        Add many replies at once.
 
-        # Add comment ranges to document.xml immediately
-        parent_start_elem = self._document.get_node(
-            tag="w:commentRangeStart", attrs={"w:id": str(parent_comment_id)}
-        )
-        parent_ref_elem = self._document.get_node(
-            tag="w:commentReference", attrs={"w:id": str(parent_comment_id)}
-        )
+        Produces the same markup as calling reply_to_comment() for each entry in
+        order. The parent range markers are located with one scan of document.xml
+        and each comment part is extended with a single fragment.
 
-        self._document.insert_after(
-            parent_start_elem, self._comment_range_start_xml(comment_id)
-        )
-        parent_ref_run = parent_ref_elem.parentNode
-        self._document.insert_after(
-            parent_ref_run, f'<w:commentRangeEnd w:id="{comment_id}"/>'
-        )
-        self._document.insert_after(
-            parent_ref_run, self._comment_ref_run_xml(comment_id)
-        )
+        Args:
+            replies: Iterable of dicts with "parent_comment_id" and "text" keys.
+                Parents must exist before the call.
 
-        # Add to comments.xml immediately
-        self._add_to_comments_xml(
-            comment_id, para_id, text, self.author, self.initials, timestamp
-        )
+        Returns:
+            List of created comment IDs, in input order
 
-        # Add to commentsExtended.xml immediately (with parent)
-        self._add_to_comments_extended_xml(
-            para_id, parent_para_id=parent_info["para_id"]
-        )
+        Example:
+            doc.reply_to_comments([
+                {"parent_comment_id": 0, "text": "Agreed"},
+                {"parent_comment_id": 3, "text": "Fixed in section 4"},
+            ])
+        """
+        replies = list(replies)
+        if not replies:
+            return []
+
+        for reply in replies:
+            if reply["parent_comment_id"] not in self.existing_comments:
+                raise ValueError(
+                    f"Parent comment with id={reply['parent_comment_id']} not found"
+                )
+
+        # Index parent markers with one scan per tag
+        range_starts = {
+            elem.getAttribute("w:id"): elem
+            for elem in self._document.find_all("w:commentRangeStart")
+        }
+        references = {
+            elem.getAttribute("w:id"): elem
+            for elem in self._document.find_all("w:commentReference")
+        }
+        for reply in replies:
+            parent_id = str(reply["parent_comment_id"])
+            if parent_id not in range_starts:
+                raise ValueError(
+                    f"Node not found: <w:commentRangeStart> with attributes "
+                    f"{{'w:id': '{parent_id}'}}"
+                )
+            if parent_id not in references:
+                raise ValueError(
+                    f"Node not found: <w:commentReference> with attributes "
+                    f"{{'w:id': '{parent_id}'}}"
+                )
 
-        # Add to commentsIds.xml immediately
-        self._add_to_comments_ids_xml(para_id, durable_id)
+        entries = self._new_comment_entries(replies)
+        for entry, reply in zip(entries, replies):
+            entry["parent_para_id"] = self.existing_comments[
+                reply["parent_comment_id"]
+            ]["para_id"]
 
-        # Add to commentsExtensible.xml immediately
-        self._add_to_comments_extensible_xml(durable_id)
+        fragments = []
+        for entry in entries:
+            fragments.append(self._comment_range_start_xml(entry["id"]))
+            fragments.append(self._comment_ref_run_xml(entry["id"]))
+            fragments.append(f'<w:commentRangeEnd w:id="{entry["id"]}"/>')
+        groups = self._parse_fragment_groups(self._document, fragments)
 
-        # Update existing_comments so replies work
-        self.existing_comments[comment_id] = {"para_id": para_id}
+        inserted = []
+        for i, reply in enumerate(replies):
+            start_nodes, ref_nodes, end_nodes = groups[3 * i : 3 * i + 3]
+            parent_id = str(reply["parent_comment_id"])
+            parent_ref_run = references[parent_id].parentNode
 
-        self.next_comment_id += 1
-        return comment_id
+            _insert_nodes_after(range_starts[parent_id], start_nodes)
+            _insert_nodes_after(parent_ref_run, ref_nodes + end_nodes)
+            inserted.extend(start_nodes + ref_nodes + end_nodes)
+
+        self._document._inject_attributes_to_nodes(inserted)
+        self._document.mark_dirty()
+
+        self._add_comment_parts(entries)
+        return [entry["id"] for entry in entries]
 
     def __del__(self):
         """Clean up temporary directory on deletion."""
@@ -847,7 +1093,7 @@ class Document:
             self.unpacked_path, self.original_docx, verbose=False
         )
         redlining_validator = RedliningValidator(
-            self.unpacked_path, self.original_docx, verbose=False
+            self.unpacked_path, self.original_docx, verbose=False, author=self.author
         )
 
         # Run validations
@@ -861,6 +1107,9 @@ class Document:
         Save all modified XML files to disk and copy to destination directory.
 
         This persists all changes made via add_comment() and reply_to_comment().
+        Only editors that may hold unsaved modifications are serialized (see
+        XMLEditor.dirty), and only files that changed since the last save to the
+        same destination are copied, each one atomically (temporary file plus rename).
 
         Args:
             destination: Optional path to save to. If None, saves back to original directory.
@@ -871,35 +1120,34 @@ class Document:
             self._ensure_comment_relationships()
             self._ensure_comment_content_types()
 
-        # Save all modified XML files in temp directory
+        # Save modified XML files in temp directory
         for editor in self._editors.values():
-            editor.save()
+            if editor.dirty:
+                editor.save()
 
         # Validate by default
         if validate:
             self.validate()
 
-        # Copy contents from temp directory to destination (or original directory)
+        # Copy changed files from temp directory to destination (or original directory)
         target_path = Path(destination) if destination else self.original_path
-        shutil.copytree(self.unpacked_path, target_path, dirs_exist_ok=True)
+        self._sync_to(target_path)
 
-    # ==================== Private: Initialization ====================
+    def _sync_to(self, target_path):
+        """Copy files changed since the last sync to target_path into place."""
+        target_key = target_path.resolve()
+        previous = self._synced.get(target_key, {})
+        current = _snapshot_tree(self.unpacked_path)
 
-    def _get_next_comment_id(self):
-        """Get the next available comment ID."""
-        if not self.comments_path.exists():
-            return 0
+        for rel_path, stat_key in current.items():
+            dest_file = target_path / rel_path
+            if previous.get(rel_path) == stat_key and dest_file.exists():
+                continue
+            _atomic_copy(self.unpacked_path / rel_path, dest_file)
 
-        editor = self["word/comments.xml"]
-        max_id = -1
-        for comment_elem in editor.dom.getElementsByTagName("w:comment"):
-            comment_id = comment_elem.getAttribute("w:id")
-            if comment_id:
-                try:
-                    max_id = max(max_id, int(comment_id))
-                except ValueError:
-                    pass
-        return max_id + 1
+        self._synced[target_key] = current
+
+    # ==================== Private: Initialization ====================
 
     def _load_existing_comments(self):
         """Load existing comments from files to enable replies."""
@@ -909,7 +1157,7 @@ class Document:
         editor = self["word/comments.xml"]
         existing = {}
 
-        for comment_elem in editor.dom.getElementsByTagName("w:comment"):
+        for comment_elem in editor.find_all("w:comment"):
             comment_id = comment_elem.getAttribute("w:id")
             if not comment_id:
                 continue
@@ -965,7 +1213,7 @@ class Document:
             return
 
         # Add Override element
-        root = editor.dom.documentElement
+        root = editor.root
         override_xml = '<Override PartName="/word/people.xml" ContentType="application/vnd.openxmlformats-officedocument.wordprocessingml.people+xml"/>'
         editor.append_to(root, override_xml)
 
@@ -976,7 +1224,7 @@ class Document:
         if self._has_relationship(editor, "people.xml"):
             return
 
-        root = editor.dom.documentElement
+        root = editor.root
         root_tag = root.tagName  # type: ignore
         prefix = root_tag.split(":")[0] + ":" if ":" in root_tag else ""
         next_rid = editor.get_next_rid()
@@ -997,14 +1245,14 @@ class Document:
         - rsids: late (after compat)
         """
         editor = self["word/settings.xml"]
-        root = editor.get_node(tag="w:settings")
+        root = editor.root
         prefix = root.tagName.split(":")[0] if ":" in root.tagName else "w"
 
         # Conditionally add trackRevisions if requested
         if track_revisions:
             track_revisions_exists = any(
                 elem.tagName == f"{prefix}:trackRevisions"
-                for elem in editor.dom.getElementsByTagName(f"{prefix}:trackRevisions")
+                for elem in editor.find_all(f"{prefix}:trackRevisions")
             )
 
             if not track_revisions_exists:
@@ -1012,7 +1260,7 @@ class Document:
                 # Try to insert before documentProtection, defaultTabStop, or at start
                 inserted = False
                 for tag in [f"{prefix}:documentProtection", f"{prefix}:defaultTabStop"]:
-                    elements = editor.dom.getElementsByTagName(tag)
+                    elements = editor.find_all(tag)
                     if elements:
                         editor.insert_before(elements[0], track_rev_xml)
                         inserted = True
@@ -1025,7 +1273,7 @@ class Document:
                         editor.append_to(root, track_rev_xml)
 
         # Always check if rsids section exists
-        rsids_elements = editor.dom.getElementsByTagName(f"{prefix}:rsids")
+        rsids_elements = editor.find_all(f"{prefix}:rsids")
 
         if not rsids_elements:
             # Add new rsids section
@@ -1036,15 +1284,13 @@ class Document:
 
             # Try to insert after compat, before clrSchemeMapping, or before closing tag
             inserted = False
-            compat_elements = editor.dom.getElementsByTagName(f"{prefix}:compat")
+            compat_elements = editor.find_all(f"{prefix}:compat")
             if compat_elements:
                 editor.insert_after(compat_elements[0], rsids_xml)
                 inserted = True
 
             if not inserted:
-                clr_elements = editor.dom.getElementsByTagName(
-                    f"{prefix}:clrSchemeMapping"
-                )
+                clr_elements = editor.find_all(f"{prefix}:clrSchemeMapping")
                 if clr_elements:
                     editor.insert_before(clr_elements[0], rsids_xml)
                     inserted = True
@@ -1065,68 +1311,103 @@ class Document:
 
     # ==================== Private: XML File Creation ====================
 
-    def _add_to_comments_xml(
-        self, comment_id, para_id, text, author, initials, timestamp
-    ):
-        """Add a single comment to comments.xml."""
-        if not self.comments_path.exists():
-            shutil.copy(TEMPLATE_DIR / "comments.xml", self.comments_path)
+    def _new_comment_entries(self, items):
+        """Allocate IDs for new comments and record them so replies work."""
+        entries = []
+        for item in items:
+            entry = {
+                "id": self.ids.next_comment_id(),
+                "para_id": self.ids.next_hex_id(),
+                "durable_id": self.ids.next_hex_id(),
+                "parent_para_id": None,
+                "text": item["text"],
+            }
+            self.existing_comments[entry["id"]] = {"para_id": entry["para_id"]}
+            entries.append(entry)
+        return entries
+
+    def _add_comment_parts(self, entries):
+        """Append entries to all four comment parts, one fragment per part."""
+        self._add_to_comments_xml(entries)
+        self._add_to_comments_extended_xml(entries)
+        self._add_to_comments_ids_xml(entries)
+        self._add_to_comments_extensible_xml(entries)
+
+    def _parse_fragment_groups(self, editor, fragments):
+        """Parse several XML fragments with one parser call.
+
+        Returns one list of imported (not yet inserted) nodes per fragment.
+        """
+        wrapped = "".join(f"<w:fragment>{xml}</w:fragment>" for xml in fragments)
+        wrappers = [
+            node
+            for node in editor._parse_fragment(wrapped)
+            if node.nodeType == node.ELEMENT_NODE
+        ]
+        return [list(wrapper.childNodes) for wrapper in wrappers]
 
-        editor = self["word/comments.xml"]
-        root = editor.get_node(tag="w:comments")
+    def _comment_part_editor(self, path, template_name):
+        """Get the editor for a comment part, creating it from its template."""
+        if not path.exists():
+            shutil.copy(TEMPLATE_DIR / template_name, path)
+        return self[f"word/{path.name}"]
+
+    def _add_to_comments_xml(self, entries):
+        """Add comments to comments.xml."""
+        editor = self._comment_part_editor(self.comments_path, "comments.xml")
 
-        escaped_text = (
-            text.replace("&", "&amp;").replace("<", "&lt;").replace(">", "&gt;")
-        )
         # Note: w:rsidR, w:rsidRDefault, w:rsidP on w:p, w:rsidR on w:r,
         # and w:author, w:date, w:initials on w:comment are automatically added by DocxXMLEditor
-        comment_xml = f'''<w:comment w:id="{comment_id}">
-  <w:p w14:paraId="{para_id}" w14:textId="77777777">
+        comment_xml = "".join(
+            f'''<w:comment w:id="{entry["id"]}">
+  <w:p w14:paraId="{entry["para_id"]}" w14:textId="77777777">
     <w:r><w:rPr><w:rStyle w:val="CommentReference"/></w:rPr><w:annotationRef/></w:r>
-    <w:r><w:rPr><w:color w:val="000000"/><w:sz w:val="20"/><w:szCs w:val="20"/></w:rPr><w:t>{escaped_text}</w:t></w:r>
+    <w:r><w:rPr><w:color w:val="000000"/><w:sz w:val="20"/><w:szCs w:val="20"/></w:rPr><w:t>{html.escape(entry["text"], quote=False)}</w:t></w:r>
   </w:p>
 </w:comment>'''
-        editor.append_to(root, comment_xml)
-
-    def _add_to_comments_extended_xml(self, para_id, parent_para_id):
-        """Add a single comment to commentsExtended.xml."""
-        if not self.comments_extended_path.exists():
-            shutil.copy(
-                TEMPLATE_DIR / "commentsExtended.xml", self.comments_extended_path
-            )
-
-        editor = self["word/commentsExtended.xml"]
-        root = editor.get_node(tag="w15:commentsEx")
-
-        if parent_para_id:
-            xml = f'<w15:commentEx w15:paraId="{para_id}" w15:paraIdParent="{parent_para_id}" w15:done="0"/>'
-        else:
-            xml = f'<w15:commentEx w15:paraId="{para_id}" w15:done="0"/>'
-        editor.append_to(root, xml)
+            for entry in entries
+        )
+        editor.append_to(editor.root, comment_xml)
 
-    def _add_to_comments_ids_xml(self, para_id, durable_id):
-        """Add a single comment to commentsIds.xml."""
-        if not self.comments_ids_path.exists():
-            shutil.copy(TEMPLATE_DIR / "commentsIds.xml", self.comments_ids_path)
+    def _add_to_comments_extended_xml(self, entries):
+        """Add comments to commentsExtended.xml."""
+        editor = self._comment_part_editor(
+            self.comments_extended_path, "commentsExtended.xml"
+        )
 
-        editor = self["word/commentsIds.xml"]
-        root = editor.get_node(tag="w16cid:commentsIds")
+        parts = []
+        for entry in entries:
+            if entry["parent_para_id"]:
+                parts.append(
+                    f'<w15:commentEx w15:paraId="{entry["para_id"]}" w15:paraIdParent="{entry["parent_para_id"]}" w15:done="0"/>'
+                )
+            else:
+                parts.append(
+                    f'<w15:commentEx w15:paraId="{entry["para_id"]}" w15:done="0"/>'
+                )
+        editor.append_to(editor.root, "".join(parts))
 
-        xml = f'<w16cid:commentId w16cid:paraId="{para_id}" w16cid:durableId="{durable_id}"/>'
-        editor.append_to(root, xml)
+    def _add_to_comments_ids_xml(self, entries):
+        """Add comments to commentsIds.xml."""
+        editor = self._comment_part_editor(self.comments_ids_path, "commentsIds.xml")
 
-    def _add_to_comments_extensible_xml(self, durable_id):
-        """Add a single comment to commentsExtensible.xml."""
-        if not self.comments_extensible_path.exists():
-            shutil.copy(
-                TEMPLATE_DIR / "commentsExtensible.xml", self.comments_extensible_path
-            )
+        xml = "".join(
+            f'<w16cid:commentId w16cid:paraId="{entry["para_id"]}" w16cid:durableId="{entry["durable_id"]}"/>'
+            for entry in entries
+        )
+        editor.append_to(editor.root, xml)
 
-        editor = self["word/commentsExtensible.xml"]
-        root = editor.get_node(tag="w16cex:commentsExtensible")
+    def _add_to_comments_extensible_xml(self, entries):
+        """Add comments to commentsExtensible.xml."""
+        editor = self._comment_part_editor(
+            self.comments_extensible_path, "commentsExtensible.xml"
+        )
 
-        xml = f'<w16cex:commentExtensible w16cex:durableId="{durable_id}"/>'
-        editor.append_to(root, xml)
+        xml = "".join(
+            f'<w16cex:commentExtensible w16cex:durableId="{entry["durable_id"]}"/>'
+            for entry in entries
+        )
+        editor.append_to(editor.root, xml)
 
     # ==================== Private: XML Fragments ====================
 
@@ -1159,21 +1440,21 @@ class Document:
 
     def _has_relationship(self, editor, target):
         """Check if a relationship with given target exists."""
-        for rel_elem in editor.dom.getElementsByTagName("Relationship"):
+        for rel_elem in editor.find_all("Relationship"):
             if rel_elem.getAttribute("Target") == target:
                 return True
         return False
 
     def _has_override(self, editor, part_name):
         """Check if an override with given part name exists."""
-        for override_elem in editor.dom.getElementsByTagName("Override"):
+        for override_elem in editor.find_all("Override"):
             if override_elem.getAttribute("PartName") == part_name:
                 return True
         return False
 
     def _has_author(self, editor, author):
         """Check if an author already exists in people.xml."""
-        for person_elem in editor.dom.getElementsByTagName("w15:person"):
+        for person_elem in editor.find_all("w15:person"):
             if person_elem.getAttribute("w15:author") == author:
                 return True
         return False
@@ -1187,7 +1468,7 @@ class Document:
             raise ValueError("people.xml should exist after _setup_tracking")
 
         editor = self["word/people.xml"]
-        root = editor.get_node(tag="w15:people")
+        root = editor.root
 
         # Check if author already exists
         if self._has_author(editor, author):
@@ -1207,7 +1488,7 @@ class Document:
         if self._has_relationship(editor, "comments.xml"):
             return
 
-        root = editor.dom.documentElement
+        root = editor.root
         root_tag = root.tagName  # type: ignore
         prefix = root_tag.split(":")[0] + ":" if ":" in root_tag else ""
         next_rid_num = int(editor.get_next_rid()[3:])
@@ -1247,7 +1528,7 @@ class Document:
         if self._has_override(editor, "/word/comments.xml"):
             return
 
-        root = editor.dom.documentElement
+        root = editor.root
 
         # Add Override elements
         overrides = [
@@ -31,6 +31,9 @@ Example usage:
 """
 
 import html
+import os
+import shutil
+import tempfile
 from pathlib import Path
 from typing import Optional, Union
 
@@ -50,6 +53,11 @@ class XMLEditor:
         xml_path: Path to the XML file being edited
         encoding: Detected encoding of the XML file ('ascii' or 'utf-8')
         dom: Parsed DOM tree with parse_position attributes on elements
+        root: Document element of the tree; unlike `dom`, reading it (or calling
+            find_all()) does not flag the editor as dirty
+        dirty: True if the DOM may differ from the file. Edits made through `dom` or
+            nodes returned by get_node() cannot be observed, so once either has been
+            handed out the editor stays dirty and save() always rewrites the file
     """
 
     def __init__(self, xml_path):
@@ -71,7 +79,48 @@ class XMLEditor:
         self.encoding = "ascii" if 'encoding="ascii"' in header else "utf-8"
 
         parser = _create_line_tracking_parser()
-        self.dom = defusedxml.minidom.parse(str(self.xml_path), parser)
+        self._dom = defusedxml.minidom.parse(str(self.xml_path), parser)
+        self._modified = False
+        self._exposed = False
+
+    @property
+    def dom(self):
+        """The parsed DOM tree; accessing it flags the editor as dirty."""
+        self._exposed = True
+        return self._dom
+
+    @property
+    def root(self):
+        """
+        The document element, without flagging the editor as dirty.
+
+        For lookups and as an anchor for append_to() and the other insertion
+        methods; edit it only through those methods or call mark_dirty().
+        """
+        return self._dom.documentElement
+
+    def find_all(self, tag):
+        """
+        Get all elements with the given tag, without flagging the editor as dirty.
+
+        Like `root`, this is for lookups: edit the returned elements only through
+        the insertion and replacement methods, or call mark_dirty() afterwards.
+
+        Args:
+            tag: The XML tag name (e.g., "w:comment", "Relationship")
+
+        Returns:
+            List of defusedxml.minidom.Element in document order
+        """
+        return self._dom.getElementsByTagName(tag)
+
+    @property
+    def dirty(self):
+        return self._modified or self._exposed
+
+    @dirty.setter
+    def dirty(self, value):
+        self._modified = value
 
     def get_node(
         self,
@@ -110,7 +159,7 @@ class XMLEditor:
             elem = editor.get_node(tag="w:t", contains="\u201cAgreement")   # Unicode character
         """
         matches = []
-        for elem in self.dom.getElementsByTagName(tag):
+        for elem in self.find_all(tag):
             # Check line_number filter
             if line_number is not None:
                 parse_pos = getattr(elem, "parse_position", (None,))
@@ -178,6 +227,8 @@ class XMLEditor:
                 f"Multiple nodes found: <{tag}>. "
                 f"Add more filters (attrs, line_number, or contains) to narrow the search."
             )
+        # The caller may edit the node directly
+        self._exposed = True
         return matches[0]
 
     def _get_element_text(self, elem):
@@ -222,6 +273,7 @@ class XMLEditor:
         for node in nodes:
             parent.insertBefore(node, elem)
         parent.removeChild(elem)
+        self.dirty = True
         return nodes
 
     def insert_after(self, elem, xml_content):
@@ -246,6 +298,7 @@ class XMLEditor:
                 parent.insertBefore(node, next_sibling)
             else:
                 parent.appendChild(node)
+        self.dirty = True
         return nodes
 
     def insert_before(self, elem, xml_content):
@@ -266,6 +319,7 @@ class XMLEditor:
         nodes = self._parse_fragment(xml_content)
         for node in nodes:
             parent.insertBefore(node, elem)
+        self.dirty = True
         return nodes
 
     def append_to(self, elem, xml_content):
@@ -285,12 +339,13 @@ class XMLEditor:
         nodes = self._parse_fragment(xml_content)
         for node in nodes:
             elem.appendChild(node)
+        self.dirty = True
         return nodes
 
     def get_next_rid(self):
         """Get the next available rId for relationships files."""
         max_id = 0
-        for rel_elem in self.dom.getElementsByTagName("Relationship"):
+        for rel_elem in self.find_all("Relationship"):
             rel_id = rel_elem.getAttribute("Id")
             if rel_id.startswith("rId"):
                 try:
@@ -299,15 +354,43 @@ class XMLEditor:
                     pass
         return f"rId{max_id + 1}"
 
+    def mark_dirty(self):
+        """
+        Flag the DOM as modified.
+
+        The insertion and replacement methods do this automatically, and so does
+        handing out `dom` or a node from get_node(). Call it after editing nodes
+        reached some other way (e.g. from a node returned by replace_node()).
+        """
+        self.dirty = True
+
     def save(self):
         """
         Save the edited XML back to the file.
 
-        Serializes the DOM tree and writes it back to the original file path,
-        preserving the original encoding (ascii or utf-8).
+        Streams the DOM tree to a temporary file next to the original and renames
+        it into place, preserving the original encoding (ascii or utf-8). The output
+        is byte-identical to dom.toxml() without building the whole document in memory.
         """
-        content = self.dom.toxml(encoding=self.encoding)
-        self.xml_path.write_bytes(content)
+        fd, temp_path = tempfile.mkstemp(
+            dir=self.xml_path.parent, prefix=f".{self.xml_path.name}.", suffix=".tmp"
+        )
+        try:
+            # Same writer settings as minidom's toxml(encoding=...)
+            with open(
+                fd,
+                "w",
+                encoding=self.encoding,
+                errors="xmlcharrefreplace",
+                newline="\n",
+            ) as f:
+                self._dom.writexml(f, encoding=self.encoding)
+            shutil.copymode(self.xml_path, temp_path)
+            os.replace(temp_path, self.xml_path)
+        except BaseException:
+            Path(temp_path).unlink(missing_ok=True)
+            raise
+        self.dirty = False
 
     def _parse_fragment(self, xml_content):
         """
@@ -323,7 +406,7 @@ class XMLEditor:
             AssertionError: If fragment contains no element nodes
         """
         # Extract namespace declarations from the root document element
-        root_elem = self.dom.documentElement
+        root_elem = self._dom.documentElement
         namespaces = []
         if root_elem and root_elem.attributes:
             for i in range(root_elem.attributes.length):
@@ -335,7 +418,7 @@ class XMLEditor:
         wrapper = f"<root {ns_decl}>{xml_content}</root>"
         fragment_doc = defusedxml.minidom.parseString(wrapper)
         nodes = [
-            self.dom.importNode(child, deep=True)
+            self._dom.importNode(child, deep=True)
             for child in fragment_doc.documentElement.childNodes  # type: ignore
         ]
         elements = [n for n in nodes if n.nodeType == n.ELEMENT_NODE]
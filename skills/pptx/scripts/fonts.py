@@ -0,0 +1,339 @@
+#!/usr/bin/env python3
+"""
+Locate system font files by family name and measure text with them.
+
+Scanning font directories and opening every font to read its name table is
+slow, so the result is kept in a small JSON index under the user cache
+directory. The index records the modification time of every directory it
+scanned and is rebuilt when any of them changes, which happens whenever a font
+is installed or removed.
+
+Classes:
+    FontIndex: Family/style/filename -> font path mapping backed by a disk cache
+    TextMeasurer: Cached text widths and line wrapping for one font and size
+
+Main Functions:
+    get_font_path: Resolve a font name using the shared default index
+    get_text_measurer: Return a shared TextMeasurer for a font path and size
+
+Usage:
+    python fonts.py Arial            # print the resolved path
+    python fonts.py --rebuild        # rescan font directories
+"""
+
+import argparse
+import json
+import os
+import platform
+import sys
+import tempfile
+from functools import lru_cache
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from PIL import ImageFont
+
+CACHE_VERSION = 1
+
+if platform.system() == "Darwin":
+    FONT_DIRS = ["/System/Library/Fonts/", "/Library/Fonts/", "~/Library/Fonts/"]
+    FONT_EXTENSIONS = (".ttf", ".otf", ".ttc", ".dfont")
+else:
+    FONT_DIRS = [
+        "/usr/share/fonts/",
+        "/usr/local/share/fonts/",
+        "~/.fonts/",
+        "~/.local/share/fonts/",
+    ]
+    FONT_EXTENSIONS = (".ttf", ".otf")
+
+REGULAR_STYLES = ("regular", "normal", "book", "roman", "")
+
+# Number of (font file, size) pairs kept loaded for text measurement
+MEASURER_CACHE_SIZE = 64
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Resolve font names to font files using a cached index."
+    )
+    parser.add_argument("names", nargs="*", help="Font names to resolve")
+    parser.add_argument(
+        "--rebuild", action="store_true", help="Rescan font directories"
+    )
+    args = parser.parse_args()
+
+    index = FontIndex(rebuild=args.rebuild)
+    if args.rebuild or not args.names:
+        print(f"Indexed {len(index.fonts)} fonts into {index.cache_path}")
+    for name in args.names:
+        print(f"{name}: {index.lookup(name) or 'not found'}")
+    sys.exit(0)
+
+
+def normalize_font_name(name: str) -> str:
+    """Fold a font name so 'Open Sans', 'open-sans' and 'OpenSans' compare equal."""
+    return "".join(ch for ch in name.lower() if ch.isalnum())
+
+
+def default_cache_path() -> Path:
+    """Return the location of the font index cache file."""
+    base = os.environ.get("XDG_CACHE_HOME") or Path.home() / ".cache"
+    return Path(base) / "pptx-skill" / "font-index.json"
+
+
+class FontIndex:
+    """Mapping from font family, style and filename to font file paths.
+
+    Lookups are a single dictionary access once a name has been seen. Names
+    that only match by substring are resolved once and memoized, so the fuzzy
+    fallback is paid at most once per distinct name.
+    """
+
+    def __init__(
+        self,
+        font_dirs: Optional[List[str]] = None,
+        cache_path: Optional[Path] = None,
+        rebuild: bool = False,
+    ):
+        """Load the index from the disk cache, rescanning if it is stale.
+
+        Args:
+            font_dirs: Directories to scan recursively (defaults to FONT_DIRS)
+            cache_path: Cache file location, or None for the default location
+            rebuild: Ignore any existing cache and rescan
+        """
+        self.font_dirs = [str(Path(d).expanduser()) for d in (font_dirs or FONT_DIRS)]
+        self.cache_path = cache_path or default_cache_path()
+        self.fonts: Dict[str, List[str]] = {}  # path -> [family, style]
+        self._dir_mtimes: Dict[str, int] = {}
+        self._resolved: Dict[str, Optional[str]] = {}
+
+        if rebuild or not self._load_cache():
+            self._scan()
+            self._save_cache()
+        self._build_keys()
+
+    def fingerprint(self) -> str:
+        """Return a string that changes whenever the indexed fonts change."""
+        return json.dumps(self._dir_mtimes, sort_keys=True)
+
+    def lookup(self, font_name: str) -> Optional[str]:
+        """Get the font file path for a font name.
+
+        Args:
+            font_name: Family name, 'Family Style' or file stem (e.g. 'Arial',
+                'Arial Bold', 'DejaVuSans-Bold')
+
+        Returns:
+            Path to the font file, or None if not found
+        """
+        try:
+            return self._resolved[font_name]
+        except KeyError:
+            path = self._resolve(normalize_font_name(font_name))
+            self._resolved[font_name] = path
+            return path
+
+    def _resolve(self, key: str) -> Optional[str]:
+        if not key:
+            return None
+        if key in self._keys:
+            return self._keys[key]
+        # Fall back to the first file whose name contains the requested name
+        for stem, path in self._stems:
+            if key in stem:
+                return path
+        return None
+
+    def _build_keys(self) -> None:
+        """Build the name -> path lookup table from the scanned fonts."""
+        by_stem: Dict[str, str] = {}
+        by_style: Dict[str, str] = {}
+        by_family: Dict[str, str] = {}
+        by_regular: Dict[str, str] = {}
+        stems = []
+
+        for path in sorted(self.fonts):
+            family, style = self.fonts[path]
+            family_key = normalize_font_name(family)
+            style_key = normalize_font_name(style)
+            stem = normalize_font_name(Path(path).stem)
+            stems.append((stem, path))
+
+            by_stem.setdefault(stem, path)
+            by_style.setdefault(family_key + style_key, path)
+            # A bare family name prefers the regular face, then any face
+            if style_key in REGULAR_STYLES:
+                by_regular.setdefault(family_key, path)
+            by_family.setdefault(family_key, path)
+
+        by_family.update(by_regular)
+
+        # Family names win over 'Family Style', which wins over file stems
+        self._keys = {**by_stem, **by_style, **by_family}
+        self._stems = stems
+
+    def _scan(self) -> None:
+        """Walk the font directories and read each font's family and style."""
+        self.fonts = {}
+        self._dir_mtimes = {}
+
+        for font_dir in self.font_dirs:
+            for root, _dirs, files in os.walk(font_dir):
+                try:
+                    self._dir_mtimes[root] = os.stat(root).st_mtime_ns
+                except OSError:
+                    continue
+                for file_name in files:
+                    if not file_name.lower().endswith(FONT_EXTENSIONS):
+                        continue
+                    path = os.path.join(root, file_name)
+                    family, style = self._read_names(path)
+                    self.fonts[path] = [family, style]
+
+    @staticmethod
+    def _read_names(path: str) -> List[str]:
+        """Read family and style from a font's name table, or guess from its name."""
+        try:
+            family, style = ImageFont.truetype(path, size=12).getname()
+            if family:
+                return [family, style or ""]
+        except Exception:
+            pass
+        return [Path(path).stem, ""]
+
+    def _is_fresh(self) -> bool:
+        """Check the cached directory mtimes against the file system."""
+        for font_dir in self.font_dirs:
+            if os.path.isdir(font_dir) != (font_dir in self._dir_mtimes):
+                return False
+        for directory, mtime in self._dir_mtimes.items():
+            try:
+                if os.stat(directory).st_mtime_ns != mtime:
+                    return False
+            except OSError:
+                return False
+        return True
+
+    def _load_cache(self) -> bool:
+        try:
+            with open(self.cache_path, encoding="utf-8") as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return False
+
+        if data.get("version") != CACHE_VERSION or data.get("dirs") != self.font_dirs:
+            return False
+        self.fonts = data.get("fonts", {})
+        self._dir_mtimes = data.get("mtimes", {})
+        return self._is_fresh()
+
+    def _save_cache(self) -> None:
+        data = {
+            "version": CACHE_VERSION,
+            "dirs": self.font_dirs,
+            "mtimes": self._dir_mtimes,
+            "fonts": self.fonts,
+        }
+        try:
+            self.cache_path.parent.mkdir(parents=True, exist_ok=True)
+            fd, tmp_path = tempfile.mkstemp(dir=self.cache_path.parent, suffix=".tmp")
+            with open(fd, "w", encoding="utf-8") as f:
+                json.dump(data, f)
+            os.replace(tmp_path, self.cache_path)
+        except OSError:
+            # A read-only cache directory only costs a rescan next time
+            pass
+
+
+_default_index: Optional[FontIndex] = None
+
+
+def get_font_index() -> FontIndex:
+    """Return the shared font index, loading it on first use."""
+    global _default_index
+    if _default_index is None:
+        _default_index = FontIndex()
+    return _default_index
+
+
+def get_font_path(font_name: str) -> Optional[str]:
+    """Get the font file path for a font name using the shared index."""
+    return get_font_index().lookup(font_name)
+
+
+class TextMeasurer:
+    """Text width measurement for one loaded font at one size.
+
+    Word widths are cached per measurer, so wrapping a line sums cached
+    widths instead of re-measuring a growing prefix for every word.
+    """
+
+    def __init__(self, font: Any):
+        self.font = font
+        self._widths: Dict[str, float] = {}
+        self.space_width = self.width(" ")
+
+    def width(self, text: str) -> float:
+        """Return the advance width of text in pixels."""
+        try:
+            return self._widths[text]
+        except KeyError:
+            width = self.font.getlength(text)
+            self._widths[text] = width
+            return width
+
+    def wrap_line(self, line: str, max_width_px: float) -> List[str]:
+        """Wrap a single line of text to fit within max_width_px."""
+        if not line:
+            return [""]
+
+        if self.width(line) <= max_width_px:
+            return [line]
+
+        # Need to wrap - split into words
+        wrapped = []
+        current_line = ""
+        current_width = 0.0
+
+        for word in line.split(" "):
+            word_width = self.width(word)
+            if current_line:
+                test_width = current_width + self.space_width + word_width
+            else:
+                test_width = word_width
+            if test_width <= max_width_px:
+                current_line = f"{current_line} {word}" if current_line else word
+                current_width = test_width
+            else:
+                if current_line:
+                    wrapped.append(current_line)
+                current_line = word
+                current_width = word_width
+
+        if current_line:
+            wrapped.append(current_line)
+
+        return wrapped
+
+
+@lru_cache(maxsize=MEASURER_CACHE_SIZE)
+def get_text_measurer(font_path: Optional[str], size: int) -> TextMeasurer:
+    """Return a shared measurer for a font file and size.
+
+    Falls back to Pillow's default font when font_path is None or cannot be
+    loaded. The least recently used fonts are dropped once more than
+    MEASURER_CACHE_SIZE font/size pairs are in use.
+    """
+    font = None
+    if font_path:
+        try:
+            font = ImageFont.truetype(font_path, size=size)
+        except Exception:
+            pass
+    return TextMeasurer(font or ImageFont.load_default())
+
+
+if __name__ == "__main__":
+    main()
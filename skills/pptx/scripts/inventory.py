@@ -16,6 +16,10 @@ Classes:
 
 Main Functions:
     extract_text_inventory: Extract all text from a presentation
+    extract_text_inventory_parallel: Same, with slides sharded across processes
+    iter_inventory: Serialized inventory streamed one slide at a time
+    get_inventory_as_dict: Serialized inventory using the cache or XML backend
+    write_inventory_ndjson: Write streamed records as newline-delimited JSON
     save_inventory: Save extracted data to JSON
 
 Usage:
@@ -24,16 +28,25 @@ Usage:
 
 import argparse
 import json
-import platform
 import sys
+import zipfile
+from concurrent.futures import ProcessPoolExecutor
 from dataclasses import dataclass
 from pathlib import Path
-from typing import Any, Dict, List, Optional, Tuple, Union
+from typing import Any, Dict, Iterable, Iterator, List, Optional, TextIO, Tuple, Union
+from xml.etree import ElementTree
 
-from PIL import Image, ImageDraw, ImageFont
 from pptx import Presentation
+from pptx.dml.color import RGBColor
+from pptx.enum.dml import MSO_THEME_COLOR
 from pptx.enum.text import PP_ALIGN
 from pptx.shapes.base import BaseShape
+from pptx.text.text import Font
+
+from fonts import get_font_path, get_text_measurer
+from inventory_cache import InventoryCache
+from rect_index import find_overlapping_pairs
+from style_index import DEFAULT_TEXT_STYLE, StyleIndex, TextStyle
 
 # Type aliases for cleaner signatures
 JsonValue = Union[str, int, float, bool, None]
@@ -46,6 +59,11 @@ InventoryData = Dict[
 ]  # Dict of slide_id -> {shape_id -> ShapeData}
 InventoryDict = Dict[str, Dict[str, ShapeDict]]  # JSON-serializable inventory
 
+A_NS = "{http://schemas.openxmlformats.org/drawingml/2006/main}"
+
+# "pptx" walks python-pptx shape objects, "xml" reads the slide parts directly
+BACKENDS = ("pptx", "xml")
+
 
 def main():
     """Main entry point for command-line usage."""
@@ -60,6 +78,19 @@ Examples:
   python inventory.py presentation.pptx inventory.json --issues-only
     Extracts only text shapes that have overflow or overlap issues
 
+  python inventory.py presentation.pptx inventory.json --jobs 4
+    Processes slides in 4 worker processes (useful for large decks)
+
+  python inventory.py presentation.pptx inventory.json --backend xml
+    Reads slide XML directly instead of through python-pptx (faster, same output)
+
+  python inventory.py presentation.pptx - --ndjson --slides 40-45
+    Streams one JSON line per slide for slides 40 to 45 to stdout as they are done
+    (--records shape writes one line per shape instead)
+
+Unchanged slides are read from a per-slide cache under ~/.cache/pptx-skill
+(or $XDG_CACHE_HOME); use --no-cache to recompute everything.
+
 The output JSON includes:
   - All text content organized by slide and shape
   - Correct absolute positions for shapes in groups
@@ -70,55 +101,133 @@ The output JSON includes:
     )
 
     parser.add_argument("input", help="Input PowerPoint file (.pptx)")
-    parser.add_argument("output", help="Output JSON file for inventory")
+    parser.add_argument(
+        "output", help="Output JSON file for inventory ('-' for stdout with --ndjson)"
+    )
     parser.add_argument(
         "--issues-only",
         action="store_true",
         help="Include only text shapes that have overflow or overlap issues",
     )
+    parser.add_argument(
+        "--slides",
+        help="Slides to include as 0-based indices and ranges, e.g. '0,3-5,10-' "
+        "(default: all)",
+    )
+    parser.add_argument(
+        "--ndjson",
+        action="store_true",
+        help="Write one JSON record per line as each slide is processed",
+    )
+    parser.add_argument(
+        "--records",
+        choices=("slide", "shape"),
+        default="slide",
+        help="With --ndjson, write one record per slide or per shape (default: slide)",
+    )
+    parser.add_argument(
+        "--jobs",
+        "-j",
+        type=int,
+        default=1,
+        help="Number of worker processes to shard slides across (default: 1)",
+    )
+    parser.add_argument(
+        "--backend",
+        choices=BACKENDS,
+        default="pptx",
+        help="Read slides through python-pptx or directly from the slide XML "
+        "(default: pptx)",
+    )
+    parser.add_argument(
+        "--no-cache",
+        action="store_true",
+        help="Recompute every slide instead of reusing the on-disk inventory cache",
+    )
 
     args = parser.parse_args()
 
+    # Keep stdout clean for records when streaming to it
+    to_stdout = args.ndjson and args.output == "-"
+    log = sys.stderr if to_stdout else sys.stdout
+
     input_path = Path(args.input)
     if not input_path.exists():
-        print(f"Error: Input file not found: {args.input}")
+        print(f"Error: Input file not found: {args.input}", file=log)
         sys.exit(1)
 
     if not input_path.suffix.lower() == ".pptx":
-        print("Error: Input must be a PowerPoint file (.pptx)")
+        print("Error: Input must be a PowerPoint file (.pptx)", file=log)
         sys.exit(1)
 
+    slide_indices = None
+    if args.slides:
+        try:
+            slide_indices = parse_slide_range(args.slides, count_slides(input_path))
+        except ValueError as e:
+            print(f"Error: {e}", file=log)
+            sys.exit(1)
+
     try:
-        print(f"Extracting text inventory from: {args.input}")
+        print(f"Extracting text inventory from: {args.input}", file=log)
         if args.issues_only:
             print(
-                "Filtering to include only text shapes with issues (overflow/overlap)"
+                "Filtering to include only text shapes with issues (overflow/overlap)",
+                file=log,
+            )
+        if args.ndjson:
+            slides = iter_inventory(
+                input_path,
+                issues_only=args.issues_only,
+                jobs=args.jobs,
+                use_cache=not args.no_cache,
+                backend=args.backend,
+                slide_indices=slide_indices,
+            )
+            if to_stdout:
+                counts = write_inventory_ndjson(slides, sys.stdout, args.records)
+            else:
+                output_path = Path(args.output)
+                output_path.parent.mkdir(parents=True, exist_ok=True)
+                with open(output_path, "w", encoding="utf-8") as f:
+                    counts = write_inventory_ndjson(slides, f, args.records)
+            total_slides, total_shapes = counts
+        else:
+            inventory = get_inventory_as_dict(
+                input_path,
+                issues_only=args.issues_only,
+                jobs=args.jobs,
+                use_cache=not args.no_cache,
+                backend=args.backend,
+                slide_indices=slide_indices,
             )
-        inventory = extract_text_inventory(input_path, issues_only=args.issues_only)
 
-        output_path = Path(args.output)
-        output_path.parent.mkdir(parents=True, exist_ok=True)
-        save_inventory(inventory, output_path)
+            output_path = Path(args.output)
+            output_path.parent.mkdir(parents=True, exist_ok=True)
+            save_inventory_dict(inventory, output_path)
+
+            total_slides = len(inventory)
+            total_shapes = sum(len(shapes) for shapes in inventory.values())
 
-        print(f"Output saved to: {args.output}")
+        print(f"Output saved to: {args.output}", file=log)
 
         # Report statistics
-        total_slides = len(inventory)
-        total_shapes = sum(len(shapes) for shapes in inventory.values())
         if args.issues_only:
             if total_shapes > 0:
                 print(
-                    f"Found {total_shapes} text elements with issues in {total_slides} slides"
+                    f"Found {total_shapes} text elements with issues in {total_slides} slides",
+                    file=log,
                 )
             else:
-                print("No issues discovered")
+                print("No issues discovered", file=log)
         else:
             print(
-                f"Found text in {total_slides} slides with {total_shapes} text elements"
+                f"Found text in {total_slides} slides with {total_shapes} text elements",
+                file=log,
             )
 
     except Exception as e:
-        print(f"Error processing presentation: {e}")
+        print(f"Error processing presentation: {e}", file=log)
         import traceback
 
         traceback.print_exc()
@@ -158,75 +267,91 @@ class ParagraphData:
         self.theme_color: Optional[str] = None
         self.line_spacing: Optional[float] = None
 
+        # Read properties from the XML elements directly: the paragraph and
+        # font proxies add empty <a:pPr/>, <a:rPr/> and <a:solidFill/> elements
+        # on access, and inventory must not modify the presentation
+        pPr = paragraph._p.pPr
+
         # Check for bullet formatting
-        if (
-            hasattr(paragraph, "_p")
-            and paragraph._p is not None
-            and paragraph._p.pPr is not None
-        ):
-            pPr = paragraph._p.pPr
-            ns = "{http://schemas.openxmlformats.org/drawingml/2006/main}"
+        if pPr is not None:
             if (
-                pPr.find(f"{ns}buChar") is not None
-                or pPr.find(f"{ns}buAutoNum") is not None
+                pPr.find(f"{A_NS}buChar") is not None
+                or pPr.find(f"{A_NS}buAutoNum") is not None
             ):
                 self.bullet = True
-                if hasattr(paragraph, "level"):
-                    self.level = paragraph.level
+                self.level = pPr.lvl
 
-        # Add alignment if not LEFT (default)
-        if hasattr(paragraph, "alignment") and paragraph.alignment is not None:
+            # Add alignment if not LEFT (default)
             alignment_map = {
                 PP_ALIGN.CENTER: "CENTER",
                 PP_ALIGN.RIGHT: "RIGHT",
                 PP_ALIGN.JUSTIFY: "JUSTIFY",
             }
-            if paragraph.alignment in alignment_map:
-                self.alignment = alignment_map[paragraph.alignment]
+            if pPr.algn in alignment_map:
+                self.alignment = alignment_map[pPr.algn]
 
-        # Add spacing properties if set
-        if hasattr(paragraph, "space_before") and paragraph.space_before:
-            self.space_before = paragraph.space_before.pt
-        if hasattr(paragraph, "space_after") and paragraph.space_after:
-            self.space_after = paragraph.space_after.pt
+            # Add spacing properties if set
+            if pPr.space_before:
+                self.space_before = pPr.space_before.pt
+            if pPr.space_after:
+                self.space_after = pPr.space_after.pt
 
         # Extract font properties from first run
-        if paragraph.runs:
-            first_run = paragraph.runs[0]
-            if hasattr(first_run, "font"):
-                font = first_run.font
-                if font.name:
-                    self.font_name = font.name
-                if font.size:
-                    self.font_size = font.size.pt
-                if font.bold is not None:
-                    self.bold = font.bold
-                if font.italic is not None:
-                    self.italic = font.italic
-                if font.underline is not None:
-                    self.underline = font.underline
-
-                # Handle color - both RGB and theme colors
-                try:
-                    # Try RGB color first
-                    if font.color.rgb:
-                        self.color = str(font.color.rgb)
-                except (AttributeError, TypeError):
-                    # Fall back to theme color
-                    try:
-                        if font.color.theme_color:
-                            self.theme_color = font.color.theme_color.name
-                    except (AttributeError, TypeError):
-                        pass
+        first_r = paragraph._p.find(f"{A_NS}r")
+        if first_r is not None and first_r.rPr is not None:
+            font = Font(first_r.rPr)
+            if font.name:
+                self.font_name = font.name
+            if font.size:
+                self.font_size = font.size.pt
+            if font.bold is not None:
+                self.bold = font.bold
+            if font.italic is not None:
+                self.italic = font.italic
+            if font.underline is not None:
+                self.underline = font.underline
+
+            # Handle color - both RGB and theme colors
+            self.color, self.theme_color = self.read_run_color(first_r)
 
         # Add line spacing if set
-        if hasattr(paragraph, "line_spacing") and paragraph.line_spacing is not None:
-            if hasattr(paragraph.line_spacing, "pt"):
-                self.line_spacing = round(paragraph.line_spacing.pt, 2)
+        if pPr is not None and pPr.line_spacing is not None:
+            if hasattr(pPr.line_spacing, "pt"):
+                self.line_spacing = round(pPr.line_spacing.pt, 2)
             else:
                 # Multiplier - convert to points
                 font_size = self.font_size if self.font_size else 12.0
-                self.line_spacing = round(paragraph.line_spacing * font_size, 2)
+                self.line_spacing = round(pPr.line_spacing * font_size, 2)
+
+    @staticmethod
+    def read_run_color(r: Any) -> Tuple[Optional[str], Optional[str]]:
+        """Read a run's solid fill color without modifying the run.
+
+        Args:
+            r: The run's <a:r> element
+
+        Returns:
+            Tuple of (rgb, theme_color): the RGB hex string for an sRGB color
+            or the theme color name (e.g. 'ACCENT_1') for a scheme color, each
+            None when the run has no such color
+        """
+        rPr = r.find(f"{A_NS}rPr")
+        solid_fill = rPr.find(f"{A_NS}solidFill") if rPr is not None else None
+        if solid_fill is None or len(solid_fill) == 0:
+            return None, None
+
+        color = solid_fill[0]
+        try:
+            if color.tag == f"{A_NS}srgbClr":
+                return str(RGBColor.from_string(color.get("val", ""))), None
+            if color.tag == f"{A_NS}schemeClr":
+                theme_color = MSO_THEME_COLOR.from_xml(color.get("val", ""))
+                if theme_color:
+                    return None, theme_color.name
+        except ValueError:
+            # Placeholder colors such as phClr have no theme color index
+            pass
+        return None, None
 
     def to_dict(self) -> ParagraphDict:
         """Convert to dictionary for JSON serialization, excluding None values."""
@@ -280,67 +405,16 @@ class ShapeData:
     def get_font_path(font_name: str) -> Optional[str]:
         """Get the font file path for a given font name.
 
+        Fonts are resolved through the cached font index in fonts.py, so this
+        is a dictionary lookup rather than a file system search.
+
         Args:
             font_name: Name of the font (e.g., 'Arial', 'Calibri')
 
         Returns:
             Path to the font file, or None if not found
         """
-        system = platform.system()
-
-        # Common font file variations to try
-        font_variations = [
-            font_name,
-            font_name.lower(),
-            font_name.replace(" ", ""),
-            font_name.replace(" ", "-"),
-        ]
-
-        # Define font directories and extensions by platform
-        if system == "Darwin":  # macOS
-            font_dirs = [
-                "/System/Library/Fonts/",
-                "/Library/Fonts/",
-                "~/Library/Fonts/",
-            ]
-            extensions = [".ttf", ".otf", ".ttc", ".dfont"]
-        else:  # Linux
-            font_dirs = [
-                "/usr/share/fonts/truetype/",
-                "/usr/local/share/fonts/",
-                "~/.fonts/",
-            ]
-            extensions = [".ttf", ".otf"]
-
-        # Try to find the font file
-        from pathlib import Path
-
-        for font_dir in font_dirs:
-            font_dir_path = Path(font_dir).expanduser()
-            if not font_dir_path.exists():
-                continue
-
-            # First try exact matches
-            for variant in font_variations:
-                for ext in extensions:
-                    font_path = font_dir_path / f"{variant}{ext}"
-                    if font_path.exists():
-                        return str(font_path)
-
-            # Then try fuzzy matching - find files containing the font name
-            try:
-                for file_path in font_dir_path.iterdir():
-                    if file_path.is_file():
-                        file_name_lower = file_path.name.lower()
-                        font_name_lower = font_name.lower().replace(" ", "")
-                        if font_name_lower in file_name_lower and any(
-                            file_name_lower.endswith(ext) for ext in extensions
-                        ):
-                            return str(file_path)
-            except (OSError, PermissionError):
-                continue
-
-        return None
+        return get_font_path(font_name)
 
     @staticmethod
     def get_slide_dimensions(slide: Any) -> tuple[Optional[int], Optional[int]]:
@@ -359,31 +433,39 @@ class ShapeData:
             return None, None
 
     @staticmethod
-    def get_default_font_size(shape: BaseShape, slide_layout: Any) -> Optional[float]:
-        """Extract default font size from slide layout for a placeholder shape.
+    def get_text_style(
+        shape: BaseShape, slide: Optional[Any], styles: StyleIndex
+    ) -> TextStyle:
+        """Resolve the default text style of a shape through its layout and master.
 
         Args:
-            shape: Placeholder shape
-            slide_layout: Slide layout containing the placeholder definition
+            shape: The shape to resolve
+            slide: Slide containing the shape, or None if unknown
+            styles: Style index of the presentation
 
         Returns:
-            Default font size in points, or None if not found
+            TextStyle including the shape's own list style and insets
         """
+        style = DEFAULT_TEXT_STYLE
         try:
-            if not hasattr(shape, "placeholder_format"):
-                return None
-
-            shape_type = shape.placeholder_format.type  # type: ignore
-            for layout_placeholder in slide_layout.placeholders:
-                if layout_placeholder.placeholder_format.type == shape_type:
-                    # Find first defRPr element with sz (size) attribute
-                    for elem in layout_placeholder.element.iter():
-                        if "defRPr" in elem.tag and (sz := elem.get("sz")):
-                            return float(sz) / 100.0  # Convert EMUs to points
-                    break
-        except Exception:
-            pass
-        return None
+            slide_layout = slide.slide_layout  # type: ignore
+            layout_elm = slide_layout.element
+            master_elm = slide_layout.slide_master.element
+        except AttributeError:
+            layout_elm = master_elm = None
+
+        if master_elm is not None:
+            if getattr(shape, "is_placeholder", False):
+                ph_format = shape.placeholder_format  # type: ignore
+                style = styles.placeholder_style(
+                    layout_elm, master_elm, ph_format.type, ph_format.idx
+                )
+            else:
+                style = styles.shape_style(master_elm)
+
+        if hasattr(shape, "text_frame"):
+            style = style.with_overrides(shape.text_frame._txBody)  # type: ignore
+        return style
 
     def __init__(
         self,
@@ -391,6 +473,7 @@ class ShapeData:
         absolute_left: Optional[int] = None,
         absolute_top: Optional[int] = None,
         slide: Optional[Any] = None,
+        styles: Optional[StyleIndex] = None,
     ):
         """Initialize from a PowerPoint shape object.
 
@@ -399,6 +482,8 @@ class ShapeData:
             absolute_left: Absolute left position in EMUs (for shapes in groups)
             absolute_top: Absolute top position in EMUs (for shapes in groups)
             slide: Optional slide object to get dimensions and layout information
+            styles: Style index shared by the presentation's shapes; a private
+                one is used if not given
         """
         self.shape = shape  # Store reference to original shape
         self.shape_id: str = ""  # Will be set after sorting
@@ -408,6 +493,10 @@ class ShapeData:
             self.get_slide_dimensions(slide) if slide else (None, None)
         )
 
+        # Default font sizes, line spacing and insets inherited from the
+        # layout and master
+        self.text_style = self.get_text_style(shape, slide, styles or StyleIndex())
+
         # Get placeholder type if applicable
         self.placeholder_type: Optional[str] = None
         self.default_font_size: Optional[float] = None
@@ -416,12 +505,7 @@ class ShapeData:
                 self.placeholder_type = (
                     str(shape.placeholder_format.type).split(".")[-1].split(" ")[0]  # type: ignore
                 )
-
-                # Get default font size from layout
-                if slide and hasattr(slide, "slide_layout"):
-                    self.default_font_size = self.get_default_font_size(
-                        shape, slide.slide_layout
-                    )
+                self.default_font_size = self.text_style.font_size(0)
 
         # Get position information
         # Use absolute positions if provided (for shapes in groups), otherwise use shape's position
@@ -477,53 +561,15 @@ class ShapeData:
                 paragraphs.append(ParagraphData(paragraph))
         return paragraphs
 
-    def _get_default_font_size(self) -> int:
-        """Get default font size from theme text styles or use conservative default."""
-        try:
-            if not (
-                hasattr(self.shape, "part") and hasattr(self.shape.part, "slide_layout")
-            ):
-                return 14
-
-            slide_master = self.shape.part.slide_layout.slide_master  # type: ignore
-            if not hasattr(slide_master, "element"):
-                return 14
-
-            # Determine theme style based on placeholder type
-            style_name = "bodyStyle"  # Default
-            if self.placeholder_type and "TITLE" in self.placeholder_type:
-                style_name = "titleStyle"
-
-            # Find font size in theme styles
-            for child in slide_master.element.iter():
-                tag = child.tag.split("}")[-1] if "}" in child.tag else child.tag
-                if tag == style_name:
-                    for elem in child.iter():
-                        if "sz" in elem.attrib:
-                            return int(elem.attrib["sz"]) // 100
-        except Exception:
-            pass
-
-        return 14  # Conservative default for body text
-
-    def _get_usable_dimensions(self, text_frame) -> Tuple[int, int]:
+    def _get_usable_dimensions(self) -> Tuple[int, int]:
         """Get usable width and height in pixels after accounting for margins."""
-        # Default PowerPoint margins in inches
-        margins = {"top": 0.05, "bottom": 0.05, "left": 0.1, "right": 0.1}
-
-        # Override with actual margins if set
-        if hasattr(text_frame, "margin_top") and text_frame.margin_top:
-            margins["top"] = self.emu_to_inches(text_frame.margin_top)
-        if hasattr(text_frame, "margin_bottom") and text_frame.margin_bottom:
-            margins["bottom"] = self.emu_to_inches(text_frame.margin_bottom)
-        if hasattr(text_frame, "margin_left") and text_frame.margin_left:
-            margins["left"] = self.emu_to_inches(text_frame.margin_left)
-        if hasattr(text_frame, "margin_right") and text_frame.margin_right:
-            margins["right"] = self.emu_to_inches(text_frame.margin_right)
+        left, top, right, bottom = (
+            self.emu_to_inches(inset) for inset in self.text_style.insets
+        )
 
         # Calculate usable area
-        usable_width = self.width - margins["left"] - margins["right"]
-        usable_height = self.height - margins["top"] - margins["bottom"]
+        usable_width = self.width - left - right
+        usable_height = self.height - top - bottom
 
         # Convert to pixels
         return (
@@ -531,34 +577,6 @@ class ShapeData:
             self.inches_to_pixels(usable_height),
         )
 
-    def _wrap_text_line(self, line: str, max_width_px: int, draw, font) -> List[str]:
-        """Wrap a single line of text to fit within max_width_px."""
-        if not line:
-            return [""]
-
-        # Use textlength for efficient width calculation
-        if draw.textlength(line, font=font) <= max_width_px:
-            return [line]
-
-        # Need to wrap - split into words
-        wrapped = []
-        words = line.split(" ")
-        current_line = ""
-
-        for word in words:
-            test_line = current_line + (" " if current_line else "") + word
-            if draw.textlength(test_line, font=font) <= max_width_px:
-                current_line = test_line
-            else:
-                if current_line:
-                    wrapped.append(current_line)
-                current_line = word
-
-        if current_line:
-            wrapped.append(current_line)
-
-        return wrapped
-
     def _estimate_frame_overflow(self) -> None:
         """Estimate if text overflows the shape bounds using PIL text measurement."""
         if not self.shape or not hasattr(self.shape, "text_frame"):
@@ -569,17 +587,10 @@ class ShapeData:
             return
 
         # Get usable dimensions after accounting for margins
-        usable_width_px, usable_height_px = self._get_usable_dimensions(text_frame)
+        usable_width_px, usable_height_px = self._get_usable_dimensions()
         if usable_width_px <= 0 or usable_height_px <= 0:
             return
 
-        # Set up PIL for text measurement
-        dummy_img = Image.new("RGB", (1, 1))
-        draw = ImageDraw.Draw(dummy_img)
-
-        # Get default font size from placeholder or use conservative estimate
-        default_font_size = self._get_default_font_size()
-
         # Calculate total height of all paragraphs
         total_height_px = 0
 
@@ -588,32 +599,33 @@ class ShapeData:
                 continue
 
             para_data = ParagraphData(paragraph)
+            pPr = paragraph._p.pPr
+            level = pPr.lvl if pPr is not None else 0
 
-            # Load font for this paragraph
+            # Load font for this paragraph, falling back to the inherited size
+            # or a conservative estimate
             font_name = para_data.font_name or "Arial"
-            font_size = int(para_data.font_size or default_font_size)
-
-            font = None
-            font_path = self.get_font_path(font_name)
-            if font_path:
-                try:
-                    font = ImageFont.truetype(font_path, size=font_size)
-                except Exception:
-                    font = ImageFont.load_default()
-            else:
-                font = ImageFont.load_default()
+            font_size = int(
+                para_data.font_size or self.text_style.font_size(level) or 14
+            )
+
+            measurer = get_text_measurer(self.get_font_path(font_name), font_size)
 
             # Wrap all lines in this paragraph
             all_wrapped_lines = []
             for line in paragraph.text.split("\n"):
-                wrapped = self._wrap_text_line(line, usable_width_px, draw, font)
+                wrapped = measurer.wrap_line(line, usable_width_px)
                 all_wrapped_lines.extend(wrapped)
 
             if all_wrapped_lines:
                 # Calculate line height
+                inherited_spacing = self.text_style.line_spacing(level, font_size)
                 if para_data.line_spacing:
                     # Custom line spacing explicitly set
                     line_height_px = para_data.line_spacing * 96 / 72
+                elif inherited_spacing:
+                    # Line spacing from the layout or master text styles
+                    line_height_px = inherited_spacing * 96 / 72
                 else:
                     # PowerPoint default single spacing (1.0x font size)
                     line_height_px = font_size * 96 / 72
@@ -888,31 +900,94 @@ def detect_overlaps(shapes: List[ShapeData]) -> None:
     Args:
         shapes: List of ShapeData objects with shape_id attributes set
     """
-    n = len(shapes)
+    for i, shape in enumerate(shapes):
+        # Ensure shape IDs are set
+        assert shape.shape_id, f"Shape at index {i} has no shape_id"
+
+    rects = [(shape.left, shape.top, shape.width, shape.height) for shape in shapes]
+    boxes = [(left, top, left + w, top + h) for left, top, w, h in rects]
+
+    # Only measure pairs whose boxes intersect, in the same order as a full
+    # pairwise scan so the overlapping_shapes dicts keep their key order
+    for i, j in find_overlapping_pairs(boxes):
+        overlaps, overlap_area = calculate_overlap(rects[i], rects[j])
+
+        if overlaps:
+            # Add shape IDs with overlap area in square inches
+            shapes[i].overlapping_shapes[shapes[j].shape_id] = overlap_area
+            shapes[j].overlapping_shapes[shapes[i].shape_id] = overlap_area
+
+
+def extract_slide_shapes(
+    slide: Any, issues_only: bool = False, styles: Optional[StyleIndex] = None
+) -> List[ShapeData]:
+    """Extract the text shapes of a single slide.
+
+    Args:
+        slide: The PowerPoint slide object
+        issues_only: If True, only include shapes that have overflow or overlap issues
+        styles: Style index of the presentation, shared across its slides
+
+    Returns:
+        ShapeData objects sorted by visual position with stable shape-N IDs set
+        and overlaps detected
+    """
+    # Collect all valid shapes from this slide with absolute positions
+    shapes_with_positions = []
+    for shape in slide.shapes:  # type: ignore
+        shapes_with_positions.extend(collect_shapes_with_absolute_positions(shape))
+
+    if not shapes_with_positions:
+        return []
+
+    # Convert to ShapeData with absolute positions and slide reference
+    styles = styles or StyleIndex()
+    shape_data_list = [
+        ShapeData(
+            swp.shape,
+            swp.absolute_left,
+            swp.absolute_top,
+            slide,
+            styles,
+        )
+        for swp in shapes_with_positions
+    ]
+    return finish_slide_shapes(shape_data_list, issues_only)
+
+
+def finish_slide_shapes(
+    shape_data_list: List[ShapeData], issues_only: bool = False
+) -> List[ShapeData]:
+    """Sort a slide's shapes, assign shape-N IDs and detect overlaps.
 
-    # Compare each pair of shapes
-    for i in range(n):
-        for j in range(i + 1, n):
-            shape1 = shapes[i]
-            shape2 = shapes[j]
+    Args:
+        shape_data_list: ShapeData objects of one slide in document order
+        issues_only: If True, only keep shapes that have overflow or overlap issues
 
-            # Ensure shape IDs are set
-            assert shape1.shape_id, f"Shape at index {i} has no shape_id"
-            assert shape2.shape_id, f"Shape at index {j} has no shape_id"
+    Returns:
+        ShapeData objects sorted by visual position
+    """
+    # Sort by visual position and assign stable IDs in one step
+    sorted_shapes = sort_shapes_by_position(shape_data_list)
+    for idx, shape_data in enumerate(sorted_shapes):
+        shape_data.shape_id = f"shape-{idx}"
 
-            rect1 = (shape1.left, shape1.top, shape1.width, shape1.height)
-            rect2 = (shape2.left, shape2.top, shape2.width, shape2.height)
+    # Detect overlaps using the stable shape IDs
+    if len(sorted_shapes) > 1:
+        detect_overlaps(sorted_shapes)
 
-            overlaps, overlap_area = calculate_overlap(rect1, rect2)
+    # Filter for issues only if requested (after overlap detection)
+    if issues_only:
+        sorted_shapes = [sd for sd in sorted_shapes if sd.has_any_issues]
 
-            if overlaps:
-                # Add shape IDs with overlap area in square inches
-                shape1.overlapping_shapes[shape2.shape_id] = overlap_area
-                shape2.overlapping_shapes[shape1.shape_id] = overlap_area
+    return sorted_shapes
 
 
 def extract_text_inventory(
-    pptx_path: Path, prs: Optional[Any] = None, issues_only: bool = False
+    pptx_path: Path,
+    prs: Optional[Any] = None,
+    issues_only: bool = False,
+    styles: Optional[StyleIndex] = None,
 ) -> InventoryData:
     """Extract text content from all slides in a PowerPoint presentation.
 
@@ -920,6 +995,7 @@ def extract_text_inventory(
         pptx_path: Path to the PowerPoint file
         prs: Optional Presentation object to use. If not provided, will load from pptx_path.
         issues_only: If True, only include shapes that have overflow or overlap issues
+        styles: Optional style index of prs to reuse for later measurements
 
     Returns a nested dictionary: {slide-N: {shape-N: ShapeData}}
     Shapes are sorted by visual position (top-to-bottom, left-to-right).
@@ -929,68 +1005,366 @@ def extract_text_inventory(
     if prs is None:
         prs = Presentation(str(pptx_path))
     inventory: InventoryData = {}
+    styles = styles or StyleIndex()
 
     for slide_idx, slide in enumerate(prs.slides):
-        # Collect all valid shapes from this slide with absolute positions
-        shapes_with_positions = []
-        for shape in slide.shapes:  # type: ignore
-            shapes_with_positions.extend(collect_shapes_with_absolute_positions(shape))
-
-        if not shapes_with_positions:
+        sorted_shapes = extract_slide_shapes(slide, issues_only, styles)
+        if not sorted_shapes:
             continue
 
-        # Convert to ShapeData with absolute positions and slide reference
-        shape_data_list = [
-            ShapeData(
-                swp.shape,
-                swp.absolute_left,
-                swp.absolute_top,
-                slide,
+        # Create slide inventory using the stable shape IDs
+        inventory[f"slide-{slide_idx}"] = {
+            shape_data.shape_id: shape_data for shape_data in sorted_shapes
+        }
+
+    return inventory
+
+
+# Presentation opened once per worker process by _init_inventory_worker
+_worker_prs: Optional[Any] = None
+_worker_styles: Optional[StyleIndex] = None
+
+
+def _init_inventory_worker(pptx_path: str) -> None:
+    global _worker_prs, _worker_styles
+    _worker_prs = Presentation(pptx_path)
+    _worker_styles = StyleIndex()
+
+
+def _inventory_slide_worker(
+    slide_idx: int, issues_only: bool
+) -> Tuple[int, Dict[str, ShapeDict]]:
+    """Build the serialized shape records of one slide in a worker process."""
+    slide = _worker_prs.slides[slide_idx]  # type: ignore
+    return slide_idx, {
+        shape_data.shape_id: shape_data.to_dict()
+        for shape_data in extract_slide_shapes(slide, issues_only, _worker_styles)
+    }
+
+
+def count_slides(pptx_path: Path) -> int:
+    """Count the slides of a presentation without loading it."""
+    with zipfile.ZipFile(pptx_path) as zf:
+        root = ElementTree.fromstring(zf.read("ppt/presentation.xml"))
+    return sum(1 for elem in root.iter() if elem.tag.endswith("}sldId"))
+
+
+def parse_slide_range(spec: str, slide_count: int) -> List[int]:
+    """Parse a slide selection such as '0,3-5,10-' into sorted 0-based indices.
+
+    Each comma-separated item is an index, an inclusive range 'a-b', or an
+    open range 'a-' that runs to the last slide.
+
+    Raises:
+        ValueError: If an item is malformed or outside the presentation
+    """
+    selected = set()
+    for item in spec.split(","):
+        item = item.strip()
+        start_text, dash, end_text = item.partition("-")
+        try:
+            start = int(start_text)
+            end = int(end_text) if end_text else (slide_count - 1 if dash else start)
+        except ValueError:
+            raise ValueError(f"Invalid slide range item: '{item}'") from None
+        if start > end:
+            raise ValueError(f"Invalid slide range item: '{item}'")
+        if start < 0 or end >= slide_count:
+            raise ValueError(
+                f"Slide range '{item}' is outside the presentation "
+                f"(slides 0-{slide_count - 1})"
             )
-            for swp in shapes_with_positions
-        ]
+        selected.update(range(start, end + 1))
+    return sorted(selected)
+
+
+def iter_serialized_slides(
+    pptx_path: Path,
+    slide_indices: List[int],
+    issues_only: bool = False,
+    jobs: int = 1,
+    backend: str = "pptx",
+) -> Iterator[Tuple[int, Dict[str, ShapeDict]]]:
+    """Yield the JSON-serializable shape records of selected slides as they are built.
+
+    With more than one job, slides are sharded across worker processes that
+    each open the presentation once. Shape IDs are assigned per slide, so the
+    records are the same either way. The xml backend always runs in-process.
+
+    Args:
+        pptx_path: Path to the PowerPoint file
+        slide_indices: 0-based indices of the slides to process
+        issues_only: If True, only include shapes that have overflow or overlap issues
+        jobs: Number of worker processes
+        backend: "pptx" or "xml", see BACKENDS
+
+    Yields:
+        (slide index, {shape-N: shape dict}) in slide_indices order; slides
+        without text shapes yield an empty dict
+    """
+    if backend == "xml":
+        # Imported here because inventory_xml builds on this module
+        from inventory_xml import iter_slides_xml
+
+        yield from iter_slides_xml(pptx_path, slide_indices, issues_only)
+        return
+
+    jobs = max(1, min(jobs, len(slide_indices)))
+    if jobs == 1:
+        prs = Presentation(str(pptx_path))
+        styles = StyleIndex()
+        for slide_idx in slide_indices:
+            yield (
+                slide_idx,
+                {
+                    shape_data.shape_id: shape_data.to_dict()
+                    for shape_data in extract_slide_shapes(
+                        prs.slides[slide_idx], issues_only, styles
+                    )
+                },
+            )
+        return
+
+    # Several chunks per worker so one slow stretch of slides does not stall
+    # the whole pool
+    chunksize = max(1, len(slide_indices) // (jobs * 4))
+
+    with ProcessPoolExecutor(
+        max_workers=jobs,
+        initializer=_init_inventory_worker,
+        initargs=(str(pptx_path),),
+    ) as pool:
+        # map() yields in submission order
+        yield from pool.map(
+            _inventory_slide_worker,
+            slide_indices,
+            [issues_only] * len(slide_indices),
+            chunksize=chunksize,
+        )
+
+
+def serialize_slides(
+    pptx_path: Path,
+    slide_indices: List[int],
+    issues_only: bool = False,
+    jobs: int = 1,
+    backend: str = "pptx",
+) -> Dict[int, Dict[str, ShapeDict]]:
+    """Build the JSON-serializable shape records of selected slides.
+
+    Collects iter_serialized_slides() into a dict of slide index ->
+    {shape-N: shape dict}, in slide_indices order.
+    """
+    return dict(
+        iter_serialized_slides(pptx_path, slide_indices, issues_only, jobs, backend)
+    )
+
+
+def extract_text_inventory_parallel(
+    pptx_path: Path, jobs: int, issues_only: bool = False
+) -> InventoryDict:
+    """Extract the text inventory with slides sharded across worker processes.
+
+    Args:
+        pptx_path: Path to the PowerPoint file
+        jobs: Number of worker processes
+        issues_only: If True, only include shapes that have overflow or overlap issues
+
+    Returns:
+        Nested dictionary with all data serialized for JSON, in slide order;
+        identical to serializing extract_text_inventory()
+    """
+    return dict(iter_inventory(pptx_path, issues_only, jobs))
+
+
+def shape_dict_has_issues(shape: ShapeDict) -> bool:
+    """Serialized counterpart of ShapeData.has_any_issues."""
+    return "overflow" in shape or "overlap" in shape or "warnings" in shape
+
+
+def iter_cached_slides(
+    pptx_path: Path,
+    slide_indices: Optional[List[int]] = None,
+    issues_only: bool = False,
+    jobs: int = 1,
+    cache: Optional[InventoryCache] = None,
+    backend: str = "pptx",
+) -> Iterator[Tuple[int, Dict[str, ShapeDict]]]:
+    """Yield slide shape records, reusing cached records of unchanged slides.
+
+    Slides are looked up by a hash of their slide, layout and master parts.
+    Only slides without a cache entry are recomputed, in one batch so that
+    jobs can shard them, and the presentation is not loaded at all when
+    every slide is cached. Cached records are read one slide at a time as
+    they are yielded.
 
-        # Sort by visual position and assign stable IDs in one step
-        sorted_shapes = sort_shapes_by_position(shape_data_list)
-        for idx, shape_data in enumerate(sorted_shapes):
-            shape_data.shape_id = f"shape-{idx}"
+    Args:
+        pptx_path: Path to the PowerPoint file
+        slide_indices: 0-based indices of the slides to process, or None for all
+        issues_only: If True, only include shapes that have overflow or overlap issues
+        jobs: Number of worker processes for recomputing missing slides
+        cache: Cache to use, or None for the default on-disk cache
+        backend: "pptx" or "xml", used for recomputing missing slides
 
-        # Detect overlaps using the stable shape IDs
-        if len(sorted_shapes) > 1:
-            detect_overlaps(sorted_shapes)
+    Yields:
+        (slide index, {shape-N: shape dict}) in slide_indices order
+    """
+    cache = cache or InventoryCache()
+    keys = cache.slide_keys(pptx_path)
+    if slide_indices is None:
+        slide_indices = list(range(len(keys)))
+
+    missing = [idx for idx in slide_indices if not cache.contains(keys[idx])]
+    # Cache complete records so issues-only runs can share them; computed
+    # yields in the same order as missing
+    computed = iter_serialized_slides(pptx_path, missing, jobs=jobs, backend=backend)
+    missing_set = set(missing)
+
+    for slide_idx in slide_indices:
+        if slide_idx in missing_set:
+            _, shapes = next(computed)
+            cache.put(keys[slide_idx], shapes)
+        else:
+            shapes = cache.get(keys[slide_idx])
+            if shapes is None:
+                # Removed since it was checked, e.g. evicted by another process
+                shapes = serialize_slides(pptx_path, [slide_idx], backend=backend)
+                shapes = shapes[slide_idx]
+                cache.put(keys[slide_idx], shapes)
 
-        # Filter for issues only if requested (after overlap detection)
         if issues_only:
-            sorted_shapes = [sd for sd in sorted_shapes if sd.has_any_issues]
+            shapes = {
+                shape_id: shape
+                for shape_id, shape in shapes.items()
+                if shape_dict_has_issues(shape)
+            }
+        yield slide_idx, shapes
 
-        if not sorted_shapes:
-            continue
+    if missing:
+        cache.evict()
 
-        # Create slide inventory using the stable shape IDs
-        inventory[f"slide-{slide_idx}"] = {
-            shape_data.shape_id: shape_data for shape_data in sorted_shapes
-        }
 
-    return inventory
+def extract_text_inventory_cached(
+    pptx_path: Path,
+    issues_only: bool = False,
+    jobs: int = 1,
+    cache: Optional[InventoryCache] = None,
+    backend: str = "pptx",
+) -> InventoryDict:
+    """Extract the text inventory, reusing cached records of unchanged slides.
 
+    See iter_cached_slides() for the arguments.
+
+    Returns:
+        Nested dictionary with all data serialized for JSON, in slide order
+    """
+    slides = iter_cached_slides(
+        pptx_path, None, issues_only, jobs, cache=cache, backend=backend
+    )
+    return {f"slide-{slide_idx}": shapes for slide_idx, shapes in slides if shapes}
 
-def get_inventory_as_dict(pptx_path: Path, issues_only: bool = False) -> InventoryDict:
-    """Extract text inventory and return as JSON-serializable dictionaries.
 
-    This is a convenience wrapper around extract_text_inventory that returns
-    dictionaries instead of ShapeData objects, useful for testing and direct
-    JSON serialization.
+def iter_inventory(
+    pptx_path: Path,
+    issues_only: bool = False,
+    jobs: int = 1,
+    use_cache: bool = False,
+    backend: str = "pptx",
+    slide_indices: Optional[List[int]] = None,
+) -> Iterator[Tuple[str, Dict[str, ShapeDict]]]:
+    """Yield the serialized inventory one slide at a time as slides are processed.
+
+    Only the current slide's records are held in memory, so consumers can
+    write or act on early slides while later ones are still being measured.
 
     Args:
         pptx_path: Path to the PowerPoint file
         issues_only: If True, only include shapes that have overflow or overlap issues
+        jobs: Number of worker processes; values above 1 shard slides across
+            a process pool
+        use_cache: Reuse and update the on-disk per-slide inventory cache
+        backend: "pptx" to read slides through python-pptx, or "xml" to parse
+            the slide parts directly; both produce the same records
+        slide_indices: 0-based indices of the slides to include, or None for all
+
+    Yields:
+        ("slide-N", {shape-N: shape dict}) for each slide with text shapes,
+        in slide order
+    """
+    if use_cache:
+        slides = iter_cached_slides(
+            pptx_path, slide_indices, issues_only, jobs, backend=backend
+        )
+    else:
+        if slide_indices is None:
+            slide_indices = list(range(count_slides(pptx_path)))
+        slides = iter_serialized_slides(
+            pptx_path, slide_indices, issues_only, jobs, backend
+        )
+
+    for slide_idx, shapes in slides:
+        if shapes:
+            yield f"slide-{slide_idx}", shapes
+
+
+def get_inventory_as_dict(
+    pptx_path: Path,
+    issues_only: bool = False,
+    jobs: int = 1,
+    use_cache: bool = False,
+    backend: str = "pptx",
+    slide_indices: Optional[List[int]] = None,
+) -> InventoryDict:
+    """Extract text inventory and return as JSON-serializable dictionaries.
+
+    This is a convenience wrapper around iter_inventory that collects every
+    slide into one dictionary, useful for testing and direct JSON
+    serialization. See iter_inventory() for the arguments.
 
     Returns:
         Nested dictionary with all data serialized for JSON
     """
-    inventory = extract_text_inventory(pptx_path, issues_only=issues_only)
+    return dict(
+        iter_inventory(pptx_path, issues_only, jobs, use_cache, backend, slide_indices)
+    )
+
+
+def write_inventory_ndjson(
+    slides: Iterable[Tuple[str, Dict[str, ShapeDict]]],
+    out: TextIO,
+    records: str = "slide",
+) -> Tuple[int, int]:
+    """Write inventory records as newline-delimited JSON, flushing each slide.
+
+    Slide records look like {"slide": "slide-N", "shapes": {...}}. Shape
+    records carry the slide and shape IDs followed by the shape's fields:
+    {"slide": "slide-N", "shape": "shape-N", "left": ..., ...}.
+
+    Args:
+        slides: ("slide-N", shapes) pairs, e.g. from iter_inventory()
+        out: Text stream to write to
+        records: "slide" for one line per slide, "shape" for one per shape
+
+    Returns:
+        Tuple of (slides written, shapes written)
+    """
+    slide_count = shape_count = 0
+    for slide_key, shapes in slides:
+        if records == "shape":
+            for shape_id, shape in shapes.items():
+                record = {"slide": slide_key, "shape": shape_id, **shape}
+                out.write(json.dumps(record, ensure_ascii=False) + "\n")
+        else:
+            record = {"slide": slide_key, "shapes": shapes}
+            out.write(json.dumps(record, ensure_ascii=False) + "\n")
+        out.flush()
+        slide_count += 1
+        shape_count += len(shapes)
+    return slide_count, shape_count
+
 
-    # Convert ShapeData objects to dictionaries
+def inventory_to_dict(inventory: InventoryData) -> InventoryDict:
+    """Convert ShapeData objects to dictionaries for JSON serialization."""
     dict_inventory: InventoryDict = {}
     for slide_key, shapes in inventory.items():
         dict_inventory[slide_key] = {
@@ -1005,13 +1379,11 @@ def save_inventory(inventory: InventoryData, output_path: Path) -> None:
 
     Converts ShapeData objects to dictionaries for JSON serialization.
     """
-    # Convert ShapeData objects to dictionaries
-    json_inventory: InventoryDict = {}
-    for slide_key, shapes in inventory.items():
-        json_inventory[slide_key] = {
-            shape_key: shape_data.to_dict() for shape_key, shape_data in shapes.items()
-        }
+    save_inventory_dict(inventory_to_dict(inventory), output_path)
+
 
+def save_inventory_dict(json_inventory: InventoryDict, output_path: Path) -> None:
+    """Save an already serialized inventory to JSON file with proper formatting."""
     with open(output_path, "w", encoding="utf-8") as f:
         json.dump(json_inventory, f, indent=2, ensure_ascii=False)
 
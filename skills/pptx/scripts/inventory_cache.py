@@ -0,0 +1,211 @@
+#!/usr/bin/env python3
+"""
+On-disk cache of per-slide text inventory records.
+
+Each slide is keyed by a hash of its slide part, its layout and master parts,
+the slide size and the installed fonts, so editing one slide only invalidates
+that slide. Keys are computed from the raw package parts without loading the
+presentation, which makes a fully cached run skip python-pptx entirely.
+
+Entries are small JSON files under the user cache directory. Hits refresh an
+entry's modification time, and the least recently used entries are removed
+once the cache grows beyond its size limit.
+
+Classes:
+    InventoryCache: Slide key computation and size-bounded JSON storage
+"""
+
+import hashlib
+import json
+import os
+import posixpath
+import tempfile
+import zipfile
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+from xml.etree import ElementTree
+
+from fonts import get_font_index
+
+# Bump when the inventory output format or its computation changes
+CACHE_VERSION = 2
+CACHE_MAX_BYTES = 64 * 1024 * 1024
+
+P_NS = "{http://schemas.openxmlformats.org/presentationml/2006/main}"
+R_NS = "{http://schemas.openxmlformats.org/officeDocument/2006/relationships}"
+PKG_REL_NS = "{http://schemas.openxmlformats.org/package/2006/relationships}"
+
+
+def default_cache_dir() -> Path:
+    """Return the directory holding cached inventory entries."""
+    base = os.environ.get("XDG_CACHE_HOME") or Path.home() / ".cache"
+    return Path(base) / "pptx-skill" / "inventory"
+
+
+class InventoryCache:
+    """Per-slide inventory records stored as JSON files keyed by content hash."""
+
+    def __init__(
+        self, cache_dir: Optional[Path] = None, max_bytes: int = CACHE_MAX_BYTES
+    ):
+        """Initialize the cache.
+
+        Args:
+            cache_dir: Directory for cache entries, or None for the default
+            max_bytes: Total size above which least recently used entries are
+                evicted
+        """
+        self.cache_dir = cache_dir or default_cache_dir()
+        self.max_bytes = max_bytes
+
+    def slide_keys(self, pptx_path: Path) -> List[str]:
+        """Compute the cache key of every slide in presentation order.
+
+        Args:
+            pptx_path: Path to the PowerPoint file
+
+        Returns:
+            One hex key per slide
+        """
+        part_hashes: Dict[str, bytes] = {}
+
+        with zipfile.ZipFile(pptx_path) as zf:
+
+            def part_hash(part_name: str) -> bytes:
+                # Layouts and masters are shared, so hash each part only once
+                if part_name not in part_hashes:
+                    part_hashes[part_name] = hashlib.blake2b(
+                        zf.read(part_name), digest_size=16
+                    ).digest()
+                return part_hashes[part_name]
+
+            slide_parts, slide_size = read_slide_parts(zf)
+            prefix = f"{CACHE_VERSION}|{slide_size}|{get_font_index().fingerprint()}"
+
+            keys = []
+            for slide_part in slide_parts:
+                digest = hashlib.blake2b(prefix.encode(), digest_size=16)
+                digest.update(part_hash(slide_part))
+                # Placeholders inherit position and text styles from the
+                # layout and master
+                part = slide_part
+                for rel_type in ("/slideLayout", "/slideMaster"):
+                    part = related_part(zf, part, rel_type)
+                    if part is None:
+                        break
+                    digest.update(part_hash(part))
+                keys.append(digest.hexdigest())
+
+        return keys
+
+    def contains(self, key: str) -> bool:
+        """Check whether a slide key has an entry without reading it."""
+        return (self.cache_dir / f"{key}.json").is_file()
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        """Return the cached shape records for a slide key, or None on a miss."""
+        path = self.cache_dir / f"{key}.json"
+        try:
+            with open(path, encoding="utf-8") as f:
+                shapes = json.load(f)
+            # Mark as recently used for eviction
+            os.utime(path)
+        except (OSError, ValueError):
+            return None
+        return shapes
+
+    def put(self, key: str, shapes: Dict[str, Any]) -> None:
+        """Store the shape records of a slide."""
+        try:
+            self.cache_dir.mkdir(parents=True, exist_ok=True)
+            fd, tmp_path = tempfile.mkstemp(dir=self.cache_dir, suffix=".tmp")
+            with open(fd, "w", encoding="utf-8") as f:
+                json.dump(shapes, f, ensure_ascii=False)
+            os.replace(tmp_path, self.cache_dir / f"{key}.json")
+        except OSError:
+            # An unwritable cache only costs recomputation next time
+            pass
+
+    def evict(self) -> None:
+        """Remove least recently used entries until the cache fits max_bytes."""
+        try:
+            entries = [
+                (entry.stat().st_mtime_ns, entry.stat().st_size, entry.path)
+                for entry in os.scandir(self.cache_dir)
+                if entry.name.endswith(".json")
+            ]
+        except OSError:
+            return
+
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            try:
+                os.remove(path)
+            except OSError:
+                continue
+            total -= size
+
+
+def read_slide_parts(
+    zf: zipfile.ZipFile,
+) -> Tuple[List[str], Tuple[Optional[int], Optional[int]]]:
+    """Read the slide part names in presentation order and the slide size.
+
+    Returns:
+        Tuple of (slide part names, (width_emu, height_emu)); the size is
+        (None, None) when the presentation does not declare one
+    """
+    presentation = ElementTree.fromstring(zf.read("ppt/presentation.xml"))
+    sld_sz = presentation.find(f"{P_NS}sldSz")
+    slide_size = (
+        (int(sld_sz.get("cx", 0)), int(sld_sz.get("cy", 0)))
+        if sld_sz is not None
+        else (None, None)
+    )
+
+    targets = {
+        rel_id: target for rel_id, _, target in read_rels(zf, "ppt/presentation.xml")
+    }
+    slide_parts = [
+        targets[sld_id.get(f"{R_NS}id")] for sld_id in presentation.iter(f"{P_NS}sldId")
+    ]
+    return slide_parts, slide_size
+
+
+def rels_part_name(part_name: str) -> str:
+    """Return the name of the relationships part belonging to part_name."""
+    directory, file_name = posixpath.split(part_name)
+    return posixpath.join(directory, "_rels", f"{file_name}.rels")
+
+
+def read_rels(zf: zipfile.ZipFile, part_name: str) -> List[Tuple[str, str, str]]:
+    """Return (id, type, target part name) for each internal relationship of a part."""
+    directory = posixpath.dirname(part_name)
+    try:
+        rels = ElementTree.fromstring(zf.read(rels_part_name(part_name)))
+    except KeyError:
+        return []
+
+    result = []
+    for rel in rels.iter(f"{PKG_REL_NS}Relationship"):
+        if rel.get("TargetMode") == "External":
+            continue
+        target = rel.get("Target", "")
+        if target.startswith("/"):
+            target = target.lstrip("/")
+        else:
+            target = posixpath.normpath(posixpath.join(directory, target))
+        result.append((rel.get("Id", ""), rel.get("Type", ""), target))
+    return result
+
+
+def related_part(
+    zf: zipfile.ZipFile, part_name: str, rel_type_suffix: str
+) -> Optional[str]:
+    """Return the first part related to part_name with the given type suffix."""
+    for _, rel_type, target in read_rels(zf, part_name):
+        if rel_type.endswith(rel_type_suffix):
+            return target
+    return None
@@ -0,0 +1,302 @@
+#!/usr/bin/env python3
+"""
+Extract the text inventory from raw slide XML.
+
+inventory.py reaches every shape through python-pptx proxies: each slide,
+shape and placeholder access allocates wrapper objects, and placeholder
+positions are re-resolved through the layout and master with XPath on every
+read. This backend reads each slide part straight from the package zip,
+parses every layout and master once, resolves group offsets and placeholder
+inheritance from per-part tables, and feeds the result into the same ShapeData
+measurement code. The output matches inventory.get_inventory_as_dict().
+
+Elements are parsed with python-pptx's oxml element classes so that paragraph
+text and properties read exactly as they do in inventory.py, but the package,
+part and shape proxy layers are never loaded.
+
+Classes:
+    XmlShape: A slide shape with inherited position and style data resolved
+    XmlShapeData: ShapeData computed from an XmlShape
+
+Main Functions:
+    iter_slides_xml: Yield shape records of selected slides one at a time
+    serialize_slides_xml: Build shape records for selected slides
+    extract_text_inventory_xml: Build the full inventory
+
+Usage:
+    python inventory.py input.pptx output.json --backend xml
+"""
+
+import zipfile
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from inventory import (
+    InventoryDict,
+    ShapeData,
+    ShapeDict,
+    ShapeWithPosition,
+    finish_slide_shapes,
+    is_valid_shape,
+)
+from inventory_cache import P_NS, read_slide_parts, related_part
+from pptx.oxml import parse_xml
+from pptx.text.text import TextFrame
+from style_index import (
+    BASE_PLACEHOLDER_TYPE,
+    SHAPE_TAGS,
+    StyleIndex,
+    find_placeholder,
+    iter_placeholders,
+)
+
+A_NS = "{http://schemas.openxmlformats.org/drawingml/2006/main}"
+
+# (x, y, cx, cy) in EMUs, None where the shape does not set a value
+Geometry = Tuple[Optional[int], Optional[int], Optional[int], Optional[int]]
+
+
+def _read_geometry(xfrm: Optional[Any]) -> Geometry:
+    """Read offset and extents from an a:xfrm element."""
+    if xfrm is None:
+        return None, None, None, None
+    off = xfrm.find(f"{A_NS}off")
+    ext = xfrm.find(f"{A_NS}ext")
+    x = int(off.get("x")) if off is not None else None
+    y = int(off.get("y")) if off is not None else None
+    cx = int(ext.get("cx")) if ext is not None else None
+    cy = int(ext.get("cy")) if ext is not None else None
+    return x, y, cx, cy
+
+
+def _shape_geometry(shape_elm: Any) -> Geometry:
+    """Read the directly applied geometry of an sp, pic or cxnSp element."""
+    sp_pr = shape_elm.find(f"{P_NS}spPr")
+    xfrm = sp_pr.find(f"{A_NS}xfrm") if sp_pr is not None else None
+    return _read_geometry(xfrm)
+
+
+def _merge_geometry(own: Geometry, base: Optional[Geometry]) -> Geometry:
+    """Fill the unset values of own from base, as placeholders inherit them."""
+    if base is None:
+        return own
+    return tuple(  # type: ignore
+        value if value is not None else base_value
+        for value, base_value in zip(own, base)
+    )
+
+
+class MasterInfo:
+    """Placeholder geometry of a slide master."""
+
+    def __init__(self, root: Any):
+        self.element = root
+
+        # First placeholder of each type, as MasterPlaceholders.get() finds it
+        self.geometry: Dict[Any, Geometry] = {}
+        for shape_elm, ph in iter_placeholders(root):
+            self.geometry.setdefault(ph.type, _shape_geometry(shape_elm))
+
+
+class LayoutInfo:
+    """Placeholder geometry of a slide layout, resolved through its master."""
+
+    def __init__(self, root: Any, slide_master: Optional[MasterInfo]):
+        self.element = root
+        self.slide_master = slide_master
+        self.geometry_by_idx: Dict[int, Geometry] = {}
+
+        for shape_elm, ph in iter_placeholders(root):
+            if ph.idx not in self.geometry_by_idx:
+                own = _shape_geometry(shape_elm)
+                base = None
+                if slide_master is not None and ph.type in BASE_PLACEHOLDER_TYPE:
+                    base = slide_master.geometry.get(BASE_PLACEHOLDER_TYPE[ph.type])
+                self.geometry_by_idx[ph.idx] = _merge_geometry(own, base)
+
+
+class XmlSlide:
+    """The slide-level context ShapeData needs: slide size and layout.
+
+    slide_layout.element and slide_layout.slide_master.element are the parsed
+    layout and master, as on python-pptx slides, for StyleIndex lookups.
+    """
+
+    def __init__(
+        self,
+        slide_width: Optional[int],
+        slide_height: Optional[int],
+        slide_layout: Optional[LayoutInfo],
+    ):
+        self.slide_width = slide_width
+        self.slide_height = slide_height
+        self.slide_layout = slide_layout
+
+
+class PlaceholderFormat:
+    """Placeholder type and index of an XmlShape."""
+
+    def __init__(self, ph: Any):
+        self.type = ph.type
+        self.idx = ph.idx
+
+
+class XmlShape:
+    """A p:sp element with its effective geometry resolved.
+
+    Exposes the subset of the python-pptx shape interface that is_valid_shape
+    and ShapeData use. Placeholders take unset position and size values from
+    the layout placeholder with the same idx, which in turn inherits from the
+    master, like python-pptx placeholder shapes do.
+    """
+
+    def __init__(self, shape_elm: Any, slide: XmlSlide):
+        self.element = shape_elm
+        ph = find_placeholder(shape_elm)
+        self.is_placeholder = ph is not None
+        self.placeholder_format = PlaceholderFormat(ph) if ph is not None else None
+
+        geometry = _shape_geometry(shape_elm)
+        layout = slide.slide_layout
+        if layout is not None and ph is not None:
+            geometry = _merge_geometry(geometry, layout.geometry_by_idx.get(ph.idx))
+
+        # Shapes without a position are treated as being at the slide origin
+        x, y, cx, cy = geometry
+        self.left = x or 0
+        self.top = y or 0
+        self.width = cx or 0
+        self.height = cy or 0
+
+        tx_body = shape_elm.find(f"{P_NS}txBody")
+        if tx_body is not None:
+            self.text_frame = TextFrame(tx_body, None)  # type: ignore
+
+
+class XmlShapeData(ShapeData):
+    """ShapeData computed from an XmlShape and XmlSlide."""
+
+    @staticmethod
+    def get_slide_dimensions(slide: Any) -> Tuple[Optional[int], Optional[int]]:
+        return slide.slide_width, slide.slide_height
+
+
+def collect_xml_shapes(
+    container: Any, slide: XmlSlide, parent_left: int = 0, parent_top: int = 0
+) -> List[ShapeWithPosition]:
+    """Collect text shapes of an spTree or grpSp with absolute positions.
+
+    Matches collect_shapes_with_absolute_positions: a group's offset is added
+    to the positions of its children.
+    """
+    result = []
+    for shape_elm in container:
+        if shape_elm.tag not in SHAPE_TAGS:
+            continue
+
+        if shape_elm.tag == f"{P_NS}grpSp":
+            grp_sp_pr = shape_elm.find(f"{P_NS}grpSpPr")
+            xfrm = grp_sp_pr.find(f"{A_NS}xfrm") if grp_sp_pr is not None else None
+            x, y, _, _ = _read_geometry(xfrm)
+            result.extend(
+                collect_xml_shapes(
+                    shape_elm, slide, parent_left + (x or 0), parent_top + (y or 0)
+                )
+            )
+        elif shape_elm.tag == f"{P_NS}sp":
+            # Only p:sp shapes have a text frame
+            shape = XmlShape(shape_elm, slide)
+            if is_valid_shape(shape):  # type: ignore
+                result.append(
+                    ShapeWithPosition(
+                        shape=shape,  # type: ignore
+                        absolute_left=parent_left + shape.left,
+                        absolute_top=parent_top + shape.top,
+                    )
+                )
+    return result
+
+
+def iter_slides_xml(
+    pptx_path: Path, slide_indices: List[int], issues_only: bool = False
+) -> Iterator[Tuple[int, Dict[str, ShapeDict]]]:
+    """Yield the JSON-serializable shape records of selected slides from raw XML.
+
+    Args:
+        pptx_path: Path to the PowerPoint file
+        slide_indices: 0-based indices of the slides to process
+        issues_only: If True, only include shapes that have overflow or overlap issues
+
+    Yields:
+        (slide index, {shape-N: shape dict}) in slide_indices order; slides
+        without text shapes yield an empty dict
+    """
+    layouts: Dict[str, Optional[LayoutInfo]] = {}
+    masters: Dict[str, MasterInfo] = {}
+    styles = StyleIndex()
+
+    with zipfile.ZipFile(pptx_path) as zf:
+        slide_parts, (slide_width, slide_height) = read_slide_parts(zf)
+
+        def load_layout(slide_part: str) -> Optional[LayoutInfo]:
+            layout_part = related_part(zf, slide_part, "/slideLayout")
+            if layout_part is None:
+                return None
+            if layout_part not in layouts:
+                master_part = related_part(zf, layout_part, "/slideMaster")
+                if master_part is not None and master_part not in masters:
+                    masters[master_part] = MasterInfo(parse_xml(zf.read(master_part)))
+                layouts[layout_part] = LayoutInfo(
+                    parse_xml(zf.read(layout_part)), masters.get(master_part or "")
+                )
+            return layouts[layout_part]
+
+        for slide_idx in slide_indices:
+            slide_part = slide_parts[slide_idx]
+            root = parse_xml(zf.read(slide_part))
+            slide = XmlSlide(slide_width, slide_height, load_layout(slide_part))
+
+            sp_tree = root.find(f"{P_NS}cSld/{P_NS}spTree")
+            shapes_with_positions = (
+                collect_xml_shapes(sp_tree, slide) if sp_tree is not None else []
+            )
+            shape_data_list = [
+                XmlShapeData(
+                    swp.shape, swp.absolute_left, swp.absolute_top, slide, styles
+                )
+                for swp in shapes_with_positions
+            ]
+            yield (
+                slide_idx,
+                {
+                    shape_data.shape_id: shape_data.to_dict()
+                    for shape_data in finish_slide_shapes(shape_data_list, issues_only)
+                },
+            )
+
+
+def serialize_slides_xml(
+    pptx_path: Path, slide_indices: List[int], issues_only: bool = False
+) -> Dict[int, Dict[str, ShapeDict]]:
+    """Collect iter_slides_xml() into a dict of slide index -> shape records."""
+    return dict(iter_slides_xml(pptx_path, slide_indices, issues_only))
+
+
+def extract_text_inventory_xml(
+    pptx_path: Path, issues_only: bool = False
+) -> InventoryDict:
+    """Extract the text inventory of all slides from raw XML.
+
+    Args:
+        pptx_path: Path to the PowerPoint file
+        issues_only: If True, only include shapes that have overflow or overlap issues
+
+    Returns:
+        Nested dictionary with all data serialized for JSON, in slide order
+    """
+    with zipfile.ZipFile(pptx_path) as zf:
+        slide_count = len(read_slide_parts(zf)[0])
+    slides = serialize_slides_xml(pptx_path, list(range(slide_count)), issues_only)
+    return {
+        f"slide-{slide_idx}": shapes for slide_idx, shapes in slides.items() if shapes
+    }
@@ -12,11 +12,18 @@ Slides can be repeated (e.g., 34 appears twice).
 import argparse
 import shutil
 import sys
+from collections import Counter
 from copy import deepcopy
 from pathlib import Path
 
-import six
 from pptx import Presentation
+from pptx.opc.constants import RELATIONSHIP_TYPE as RT
+from pptx.opc.packuri import PackURI
+from pptx.oxml import parse_xml
+
+# Valid p:sldId id values
+MIN_SLIDE_ID = 256
+MAX_SLIDE_ID = 2147483647
 
 
 def main():
@@ -74,82 +81,154 @@ Note: Slide indices are 0-based (first slide is 0, second is 1, etc.)
 
 def duplicate_slide(pres, index):
     """Duplicate a slide in the presentation."""
-    source = pres.slides[index]
-
-    # Use source's layout to preserve formatting
-    new_slide = pres.slides.add_slide(source.slide_layout)
-
-    # Collect all image and media relationships from the source slide
-    image_rels = {}
-    for rel_id, rel in six.iteritems(source.part.rels):
-        if "image" in rel.reltype or "media" in rel.reltype:
-            image_rels[rel_id] = rel
-
-    # CRITICAL: Clear placeholder shapes to avoid duplicates
-    for shape in new_slide.shapes:
-        sp = shape.element
-        sp.getparent().remove(sp)
-
-    # Copy all shapes from source
-    for shape in source.shapes:
-        el = shape.element
-        new_el = deepcopy(el)
-        new_slide.shapes._spTree.insert_element_before(new_el, "p:extLst")
-
-        # Handle picture shapes - need to update the blip reference
-        # Look for all blip elements (they can be in pic or other contexts)
-        # Using the element's own xpath method without namespaces argument
-        blips = new_el.xpath(".//a:blip[@r:embed]")
-        for blip in blips:
-            old_rId = blip.get(
-                "{http://schemas.openxmlformats.org/officeDocument/2006/relationships}embed"
+    sld_id = clone_slides(pres, [index])[0]
+    return pres.part.related_slide(sld_id.rId)
+
+
+def _unused_names(template, used):
+    """Yield template % n for n = 1, 2, ... skipping names in used."""
+    n = 1
+    while True:
+        name = template % n
+        if name not in used:
+            yield name
+        n += 1
+
+
+def _target_parts(part):
+    """Map the partname of each internal relationship target of part to the part."""
+    return {
+        rel.target_partname: rel.target_part
+        for rel in part.rels.values()
+        if not rel.is_external
+    }
+
+
+def _copy_part(part, partname):
+    """Return a copy of an XML part under a new partname, without relationships."""
+    return type(part)(
+        partname, part.content_type, part.package, deepcopy(part._element)
+    )
+
+
+def clone_slides(pres, indices):
+    """Append copies of slides that share the originals' related parts.
+
+    Each copy gets its own copy of the slide XML and of its notes slide,
+    which refers back to the slide. Every other relationship, such as the
+    layout, images, media, charts and embedded objects, points at the same
+    part as the original, so a copy adds almost nothing to the saved file.
+    The new slides are registered in the presentation in one update, and the
+    content types of new parts are written on save.
+
+    Args:
+        pres: Presentation to modify
+        indices: Indices of the slides to copy, one entry per copy
+
+    Returns:
+        p:sldId elements of the new slides, in the order of indices
+    """
+    if not indices:
+        return []
+
+    pres_part = pres.part
+    sld_id_lst = pres.slides._sldIdLst
+
+    # Allocate partnames, relationship IDs and slide IDs once for all copies
+    used_partnames = {part.partname for part in pres_part.package.iter_parts()}
+    slide_names = _unused_names("/ppt/slides/slide%d.xml", used_partnames)
+    notes_names = _unused_names("/ppt/notesSlides/notesSlide%d.xml", used_partnames)
+    r_ids = _unused_names("rId%d", set(pres_part.rels))
+    next_slide_id = max([MIN_SLIDE_ID - 1] + [sld_id.id for sld_id in sld_id_lst]) + 1
+
+    # Parse each source slide's relationships once, however often it is copied
+    sources = {}
+    for index in set(indices):
+        slide_part = pres.slides[index].part
+        notes = None
+        if slide_part.has_notes_slide:
+            notes_part = slide_part.part_related_by(RT.NOTES_SLIDE)
+            notes = (
+                notes_part,
+                parse_xml(notes_part.rels.xml),
+                _target_parts(notes_part),
             )
-            if old_rId in image_rels:
-                # Create a new relationship in the destination slide for this image
-                old_rel = image_rels[old_rId]
-                # get_or_add returns the rId directly, or adds and returns new rId
-                new_rId = new_slide.part.rels.get_or_add(
-                    old_rel.reltype, old_rel._target
-                )
-                # Update the blip's embed reference to use the new relationship ID
-                blip.set(
-                    "{http://schemas.openxmlformats.org/officeDocument/2006/relationships}embed",
-                    new_rId,
-                )
+        sources[index] = (
+            slide_part,
+            parse_xml(slide_part.rels.xml),
+            _target_parts(slide_part),
+            notes,
+        )
+
+    pres_rels_xml = parse_xml(pres_part.rels.xml)
+    pres_targets = _target_parts(pres_part)
+    new_sld_ids = []
+
+    for index in indices:
+        slide_part, rels_xml, targets, notes = sources[index]
+        slide_copy = _copy_part(slide_part, PackURI(next(slide_names)))
+
+        if notes is not None:
+            # The notes slide copy points back at the slide copy
+            notes_part, notes_rels_xml, notes_targets = notes
+            notes_copy = _copy_part(notes_part, PackURI(next(notes_names)))
+            notes_copy.load_rels_from_xml(
+                notes_rels_xml, {**notes_targets, slide_part.partname: slide_copy}
+            )
+            targets = {**targets, notes_part.partname: notes_copy}
+        slide_copy.load_rels_from_xml(rels_xml, targets)
+
+        r_id = next(r_ids)
+        pres_rels_xml.add_rel(
+            r_id, RT.SLIDE, slide_copy.partname.relative_ref(pres_part.partname.baseURI)
+        )
+        pres_targets[slide_copy.partname] = slide_copy
+        if next_slide_id <= MAX_SLIDE_ID:
+            new_sld_ids.append(sld_id_lst._add_sldId(id=next_slide_id, rId=r_id))
+            next_slide_id += 1
+        else:
+            new_sld_ids.append(sld_id_lst.add_sldId(r_id))
 
-    # Copy any additional image/media relationships that might be referenced elsewhere
-    for rel_id, rel in image_rels.items():
-        try:
-            new_slide.part.rels.get_or_add(rel.reltype, rel._target)
-        except Exception:
-            pass  # Relationship might already exist
+    pres_part.load_rels_from_xml(pres_rels_xml, pres_targets)
+    return new_sld_ids
 
-    return new_slide
 
+def set_slide_order(pres, sld_ids):
+    """Replace the slide list with sld_ids and drop relationships to removed slides.
 
-def delete_slide(pres, index):
-    """Delete a slide from the presentation."""
-    rId = pres.slides._sldIdLst[index].rId
-    pres.part.drop_rel(rId)
-    del pres.slides._sldIdLst[index]
+    Args:
+        pres: Presentation to modify
+        sld_ids: p:sldId elements of the presentation in their final order
 
+    Returns:
+        Number of slides removed
+    """
+    sld_id_lst = pres.slides._sldIdLst
+    kept = set(sld_ids)
+    removed = [sld_id for sld_id in sld_id_lst if sld_id not in kept]
 
-def reorder_slides(pres, slide_index, target_index):
-    """Move a slide from one position to another."""
-    slides = pres.slides._sldIdLst
+    # Rebuild the list in one pass instead of moving slides one at a time
+    for sld_id in list(sld_id_lst):
+        sld_id_lst.remove(sld_id)
+    sld_id_lst.extend(sld_ids)
 
-    # Remove slide element from current position
-    slide_element = slides[slide_index]
-    slides.remove(slide_element)
+    # Drop relationships of removed slides unless something else still
+    # references them, counting references once for all slides
+    referenced = set(pres.part._element.xpath("//@r:id"))
+    for sld_id in removed:
+        if sld_id.rId not in referenced:
+            pres.part.rels.pop(sld_id.rId)
 
-    # Insert at target position
-    slides.insert(target_index, slide_element)
+    return len(removed)
 
 
 def rearrange_presentation(template_path, output_path, slide_sequence):
     """
     Create a new presentation with slides from template in specified order.
 
+    The final slide list is built in a single pass: each position takes the
+    original slide on its first use and a fresh duplicate after that.
+
     Args:
         template_path: Path to template PPTX file
         output_path: Path for output PPTX file
@@ -169,57 +248,40 @@ def rearrange_presentation(template_path, output_path, slide_sequence):
         if idx < 0 or idx >= total_slides:
             raise ValueError(f"Slide index {idx} out of range (0-{total_slides - 1})")
 
-    # Track original slides and their duplicates
-    slide_map = []  # List of actual slide indices for final presentation
-    duplicated = {}  # Track duplicates: original_idx -> [duplicate_indices]
+    originals = list(prs.slides._sldIdLst)
+    counts = Counter(slide_sequence)
 
-    # Step 1: DUPLICATE repeated slides
+    # Step 1: DUPLICATE repeated slides, all in one batch
+    used = set()
+    repeats = []  # Template index of every use after the first
+    for template_idx in slide_sequence:
+        if template_idx in used:
+            repeats.append(template_idx)
+        used.add(template_idx)
+    duplicates = iter(clone_slides(prs, repeats))
+
+    used = set()
+    final_order = []  # p:sldId elements of the final presentation
     print(f"Processing {len(slide_sequence)} slides from template...")
     for i, template_idx in enumerate(slide_sequence):
-        if template_idx in duplicated and duplicated[template_idx]:
-            # Already duplicated this slide, use the duplicate
-            slide_map.append(duplicated[template_idx].pop(0))
+        if template_idx in used:
+            final_order.append(next(duplicates))
             print(f"  [{i}] Using duplicate of slide {template_idx}")
-        elif slide_sequence.count(template_idx) > 1 and template_idx not in duplicated:
-            # First occurrence of a repeated slide - create duplicates
-            slide_map.append(template_idx)
-            duplicates = []
-            count = slide_sequence.count(template_idx) - 1
-            print(
-                f"  [{i}] Using original slide {template_idx}, creating {count} duplicate(s)"
-            )
-            for _ in range(count):
-                duplicate_slide(prs, template_idx)
-                duplicates.append(len(prs.slides) - 1)
-            duplicated[template_idx] = duplicates
         else:
-            # Unique slide or first occurrence already handled, use original
-            slide_map.append(template_idx)
-            print(f"  [{i}] Using original slide {template_idx}")
-
-    # Step 2: DELETE unwanted slides (work backwards)
-    slides_to_keep = set(slide_map)
-    print(f"\nDeleting {len(prs.slides) - len(slides_to_keep)} unused slides...")
-    for i in range(len(prs.slides) - 1, -1, -1):
-        if i not in slides_to_keep:
-            delete_slide(prs, i)
-            # Update slide_map indices after deletion
-            slide_map = [idx - 1 if idx > i else idx for idx in slide_map]
-
-    # Step 3: REORDER to final sequence
-    print(f"Reordering {len(slide_map)} slides to final sequence...")
-    for target_pos in range(len(slide_map)):
-        # Find which slide should be at target_pos
-        current_pos = slide_map[target_pos]
-        if current_pos != target_pos:
-            reorder_slides(prs, current_pos, target_pos)
-            # Update slide_map: the move shifts other slides
-            for i in range(len(slide_map)):
-                if slide_map[i] > current_pos and slide_map[i] <= target_pos:
-                    slide_map[i] -= 1
-                elif slide_map[i] < current_pos and slide_map[i] >= target_pos:
-                    slide_map[i] += 1
-            slide_map[target_pos] = target_pos
+            used.add(template_idx)
+            final_order.append(originals[template_idx])
+            if counts[template_idx] > 1:
+                count = counts[template_idx] - 1
+                print(
+                    f"  [{i}] Using original slide {template_idx}, creating {count} duplicate(s)"
+                )
+            else:
+                print(f"  [{i}] Using original slide {template_idx}")
+
+    # Step 2: DELETE unwanted slides and REORDER to final sequence at once
+    removed = set_slide_order(prs, final_order)
+    print(f"\nDeleted {removed} unused slides")
+    print(f"Reordered {len(final_order)} slides to final sequence")
 
     # Save the presentation
     prs.save(output_path)
@@ -0,0 +1,48 @@
+"""
+Find intersecting rectangles without comparing every pair.
+
+Rectangles are swept left to right. Each one is only compared against the
+rectangles whose horizontal extent still reaches it, so boxes spread across a
+slide or page cost O(n log n + k) instead of O(n^2).
+
+Main Functions:
+    find_overlapping_pairs: Return index pairs of rectangles that intersect
+"""
+
+from typing import List, Sequence, Tuple
+
+# (x0, y0, x1, y1)
+Box = Tuple[float, float, float, float]
+
+
+def find_overlapping_pairs(boxes: Sequence[Box]) -> List[Tuple[int, int]]:
+    """Find every pair of boxes whose interiors intersect.
+
+    Two boxes intersect when x0 < other_x1 and other_x0 < x1, and likewise
+    for y. Boxes that only share an edge do not intersect. Callers with a
+    stricter test, such as a minimum overlap, can filter the returned pairs
+    since any pair passing such a test is included.
+
+    Args:
+        boxes: Rectangles as (x0, y0, x1, y1)
+
+    Returns:
+        Sorted list of (i, j) index pairs with i < j, i.e. the order a nested
+        loop over all pairs would find them in
+    """
+    order = sorted(range(len(boxes)), key=lambda i: boxes[i][0])
+    active: List[int] = []
+    pairs = []
+
+    for i in order:
+        x0, y0, x1, y1 = boxes[i]
+        # Boxes ending before this one starts cannot reach any later box either
+        active = [j for j in active if x0 < boxes[j][2]]
+        for j in active:
+            other_x0, other_y0, other_x1, other_y1 = boxes[j]
+            if other_x0 < x1 and y0 < other_y1 and other_y0 < y1:
+                pairs.append((j, i) if j < i else (i, j))
+        active.append(i)
+
+    pairs.sort()
+    return pairs
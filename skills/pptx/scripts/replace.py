@@ -12,15 +12,21 @@ unless "paragraphs" is specified in the replacements for that shape.
 import json
 import sys
 from pathlib import Path
-from typing import Any, Dict, List
-
-from inventory import InventoryData, extract_text_inventory
+from typing import Any, Dict, List, Optional
+
+from inventory import (
+    InventoryData,
+    ShapeData,
+    extract_text_inventory,
+    is_valid_shape,
+)
 from pptx import Presentation
 from pptx.dml.color import RGBColor
 from pptx.enum.dml import MSO_THEME_COLOR
 from pptx.enum.text import PP_ALIGN
 from pptx.oxml.xmlchemy import OxmlElement
 from pptx.util import Pt
+from style_index import StyleIndex
 
 
 def clear_paragraph_bullets(paragraph):
@@ -201,6 +207,33 @@ def validate_replacements(inventory: InventoryData, replacements: Dict) -> List[
     return errors
 
 
+def remeasure_shapes(
+    prs, shapes: InventoryData, styles: Optional[StyleIndex] = None
+) -> InventoryData:
+    """Rebuild ShapeData for already inventoried shapes after their text changed.
+
+    Shapes keep their inventory IDs and absolute positions. Shapes left
+    without text are dropped, as a fresh inventory would. Layouts and masters
+    are not modified by replacements, so the style index used for the
+    original inventory stays valid.
+    """
+    styles = styles or StyleIndex()
+    updated: InventoryData = {}
+    for slide_key, shapes_dict in shapes.items():
+        slide = prs.slides[int(slide_key.split("-")[1])]
+        for shape_key, shape_data in shapes_dict.items():
+            if not is_valid_shape(shape_data.shape):
+                continue
+            updated.setdefault(slide_key, {})[shape_key] = ShapeData(
+                shape_data.shape,
+                shape_data.left_emu,
+                shape_data.top_emu,
+                slide,
+                styles,
+            )
+    return updated
+
+
 def check_duplicate_keys(pairs):
     """Check for duplicate keys when loading JSON."""
     result = {}
@@ -219,7 +252,8 @@ def apply_replacements(pptx_file: str, json_file: str, output_file: str):
 
     # Get inventory of all text shapes (returns ShapeData objects)
     # Pass prs to use same Presentation instance
-    inventory = extract_text_inventory(Path(pptx_file), prs)
+    styles = StyleIndex()
+    inventory = extract_text_inventory(Path(pptx_file), prs, styles=styles)
 
     # Detect text overflow in original presentation
     original_overflow = detect_frame_overflow(inventory)
@@ -244,6 +278,7 @@ def apply_replacements(pptx_file: str, json_file: str, output_file: str):
     shapes_processed = 0
     shapes_cleared = 0
     shapes_replaced = 0
+    replaced_shapes: InventoryData = {}
 
     # Process each slide from inventory
     for slide_key, shapes_dict in inventory.items():
@@ -278,6 +313,7 @@ def apply_replacements(pptx_file: str, json_file: str, output_file: str):
                 continue
 
             shapes_replaced += 1
+            replaced_shapes.setdefault(slide_key, {})[shape_key] = shape_data
 
             # Add replacement paragraphs
             for i, para_data in enumerate(replacement_shape_data["paragraphs"]):
@@ -288,20 +324,11 @@ def apply_replacements(pptx_file: str, json_file: str, output_file: str):
 
                 apply_paragraph_properties(p, para_data)
 
-    # Check for issues after replacements
-    # Save to a temporary file and reload to avoid modifying the presentation during inventory
-    # (extract_text_inventory accesses font.color which adds empty <a:solidFill/> elements)
-    import tempfile
-
-    with tempfile.NamedTemporaryFile(suffix=".pptx", delete=False) as tmp:
-        tmp_path = Path(tmp.name)
-        prs.save(str(tmp_path))
-
-    try:
-        updated_inventory = extract_text_inventory(tmp_path)
-        updated_overflow = detect_frame_overflow(updated_inventory)
-    finally:
-        tmp_path.unlink()  # Clean up temp file
+    # Check for issues after replacements. Cleared shapes have no text left,
+    # so only the replaced shapes need measuring again, and inventory reads
+    # the XML without modifying it, so the live presentation can be used.
+    updated_inventory = remeasure_shapes(prs, replaced_shapes, styles)
+    updated_overflow = detect_frame_overflow(updated_inventory)
 
     # Check if any text overflow got worse
     overflow_errors = []
@@ -0,0 +1,341 @@
+"""
+Resolve the effective default text style of shapes through their layout and master.
+
+Text in a placeholder takes its default font size and line spacing from the
+first of these that sets them for the paragraph's level: the shape's own list
+style, the matching layout placeholder, the matching master placeholder and
+finally the master's title, body or other text style. Text insets are
+inherited the same way from the body properties. Walking that chain for every
+shape means re-searching the layout and master XML each time, so StyleIndex
+resolves each (layout, placeholder) once and reuses the result for every
+slide that uses the layout.
+
+Classes:
+    TextStyle: Default font sizes and line spacing per level, and text insets
+    StyleIndex: Per-presentation cache of resolved placeholder and master styles
+"""
+
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from pptx.enum.shapes import PP_PLACEHOLDER
+
+A_NS = "{http://schemas.openxmlformats.org/drawingml/2006/main}"
+P_NS = "{http://schemas.openxmlformats.org/presentationml/2006/main}"
+
+# spTree children that are shapes, as in python-pptx's CT_GroupShape
+SHAPE_TAGS = {
+    f"{P_NS}{tag}"
+    for tag in ("sp", "grpSp", "graphicFrame", "cxnSp", "pic", "contentPart")
+}
+
+# Paragraph levels 0-8, stored as a:lvl1pPr to a:lvl9pPr
+TEXT_LEVELS = 9
+
+# Default PowerPoint text insets in EMUs: left, top, right, bottom
+DEFAULT_INSETS = (91440, 45720, 91440, 45720)
+INSET_ATTRS = ("lIns", "tIns", "rIns", "bIns")
+
+# Master placeholder type each layout placeholder type inherits from, as in
+# python-pptx's LayoutPlaceholder
+BASE_PLACEHOLDER_TYPE = {
+    PP_PLACEHOLDER.BODY: PP_PLACEHOLDER.BODY,
+    PP_PLACEHOLDER.CHART: PP_PLACEHOLDER.BODY,
+    PP_PLACEHOLDER.BITMAP: PP_PLACEHOLDER.BODY,
+    PP_PLACEHOLDER.CENTER_TITLE: PP_PLACEHOLDER.TITLE,
+    PP_PLACEHOLDER.ORG_CHART: PP_PLACEHOLDER.BODY,
+    PP_PLACEHOLDER.DATE: PP_PLACEHOLDER.DATE,
+    PP_PLACEHOLDER.FOOTER: PP_PLACEHOLDER.FOOTER,
+    PP_PLACEHOLDER.MEDIA_CLIP: PP_PLACEHOLDER.BODY,
+    PP_PLACEHOLDER.OBJECT: PP_PLACEHOLDER.BODY,
+    PP_PLACEHOLDER.PICTURE: PP_PLACEHOLDER.BODY,
+    PP_PLACEHOLDER.SLIDE_NUMBER: PP_PLACEHOLDER.SLIDE_NUMBER,
+    PP_PLACEHOLDER.SUBTITLE: PP_PLACEHOLDER.BODY,
+    PP_PLACEHOLDER.TABLE: PP_PLACEHOLDER.BODY,
+    PP_PLACEHOLDER.TITLE: PP_PLACEHOLDER.TITLE,
+}
+
+# ("pct", lines) or ("pts", points)
+LineSpacing = Tuple[str, float]
+
+# Per-level values from one list style, None where the level does not set them
+LevelProps = List[Tuple[Optional[float], Optional[LineSpacing]]]
+
+NO_LEVEL_PROPS: LevelProps = [(None, None)] * TEXT_LEVELS
+
+
+class TextStyle:
+    """Effective default text properties of a shape."""
+
+    def __init__(
+        self,
+        levels: LevelProps = NO_LEVEL_PROPS,
+        insets: Tuple[Optional[int], ...] = (None,) * 4,
+    ):
+        """Initialize from resolved per-level properties and insets.
+
+        Args:
+            levels: (font size in points, line spacing) for each level
+            insets: Left, top, right, bottom insets in EMUs; None entries use
+                the PowerPoint defaults
+        """
+        self.levels = levels
+        self.insets: Tuple[int, ...] = tuple(
+            value if value is not None else default
+            for value, default in zip(insets, DEFAULT_INSETS)
+        )
+        self._raw_insets = insets
+
+    def font_size(self, level: int = 0) -> Optional[float]:
+        """Default font size in points of paragraphs at a level, if known."""
+        return self.levels[min(max(level, 0), TEXT_LEVELS - 1)][0]
+
+    def line_spacing(self, level: int, font_size: float) -> Optional[float]:
+        """Default line height in points at a level for text of font_size points."""
+        spacing = self.levels[min(max(level, 0), TEXT_LEVELS - 1)][1]
+        if spacing is None:
+            return None
+        kind, value = spacing
+        return value * font_size if kind == "pct" else value
+
+    def with_overrides(self, tx_body: Optional[Any]) -> "TextStyle":
+        """Apply the list style and insets set directly on a shape's p:txBody."""
+        if tx_body is None:
+            return self
+        lst_style = tx_body.find(f"{A_NS}lstStyle")
+        body_pr = tx_body.find(f"{A_NS}bodyPr")
+        if (lst_style is None or len(lst_style) == 0) and (
+            body_pr is None or not any(attr in body_pr.attrib for attr in INSET_ATTRS)
+        ):
+            return self
+        return TextStyle(
+            _merge_levels(read_level_props(lst_style), self.levels),
+            _merge_insets(read_insets(body_pr), self._raw_insets),
+        )
+
+
+DEFAULT_TEXT_STYLE = TextStyle()
+
+
+def _parse_line_spacing(ln_spc: Optional[Any]) -> Optional[LineSpacing]:
+    """Read an a:lnSpc element."""
+    if ln_spc is None:
+        return None
+    pct = ln_spc.find(f"{A_NS}spcPct")
+    if pct is not None and pct.get("val"):
+        val = pct.get("val")
+        if val.endswith("%"):
+            return "pct", float(val[:-1]) / 100.0
+        return "pct", int(val) / 100000.0
+    pts = ln_spc.find(f"{A_NS}spcPts")
+    if pts is not None and pts.get("val"):
+        return "pts", int(pts.get("val")) / 100.0
+    return None
+
+
+def read_level_props(lst_style: Optional[Any]) -> LevelProps:
+    """Read font size and line spacing of each level of a list or text style.
+
+    Args:
+        lst_style: An a:lstStyle element or a master p:titleStyle, p:bodyStyle
+            or p:otherStyle element, or None
+
+    Returns:
+        (font size in points, line spacing) for levels 0-8
+    """
+    if lst_style is None:
+        return NO_LEVEL_PROPS
+    levels = []
+    for level in range(1, TEXT_LEVELS + 1):
+        lvl_ppr = lst_style.find(f"{A_NS}lvl{level}pPr")
+        if lvl_ppr is None:
+            levels.append((None, None))
+            continue
+        font_size = line_spacing = None
+        def_rpr = lvl_ppr.find(f"{A_NS}defRPr")
+        try:
+            if def_rpr is not None and def_rpr.get("sz"):
+                font_size = int(def_rpr.get("sz")) / 100.0
+        except ValueError:
+            pass
+        try:
+            line_spacing = _parse_line_spacing(lvl_ppr.find(f"{A_NS}lnSpc"))
+        except ValueError:
+            pass
+        levels.append((font_size, line_spacing))
+    return levels
+
+
+def read_insets(body_pr: Optional[Any]) -> Tuple[Optional[int], ...]:
+    """Read the left, top, right and bottom insets of an a:bodyPr element."""
+    if body_pr is None:
+        return (None,) * 4
+    insets = []
+    for attr in INSET_ATTRS:
+        try:
+            insets.append(int(body_pr.get(attr)) if body_pr.get(attr) else None)
+        except ValueError:
+            insets.append(None)
+    return tuple(insets)
+
+
+def _merge_levels(own: LevelProps, base: LevelProps) -> LevelProps:
+    """Fill unset values of own from base, level by level."""
+    return [
+        (
+            size if size is not None else base_size,
+            spacing if spacing is not None else base_spacing,
+        )
+        for (size, spacing), (base_size, base_spacing) in zip(own, base)
+    ]
+
+
+def _merge_insets(
+    own: Tuple[Optional[int], ...], base: Tuple[Optional[int], ...]
+) -> Tuple[Optional[int], ...]:
+    return tuple(value if value is not None else b for value, b in zip(own, base))
+
+
+def _placeholder_props(shape_elm: Any) -> Tuple[LevelProps, Tuple[Optional[int], ...]]:
+    """Read the list style levels and insets of a layout or master placeholder."""
+    tx_body = shape_elm.find(f"{P_NS}txBody")
+    if tx_body is None:
+        return NO_LEVEL_PROPS, (None,) * 4
+    return (
+        read_level_props(tx_body.find(f"{A_NS}lstStyle")),
+        read_insets(tx_body.find(f"{A_NS}bodyPr")),
+    )
+
+
+def find_placeholder(shape_elm: Any) -> Optional[Any]:
+    """Return the p:ph element of a shape, or None if it is not a placeholder."""
+    if len(shape_elm) == 0:
+        return None
+    return shape_elm[0].find(f"{P_NS}nvPr/{P_NS}ph")
+
+
+def iter_placeholders(root: Any) -> Iterator[Tuple[Any, Any]]:
+    """Yield (element, p:ph) for each top-level placeholder shape of a part."""
+    sp_tree = root.find(f"{P_NS}cSld/{P_NS}spTree")
+    if sp_tree is None:
+        return
+    for shape_elm in sp_tree:
+        if shape_elm.tag in SHAPE_TAGS:
+            ph = find_placeholder(shape_elm)
+            if ph is not None:
+                yield shape_elm, ph
+
+
+def _text_style_name(ph_type: Any) -> str:
+    """Master text style used by a placeholder type."""
+    if ph_type in (PP_PLACEHOLDER.TITLE, PP_PLACEHOLDER.CENTER_TITLE):
+        return "titleStyle"
+    if BASE_PLACEHOLDER_TYPE.get(ph_type) == PP_PLACEHOLDER.BODY:
+        return "bodyStyle"
+    return "otherStyle"
+
+
+class _MasterStyles:
+    """Text styles and placeholder properties of one slide master."""
+
+    def __init__(self, master_elm: Any):
+        tx_styles = master_elm.find(f"{P_NS}txStyles")
+        self.text_styles: Dict[str, LevelProps] = {
+            name: read_level_props(
+                tx_styles.find(f"{P_NS}{name}") if tx_styles is not None else None
+            )
+            for name in ("titleStyle", "bodyStyle", "otherStyle")
+        }
+
+        # First placeholder of each type, as MasterPlaceholders.get() finds it
+        self.placeholders: Dict[Any, Tuple[LevelProps, Tuple[Optional[int], ...]]] = {}
+        for shape_elm, ph in iter_placeholders(master_elm):
+            if ph.type not in self.placeholders:
+                self.placeholders[ph.type] = _placeholder_props(shape_elm)
+
+
+class _LayoutPlaceholders:
+    """Placeholder elements of one slide layout by idx and by type."""
+
+    def __init__(self, layout_elm: Any):
+        self.by_idx: Dict[int, Tuple[Any, Any]] = {}
+        self.by_type: Dict[Any, Tuple[Any, Any]] = {}
+        for shape_elm, ph in iter_placeholders(layout_elm):
+            self.by_idx.setdefault(ph.idx, (shape_elm, ph))
+            self.by_type.setdefault(ph.type, (shape_elm, ph))
+
+
+class StyleIndex:
+    """Effective placeholder and master text styles of one presentation.
+
+    Entries are keyed by the layout and master XML elements, so an index must
+    only be used with shapes of the presentation those elements belong to.
+    Resolving a placeholder style parses its layout and master once; every
+    further shape using the same layout placeholder is a dictionary lookup.
+    """
+
+    def __init__(self):
+        self._masters: Dict[Any, _MasterStyles] = {}
+        self._layouts: Dict[Any, _LayoutPlaceholders] = {}
+        self._styles: Dict[Tuple[Any, Any, Any, int], TextStyle] = {}
+
+    def _master(self, master_elm: Any) -> _MasterStyles:
+        if master_elm not in self._masters:
+            self._masters[master_elm] = _MasterStyles(master_elm)
+        return self._masters[master_elm]
+
+    def placeholder_style(
+        self, layout_elm: Any, master_elm: Any, ph_type: Any, ph_idx: int
+    ) -> TextStyle:
+        """Resolve the default text style of a slide placeholder.
+
+        The layout placeholder is the one with the same idx, falling back to
+        the first one of the same type. Its type then selects the master
+        placeholder and master text style to inherit from.
+
+        Args:
+            layout_elm: The slide layout's p:sldLayout element
+            master_elm: The slide master's p:sldMaster element
+            ph_type: Placeholder type (PP_PLACEHOLDER member) of the slide shape
+            ph_idx: Placeholder idx of the slide shape
+
+        Returns:
+            TextStyle before the shape's own overrides
+        """
+        key = (layout_elm, master_elm, ph_type, ph_idx)
+        if key in self._styles:
+            return self._styles[key]
+
+        if layout_elm not in self._layouts:
+            self._layouts[layout_elm] = _LayoutPlaceholders(layout_elm)
+        layout = self._layouts[layout_elm]
+        match = layout.by_idx.get(ph_idx) or layout.by_type.get(ph_type)
+
+        levels, insets = NO_LEVEL_PROPS, (None,) * 4
+        if match is not None:
+            shape_elm, layout_ph = match
+            ph_type = layout_ph.type
+            levels, insets = _placeholder_props(shape_elm)
+
+        master = self._master(master_elm)
+        base_type = BASE_PLACEHOLDER_TYPE.get(ph_type)
+        if base_type in master.placeholders:
+            master_levels, master_insets = master.placeholders[base_type]
+            levels = _merge_levels(levels, master_levels)
+            insets = _merge_insets(insets, master_insets)
+        levels = _merge_levels(levels, master.text_styles[_text_style_name(ph_type)])
+
+        style = TextStyle(levels, insets)
+        self._styles[key] = style
+        return style
+
+    def shape_style(self, master_elm: Any) -> TextStyle:
+        """Default text style assumed for shapes that are not placeholders.
+
+        Only the font sizes of the master body style are used, as a
+        conservative estimate; spacing and insets are PowerPoint defaults.
+        """
+        key = (None, master_elm, None, 0)
+        if key not in self._styles:
+            body_style = self._master(master_elm).text_styles["bodyStyle"]
+            self._styles[key] = TextStyle([(size, None) for size, _ in body_style])
+        return self._styles[key]
@@ -20,6 +20,7 @@ Grid limits by column count:
 
 Usage:
     python thumbnail.py input.pptx [output_prefix] [--cols N] [--outline-placeholders]
+                        [--slides RANGE]
 
 Examples:
     python thumbnail.py presentation.pptx
@@ -38,24 +39,39 @@ Examples:
 
     python thumbnail.py template.pptx analysis --outline-placeholders
     # Creates thumbnail grids with red outlines around text placeholders
+
+    python thumbnail.py large-deck.pptx review --slides 40-45
+    # Renders only slides 40 to 45 (0-based, labels keep the slide numbers)
+
+Rendered slides are cached per slide under ~/.cache/pptx-skill/thumbnails (or
+$XDG_CACHE_HOME, or --cache-dir), keyed by the slide and everything it draws
+from, so after an edit only the changed slides go through LibreOffice again.
+Use --no-cache to render everything.
 """
 
 import argparse
+import os
 import subprocess
 import sys
 import tempfile
+import zipfile
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
+from xml.etree import ElementTree
 
-from inventory import extract_text_inventory
+from lxml import etree
 from PIL import Image, ImageDraw, ImageFont
-from pptx import Presentation
+
+from inventory import get_inventory_as_dict, parse_slide_range
+from inventory_cache import read_slide_parts
+from thumbnail_cache import ThumbnailCache
 
 # Constants
-THUMBNAIL_WIDTH = 300  # Fixed thumbnail width in pixels
-CONVERSION_DPI = 100  # DPI for PDF to image conversion
+THUMBNAIL_WIDTH = 300  # Fixed thumbnail width in pixels, also the render width
 MAX_COLS = 6  # Maximum number of columns
 DEFAULT_COLS = 5  # Default number of columns
 JPEG_QUALITY = 95  # JPEG compression quality
+DEFAULT_JOBS = min(4, os.cpu_count() or 1)  # Parallel pdftoppm processes
 
 # Grid layout constants
 GRID_PADDING = 20  # Padding between thumbnails
@@ -86,6 +102,29 @@ def main():
         action="store_true",
         help="Outline text placeholders with a colored border",
     )
+    parser.add_argument(
+        "--slides",
+        help="Slides to render as 0-based indices and ranges, e.g. '0,3-5,10-' "
+        "(default: all)",
+    )
+    parser.add_argument(
+        "--cache-dir",
+        type=Path,
+        help="Directory for cached slide images "
+        "(default: ~/.cache/pptx-skill/thumbnails or under $XDG_CACHE_HOME)",
+    )
+    parser.add_argument(
+        "--no-cache",
+        action="store_true",
+        help="Render every slide instead of reusing cached slide images",
+    )
+    parser.add_argument(
+        "--jobs",
+        type=int,
+        default=DEFAULT_JOBS,
+        help="Number of pdftoppm processes rasterizing pages in parallel "
+        f"(default: {DEFAULT_JOBS})",
+    )
 
     args = parser.parse_args()
 
@@ -106,20 +145,51 @@ def main():
     print(f"Processing: {args.input}")
 
     try:
+        # Detect hidden slides
+        print("Analyzing presentation...")
+        hidden, slide_dimensions = analyze_presentation(input_path)
+        print(f"Total slides: {len(hidden)}")
+        if any(hidden):
+            # 1-based for display
+            print(f"Hidden slides: {[idx + 1 for idx, h in enumerate(hidden) if h]}")
+
+        slide_indices = None
+        if args.slides:
+            try:
+                slide_indices = parse_slide_range(args.slides, len(hidden))
+            except ValueError as e:
+                print(f"Error: {e}")
+                sys.exit(1)
+
         with tempfile.TemporaryDirectory() as temp_dir:
-            # Get placeholder regions if outlining is enabled
-            placeholder_regions = None
-            slide_dimensions = None
-            if args.outline_placeholders:
-                print("Extracting placeholder regions...")
-                placeholder_regions, slide_dimensions = get_placeholder_regions(
-                    input_path
+            # Convert slides to images in the background; LibreOffice and
+            # pdftoppm run as separate processes
+            cache = None if args.no_cache else ThumbnailCache(args.cache_dir)
+            with ThreadPoolExecutor(max_workers=1) as executor:
+                images_future = executor.submit(
+                    convert_to_images,
+                    input_path,
+                    Path(temp_dir),
+                    THUMBNAIL_WIDTH,
+                    hidden,
+                    slide_indices,
+                    cache,
+                    max(1, args.jobs),
                 )
-                if placeholder_regions:
-                    print(f"Found placeholders on {len(placeholder_regions)} slides")
 
-            # Convert slides to images
-            slide_images = convert_to_images(input_path, Path(temp_dir), CONVERSION_DPI)
+                # Get placeholder regions while the slides render
+                placeholder_regions = None
+                if args.outline_placeholders:
+                    print("Extracting placeholder regions...")
+                    placeholder_regions = get_placeholder_regions(
+                        input_path, slide_indices
+                    )
+                    if placeholder_regions:
+                        print(
+                            f"Found placeholders on {len(placeholder_regions)} slides"
+                        )
+
+                slide_numbers, slide_images = images_future.result()
             if not slide_images:
                 print("Error: No slides found")
                 sys.exit(1)
@@ -134,7 +204,10 @@ def main():
                 output_path,
                 placeholder_regions,
                 slide_dimensions,
+                slide_numbers,
             )
+            if cache is not None:
+                cache.evict()
 
             # Print saved files
             print(f"Created {len(grid_files)} grid(s):")
@@ -150,27 +223,51 @@ def create_hidden_slide_placeholder(size):
     """Create placeholder image for hidden slides."""
     img = Image.new("RGB", size, color="#F0F0F0")
     draw = ImageDraw.Draw(img)
-    line_width = max(5, min(size) // 100)
+    line_width = max(2, min(size) // 80)
     draw.line([(0, 0), size], fill="#CCCCCC", width=line_width)
     draw.line([(size[0], 0), (0, size[1])], fill="#CCCCCC", width=line_width)
     return img
 
 
-def get_placeholder_regions(pptx_path):
-    """Extract ALL text regions from the presentation.
+def analyze_presentation(pptx_path):
+    """Read hidden slide flags and the slide size straight from the package.
 
-    Returns a tuple of (placeholder_regions, slide_dimensions).
-    text_regions is a dict mapping slide indices to lists of text regions.
-    Each region is a dict with 'left', 'top', 'width', 'height' in inches.
+    Only presentation.xml and the root element of each slide are parsed, so
+    this is cheap enough to run before rendering starts.
+
+    Returns a tuple of (hidden, slide_dimensions).
+    hidden is a list with one flag per slide in presentation order.
     slide_dimensions is a tuple of (width_inches, height_inches).
     """
-    prs = Presentation(str(pptx_path))
-    inventory = extract_text_inventory(pptx_path, prs)
-    placeholder_regions = {}
+    with zipfile.ZipFile(pptx_path) as zf:
+        slide_parts, (width_emu, height_emu) = read_slide_parts(zf)
+        hidden = []
+        for slide_part in slide_parts:
+            with zf.open(slide_part) as f:
+                # The show attribute sits on the root element
+                _, root = next(ElementTree.iterparse(f, events=("start",)))
+            hidden.append(root.get("show") == "0")
 
     # Get actual slide dimensions in inches (EMU to inches conversion)
-    slide_width_inches = (prs.slide_width or 9144000) / 914400.0
-    slide_height_inches = (prs.slide_height or 5143500) / 914400.0
+    slide_width_inches = (width_emu or 9144000) / 914400.0
+    slide_height_inches = (height_emu or 5143500) / 914400.0
+    return hidden, (slide_width_inches, slide_height_inches)
+
+
+def get_placeholder_regions(pptx_path, slide_indices=None):
+    """Extract ALL text regions from the presentation.
+
+    Only the slides in slide_indices are analyzed when it is given. Regions
+    come from the cached inventory, computed from the raw slide XML on a
+    miss, so the presentation is never loaded through python-pptx.
+
+    Returns a dict mapping slide indices to lists of text regions.
+    Each region is a dict with 'left', 'top', 'width', 'height' in inches.
+    """
+    inventory = get_inventory_as_dict(
+        pptx_path, use_cache=True, backend="xml", slide_indices=slide_indices
+    )
+    placeholder_regions = {}
 
     for slide_key, shapes in inventory.items():
         # Extract slide index from "slide-N" format
@@ -181,41 +278,105 @@ def get_placeholder_regions(pptx_path):
             # The inventory only contains shapes with text, so all shapes should be highlighted
             regions.append(
                 {
-                    "left": shape_data.left,
-                    "top": shape_data.top,
-                    "width": shape_data.width,
-                    "height": shape_data.height,
+                    "left": shape_data["left"],
+                    "top": shape_data["top"],
+                    "width": shape_data["width"],
+                    "height": shape_data["height"],
                 }
             )
 
         if regions:
             placeholder_regions[slide_idx] = regions
 
-    return placeholder_regions, (slide_width_inches, slide_height_inches)
+    return placeholder_regions
 
 
-def convert_to_images(pptx_path, temp_dir, dpi):
-    """Convert PowerPoint to images via PDF, handling hidden slides."""
-    # Detect hidden slides
-    print("Analyzing presentation...")
-    prs = Presentation(str(pptx_path))
-    total_slides = len(prs.slides)
+def convert_to_images(
+    pptx_path, temp_dir, width, hidden, slide_indices=None, cache=None, jobs=1
+):
+    """Convert PowerPoint to images via PDF, handling hidden slides.
 
-    # Find hidden slides (1-based indexing for display)
-    hidden_slides = {
-        idx + 1
-        for idx, slide in enumerate(prs.slides)
-        if slide.element.get("show") == "0"
-    }
+    Slides with an image in the cache are not rendered again. The remaining
+    selected slides are converted to PDF in one LibreOffice run and each
+    page is rasterized once, directly at the given pixel width and split
+    across jobs pdftoppm processes. LibreOffice leaves hidden slides out of
+    the PDF, so they get placeholder images instead of a page. hidden holds
+    the flags from analyze_presentation().
 
-    print(f"Total slides: {total_slides}")
-    if hidden_slides:
-        print(f"Hidden slides: {sorted(hidden_slides)}")
+    Returns a tuple of (slide_numbers, image_paths) in slide order, where
+    slide_numbers are the 0-based indices of the rendered slides.
+    """
+    if slide_indices is None:
+        slide_indices = list(range(len(hidden)))
+
+    visible = [idx for idx in slide_indices if not hidden[idx]]
+    slide_images = {}
+    if cache is not None:
+        keys = cache.slide_keys(pptx_path, f"pdftoppm-jpeg-w{width}")
+        for slide_idx in visible:
+            cached_path = cache.get(keys[slide_idx])
+            if cached_path is not None:
+                slide_images[slide_idx] = cached_path
+        if slide_images:
+            print(f"Reusing {len(slide_images)} cached slide images")
+
+    to_render = [idx for idx in visible if idx not in slide_images]
+    if to_render:
+        rendered = render_slides(pptx_path, temp_dir, width, to_render, hidden, jobs)
+        for slide_idx, image_path in rendered.items():
+            slide_images[slide_idx] = image_path
+            if cache is not None:
+                cache.put(keys[slide_idx], image_path)
+
+    # Get placeholder dimensions from first rendered slide
+    if slide_images:
+        with Image.open(next(iter(slide_images.values()))) as img:
+            placeholder_size = img.size
+    else:
+        placeholder_size = (width, width * 9 // 16)
 
-    pdf_path = temp_dir / f"{pptx_path.stem}.pdf"
+    # Create the list of images with placeholders for hidden slides
+    slide_numbers = []
+    all_images = []
+    for slide_idx in slide_indices:
+        if hidden[slide_idx]:
+            # Create placeholder image for hidden slide
+            placeholder_path = temp_dir / f"hidden-{slide_idx + 1:03d}.jpg"
+            placeholder_img = create_hidden_slide_placeholder(placeholder_size)
+            placeholder_img.save(placeholder_path, "JPEG")
+            image_path = placeholder_path
+        else:
+            # Use the actual visible slide image
+            image_path = slide_images.get(slide_idx)
+            if image_path is None:
+                continue
+        slide_numbers.append(slide_idx)
+        all_images.append(image_path)
+
+    return slide_numbers, all_images
+
+
+def render_slides(pptx_path, temp_dir, width, slide_indices, hidden, jobs=1):
+    """Render visible slides to JPEG files through LibreOffice and pdftoppm.
+
+    When only some visible slides are requested, the others are marked
+    hidden in a temporary copy of the deck so that LibreOffice neither
+    draws nor exports them. Slides keep their positions, so slide number
+    fields render as they do in the full deck.
+
+    Returns a dict of 0-based slide index -> image path.
+    """
+    deck_path = pptx_path
+    visible_count = hidden.count(False)
+    if len(slide_indices) < visible_count:
+        deck_path = temp_dir / "render" / pptx_path.name
+        deck_path.parent.mkdir()
+        write_render_deck(pptx_path, deck_path, set(slide_indices))
+
+    pdf_path = temp_dir / f"{deck_path.stem}.pdf"
 
     # Convert to PDF
-    print("Converting to PDF...")
+    print(f"Converting {len(slide_indices)} of {visible_count} slides to PDF...")
     result = subprocess.run(
         [
             "soffice",
@@ -224,7 +385,7 @@ def convert_to_images(pptx_path, temp_dir, dpi):
             "pdf",
             "--outdir",
             str(temp_dir),
-            str(pptx_path),
+            str(deck_path),
         ],
         capture_output=True,
         text=True,
@@ -233,42 +394,88 @@ def convert_to_images(pptx_path, temp_dir, dpi):
         raise RuntimeError("PDF conversion failed")
 
     # Convert PDF to images
-    print(f"Converting to images at {dpi} DPI...")
-    result = subprocess.run(
-        ["pdftoppm", "-jpeg", "-r", str(dpi), str(pdf_path), str(temp_dir / "slide")],
-        capture_output=True,
-        text=True,
-    )
-    if result.returncode != 0:
-        raise RuntimeError("Image conversion failed")
+    print(f"Converting to images {width} pixels wide...")
+    pages = range(1, len(slide_indices) + 1)
+    page_images = rasterize_pages(pdf_path, pages, temp_dir / "slide", width, jobs)
+    return {
+        slide_idx: page_images[page]
+        for slide_idx, page in zip(slide_indices, pages)
+        if page in page_images
+    }
 
-    visible_images = sorted(temp_dir.glob("slide-*.jpg"))
 
-    # Create full list with placeholders for hidden slides
-    all_images = []
-    visible_idx = 0
+def write_render_deck(pptx_path, output_path, slide_indices):
+    """Copy a deck, marking every slide not in slide_indices as hidden."""
+    with zipfile.ZipFile(pptx_path) as src:
+        slide_parts = read_slide_parts(src)[0]
+        to_hide = {
+            part for idx, part in enumerate(slide_parts) if idx not in slide_indices
+        }
+        with zipfile.ZipFile(output_path, "w", zipfile.ZIP_DEFLATED) as dst:
+            for info in src.infolist():
+                data = src.read(info)
+                if info.filename in to_hide:
+                    root = etree.fromstring(data)
+                    root.set("show", "0")
+                    data = etree.tostring(
+                        root, xml_declaration=True, encoding="UTF-8", standalone=True
+                    )
+                dst.writestr(info, data)
 
-    # Get placeholder dimensions from first visible slide
-    if visible_images:
-        with Image.open(visible_images[0]) as img:
-            placeholder_size = img.size
-    else:
-        placeholder_size = (1920, 1080)
 
-    for slide_num in range(1, total_slides + 1):
-        if slide_num in hidden_slides:
-            # Create placeholder image for hidden slide
-            placeholder_path = temp_dir / f"hidden-{slide_num:03d}.jpg"
-            placeholder_img = create_hidden_slide_placeholder(placeholder_size)
-            placeholder_img.save(placeholder_path, "JPEG")
-            all_images.append(placeholder_path)
+def rasterize_pages(pdf_path, pages, output_root, width, jobs=1):
+    """Render the given 1-based PDF pages to JPEG files of the given width.
+
+    Pages are scaled by pdftoppm itself, so no full-size page image is ever
+    produced. Consecutive pages are grouped into page ranges of similar
+    length, and up to jobs ranges are rendered by concurrent pdftoppm
+    processes.
+
+    Returns a dict of page number -> image path.
+    """
+    pages = sorted(set(pages))
+    chunk_size = max(1, -(-len(pages) // jobs))
+
+    ranges = []
+    for page in pages:
+        first, last = ranges[-1] if ranges else (0, 0)
+        if ranges and last == page - 1 and page - first < chunk_size:
+            ranges[-1] = (first, page)
         else:
-            # Use the actual visible slide image
-            if visible_idx < len(visible_images):
-                all_images.append(visible_images[visible_idx])
-                visible_idx += 1
+            ranges.append((page, page))
+
+    def render_range(page_range):
+        first, last = page_range
+        return subprocess.run(
+            [
+                "pdftoppm",
+                "-jpeg",
+                "-scale-to-x",
+                str(width),
+                "-scale-to-y",
+                "-1",
+                "-f",
+                str(first),
+                "-l",
+                str(last),
+                str(pdf_path),
+                str(output_root),
+            ],
+            capture_output=True,
+            text=True,
+        )
 
-    return all_images
+    with ThreadPoolExecutor(max_workers=jobs) as executor:
+        results = list(executor.map(render_range, ranges))
+    if any(result.returncode != 0 for result in results):
+        raise RuntimeError("Image conversion failed")
+
+    # pdftoppm names files {root}-{page}.jpg, zero-padding the page number
+    # to the width of the document's page count
+    return {
+        int(path.stem.rsplit("-", 1)[1]): path
+        for path in output_root.parent.glob(f"{output_root.name}-*.jpg")
+    }
 
 
 def create_grids(
@@ -278,8 +485,15 @@ def create_grids(
     output_path,
     placeholder_regions=None,
     slide_dimensions=None,
+    slide_numbers=None,
 ):
-    """Create multiple thumbnail grids from slide images, max cols×(cols+1) images per grid."""
+    """Create multiple thumbnail grids from slide images, max cols×(cols+1) images per grid.
+
+    slide_numbers holds the 0-based slide index of each image, used for labels
+    and placeholder regions; images are numbered from 0 when it is omitted.
+    """
+    if slide_numbers is None:
+        slide_numbers = list(range(len(image_paths)))
     # Maximum images per grid is cols × (cols + 1) for better proportions
     max_images_per_grid = cols * (cols + 1)
     grid_files = []
@@ -297,7 +511,12 @@ def create_grids(
 
         # Create grid for this chunk
         grid = create_grid(
-            chunk_images, cols, width, start_idx, placeholder_regions, slide_dimensions
+            chunk_images,
+            cols,
+            width,
+            slide_numbers[start_idx:end_idx],
+            placeholder_regions,
+            slide_dimensions,
         )
 
         # Generate output filename
@@ -322,11 +541,15 @@ def create_grid(
     image_paths,
     cols,
     width,
-    start_slide_num=0,
+    slide_numbers,
     placeholder_regions=None,
     slide_dimensions=None,
 ):
-    """Create thumbnail grid from slide images with optional placeholder outlining."""
+    """Create thumbnail grid from slide images with optional placeholder outlining.
+
+    Images are decoded and pasted one at a time, each at thumbnail size, so
+    memory stays bounded by the grid itself.
+    """
     font_size = int(width * FONT_SIZE_RATIO)
     label_padding = int(font_size * LABEL_PADDING_RATIO)
 
@@ -353,7 +576,7 @@ def create_grid(
         font = ImageFont.load_default()
 
     # Place thumbnails
-    for i, img_path in enumerate(image_paths):
+    for i, (slide_num, img_path) in enumerate(zip(slide_numbers, image_paths)):
         row, col = i // cols, i % cols
         x = col * width + (col + 1) * GRID_PADDING
         y_base = (
@@ -361,7 +584,7 @@ def create_grid(
         )
 
         # Add label with actual slide number
-        label = f"{start_slide_num + i}"
+        label = f"{slide_num}"
         bbox = draw.textbbox((0, 0), label, font=font)
         text_w = bbox[2] - bbox[0]
         draw.text(
@@ -375,28 +598,30 @@ def create_grid(
         y_thumbnail = y_base + label_padding + font_size + label_padding
 
         with Image.open(img_path) as img:
-            # Get original dimensions before thumbnail
-            orig_w, orig_h = img.size
+            # Let the JPEG decoder downscale larger images while loading
+            img.draft("RGB", (width, height))
+            img.thumbnail((width, height), Image.Resampling.LANCZOS)
+            thumb_w, thumb_h = img.size
 
             # Apply placeholder outlines if enabled
-            if placeholder_regions and (start_slide_num + i) in placeholder_regions:
+            if placeholder_regions and slide_num in placeholder_regions:
                 # Convert to RGBA for transparency support
                 if img.mode != "RGBA":
                     img = img.convert("RGBA")
 
                 # Get the regions for this slide
-                regions = placeholder_regions[start_slide_num + i]
+                regions = placeholder_regions[slide_num]
 
                 # Calculate scale factors using actual slide dimensions
                 if slide_dimensions:
                     slide_width_inches, slide_height_inches = slide_dimensions
                 else:
-                    # Fallback: estimate from image size at CONVERSION_DPI
-                    slide_width_inches = orig_w / CONVERSION_DPI
-                    slide_height_inches = orig_h / CONVERSION_DPI
+                    # Fallback: assume a 10 inch wide slide with the image's aspect
+                    slide_width_inches = 10.0
+                    slide_height_inches = 10.0 * thumb_h / thumb_w
 
-                x_scale = orig_w / slide_width_inches
-                y_scale = orig_h / slide_height_inches
+                x_scale = thumb_w / slide_width_inches
+                y_scale = thumb_h / slide_height_inches
 
                 # Create a highlight overlay
                 overlay = Image.new("RGBA", img.size, (255, 255, 255, 0))
@@ -404,7 +629,7 @@ def create_grid(
 
                 # Highlight each placeholder region
                 for region in regions:
-                    # Convert from inches to pixels in the original image
+                    # Convert from inches to pixels in the thumbnail
                     px_left = int(region["left"] * x_scale)
                     px_top = int(region["top"] * y_scale)
                     px_width = int(region["width"] * x_scale)
@@ -413,7 +638,7 @@ def create_grid(
                     # Draw highlight outline with red color and thick stroke
                     # Using a bright red outline instead of fill
                     stroke_width = max(
-                        5, min(orig_w, orig_h) // 150
+                        2, min(thumb_w, thumb_h) // 80
                     )  # Thicker proportional stroke width
                     overlay_draw.rectangle(
                         [(px_left, px_top), (px_left + px_width, px_top + px_height)],
@@ -426,7 +651,6 @@ def create_grid(
                 # Convert back to RGB for JPEG saving
                 img = img.convert("RGB")
 
-            img.thumbnail((width, height), Image.Resampling.LANCZOS)
             w, h = img.size
             tx = x + (width - w) // 2
             ty = y_thumbnail + (height - h) // 2
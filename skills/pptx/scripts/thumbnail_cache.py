@@ -0,0 +1,178 @@
+#!/usr/bin/env python3
+"""
+On-disk cache of rendered slide images.
+
+Each slide is keyed by a hash of every part that affects how it renders: the
+slide XML and its relationships, the media, charts and embeddings it
+references, and its layout, master and theme with their own relationships and
+media. The key also covers the slide size, the installed fonts and the render
+settings, so a cached image is only reused when LibreOffice would draw the
+same picture. Notes, comments and links to other slides are not followed.
+
+Entries are image files under the user cache directory. Hits refresh an
+entry's modification time, and the least recently used entries are removed
+once the cache grows beyond its size limit.
+
+Classes:
+    ThumbnailCache: Slide render key computation and size-bounded image storage
+"""
+
+import hashlib
+import os
+import shutil
+import tempfile
+import zipfile
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+from fonts import get_font_index
+from inventory_cache import read_rels, read_slide_parts, rels_part_name
+
+# Bump when the rendering pipeline changes in a way that alters the images
+CACHE_VERSION = 1
+CACHE_MAX_BYTES = 256 * 1024 * 1024
+
+# Relationships that do not change how a slide is drawn. Masters also relate
+# to all of their layouts, of which only the slide's own layout matters.
+SKIPPED_REL_TYPES = ("/notesSlide", "/slide", "/comments", "/commentAuthors")
+MASTER_LAYOUT_REL_TYPE = "/slideLayout"
+
+# Slide number fields render the slide's position in the deck
+SLIDE_NUMBER_FIELD = b'type="slidenum"'
+
+
+def default_cache_dir() -> Path:
+    """Return the directory holding cached slide images."""
+    base = os.environ.get("XDG_CACHE_HOME") or Path.home() / ".cache"
+    return Path(base) / "pptx-skill" / "thumbnails"
+
+
+class ThumbnailCache:
+    """Rendered slide images stored as files keyed by content hash."""
+
+    def __init__(
+        self,
+        cache_dir: Optional[Path] = None,
+        max_bytes: int = CACHE_MAX_BYTES,
+        suffix: str = ".jpg",
+    ):
+        """Initialize the cache.
+
+        Args:
+            cache_dir: Directory for cache entries, or None for the default
+            max_bytes: Total size above which least recently used entries are
+                evicted
+            suffix: File extension of the stored images
+        """
+        self.cache_dir = cache_dir or default_cache_dir()
+        self.max_bytes = max_bytes
+        self.suffix = suffix
+
+    def slide_keys(self, pptx_path: Path, render_settings: str) -> List[str]:
+        """Compute the render key of every slide in presentation order.
+
+        Args:
+            pptx_path: Path to the PowerPoint file
+            render_settings: Description of the renderer options, e.g. the
+                resolution, so that images rendered differently do not collide
+
+        Returns:
+            One hex key per slide
+        """
+        part_hashes: Dict[str, bytes] = {}
+        part_rels: Dict[str, List[Tuple[str, str, str]]] = {}
+
+        with zipfile.ZipFile(pptx_path) as zf:
+
+            def part_hash(part_name: str) -> bytes:
+                # Layouts, masters and media are shared, so hash each part
+                # and its relationships only once
+                if part_name not in part_hashes:
+                    digest = hashlib.blake2b(digest_size=16)
+                    for name in (part_name, rels_part_name(part_name)):
+                        try:
+                            digest.update(zf.read(name))
+                        except KeyError:
+                            pass
+                        digest.update(b"\0")
+                    part_hashes[part_name] = digest.digest()
+                return part_hashes[part_name]
+
+            def rendered_parts(slide_part: str) -> List[str]:
+                """Return the parts reachable from a slide that affect its rendering."""
+                found = [slide_part]
+                seen = {slide_part}
+                for part_name in found:
+                    if part_name not in part_rels:
+                        part_rels[part_name] = read_rels(zf, part_name)
+                    for _, rel_type, target in part_rels[part_name]:
+                        if target in seen or rel_type.endswith(SKIPPED_REL_TYPES):
+                            continue
+                        if part_name != slide_part and rel_type.endswith(
+                            MASTER_LAYOUT_REL_TYPE
+                        ):
+                            continue
+                        seen.add(target)
+                        found.append(target)
+                return found
+
+            slide_parts, slide_size = read_slide_parts(zf)
+            prefix = (
+                f"{CACHE_VERSION}|{render_settings}|{slide_size}|"
+                f"{get_font_index().fingerprint()}"
+            )
+
+            keys = []
+            for slide_idx, slide_part in enumerate(slide_parts):
+                digest = hashlib.blake2b(prefix.encode(), digest_size=16)
+                for part_name in rendered_parts(slide_part):
+                    digest.update(part_name.encode())
+                    digest.update(part_hash(part_name))
+                if SLIDE_NUMBER_FIELD in zf.read(slide_part):
+                    digest.update(f"|{slide_idx}".encode())
+                keys.append(digest.hexdigest())
+
+        return keys
+
+    def get(self, key: str) -> Optional[Path]:
+        """Return the cached image of a slide key, or None on a miss."""
+        path = self.cache_dir / f"{key}{self.suffix}"
+        try:
+            # Mark as recently used for eviction
+            os.utime(path)
+        except OSError:
+            return None
+        return path
+
+    def put(self, key: str, image_path: Path) -> None:
+        """Store a copy of a rendered slide image."""
+        try:
+            self.cache_dir.mkdir(parents=True, exist_ok=True)
+            fd, tmp_path = tempfile.mkstemp(dir=self.cache_dir, suffix=".tmp")
+            with open(fd, "wb") as dst, open(image_path, "rb") as src:
+                shutil.copyfileobj(src, dst)
+            os.replace(tmp_path, self.cache_dir / f"{key}{self.suffix}")
+        except OSError:
+            # An unwritable cache only costs rendering again next time
+            pass
+
+    def evict(self) -> None:
+        """Remove least recently used entries until the cache fits max_bytes."""
+        try:
+            entries = [
+                (entry.stat().st_mtime_ns, entry.stat().st_size, entry.path)
+                for entry in os.scandir(self.cache_dir)
+                if entry.name.endswith(self.suffix)
+            ]
+        except OSError:
+            return
+
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            try:
+                os.remove(path)
+            except OSError:
+                continue
+            total -= size
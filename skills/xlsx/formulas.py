@@ -0,0 +1,1955 @@
+#!/usr/bin/env python3
+"""
+Native Formula Evaluation
+Evaluates workbook formulas in Python and recomputes only what changed
+
+Formulas are parsed into a dependency graph of cells and ranges. After an
+edit, only the edited cells and the formulas that (transitively) depend on
+them are evaluated again, in dependency order. Between runs, the cell
+contents and computed values of each workbook are kept in a small state file
+under the user cache directory; files saved by openpyxl carry no cached
+values, so the state is what lets a run after a one-cell edit recompute one
+cell's dependents instead of the whole workbook.
+
+Workbooks that use anything outside the supported function set (or array
+formulas, circular references, external links...) are handed to LibreOffice
+through recalc.py instead. Either way the output has the recalc() schema,
+plus an 'engine' field saying which one ran.
+
+Usage:
+    python formulas.py <excel_file> [timeout_seconds] [--no-state]
+"""
+
+import argparse
+import bisect
+import functools
+import hashlib
+import json
+import math
+import os
+import re
+import tempfile
+import zipfile
+from decimal import ROUND_DOWN, ROUND_HALF_UP, ROUND_UP, Decimal
+from pathlib import Path
+from xml.etree import ElementTree
+from xml.sax.saxutils import escape
+
+from recalc import (
+    EXCEL_ERRORS,
+    MAX_LOCATIONS,
+    RANGE_BUCKET_COLUMNS,
+    RANGE_EXPAND_LIMIT,
+    build_summary,
+    column_letter,
+    column_number,
+    error_in_text,
+    error_root_causes,
+    iter_cells,
+    recalc,
+    workbook_parts,
+)
+
+MAX_ROW = 1048576
+MAX_COL = 16384
+
+
+STATE_VERSION = 1
+STATE_MAX_BYTES = 128 * 1024 * 1024
+
+
+class ExcelError(Exception):
+    """An Excel error value such as #DIV/0!, usable both as a value and raised"""
+    
+    def __init__(self, code):
+        super().__init__(code)
+        self.code = code
+    
+    def __eq__(self, other):
+        return isinstance(other, ExcelError) and other.code == self.code
+    
+    def __hash__(self):
+        return hash(self.code)
+    
+    def __repr__(self):
+        return f'ExcelError({self.code!r})'
+
+
+class UnsupportedFormula(Exception):
+    """A formula uses syntax or a function the engine does not evaluate"""
+
+
+class _Missing:
+    """An empty function argument, as in IF(A1,,1)"""
+    
+    def __repr__(self):
+        return 'MISSING'
+
+
+MISSING = _Missing()
+
+
+# --- Tokenizer and parser ---
+
+_SHEET = r"(?:'(?:[^']|'')+'|[\w.]+)!"
+_CELL = r"\$?[A-Za-z]{1,3}\$?[0-9]+"
+_COLUMNS = r"\$?[A-Za-z]{1,3}:\$?[A-Za-z]{1,3}"
+_ROWS = r"\$?[0-9]+:\$?[0-9]+"
+
+TOKEN_RE = re.compile(
+    r'(?P<space>\s+)'
+    r'|(?P<string>"(?:[^"]|"")*")'
+    rf'|(?P<error>(?:{_SHEET})?#(?:NULL!|DIV/0!|VALUE!|REF!|NAME\?|NUM!|N/A|GETTING_DATA|SPILL!|CALC!))'
+    r'|(?P<func>[A-Za-z_][\w.]*)\('
+    rf'|(?P<ref>(?P<sheet>{_SHEET})?(?P<area>{_CELL}(?::{_CELL})?|{_COLUMNS}|{_ROWS}))(?![\w(!.])'
+    r'|(?P<bool>(?i:TRUE|FALSE))(?![\w(!.])'
+    r'|(?P<number>(?:[0-9]+\.?[0-9]*|\.[0-9]+)(?:[eE][+-]?[0-9]+)?)'
+    rf'|(?P<name>(?:{_SHEET})?[A-Za-z_\\][\w.]*)'
+    r'|(?P<op><>|<=|>=|[-+*/^&=<>%(),{};:])'
+)
+AREA_PART_RE = re.compile(r'(\$?)([A-Za-z]{1,3})|(\$?)([0-9]+)')
+CELL_PART_RE = re.compile(r'\$?([A-Za-z]*)\$?([0-9]*)')
+COMPARISONS = ('=', '<>', '<', '>', '<=', '>=')
+FUNCTION_PREFIXES = ('_XLFN.', '_XLWS.')
+
+
+def _tokenize(text):
+    """Yield the regex match of every non-space token in a formula"""
+    pos = 0
+    while pos < len(text):
+        m = TOKEN_RE.match(text, pos)
+        if not m:
+            raise UnsupportedFormula(f"unsupported syntax near '{text[pos:pos + 12]}'")
+        pos = m.end()
+        if m.lastgroup != 'space':
+            yield m
+
+
+def _unquote_sheet(prefix):
+    """Turn a "'My Sheet'!" or "Sheet1!" prefix into the sheet name"""
+    name = prefix[:-1]
+    if name.startswith("'"):
+        name = name[1:-1].replace("''", "'")
+    return name
+
+
+def translate_formula(text, drow, dcol):
+    """
+    Shift the relative references of a formula, as Excel does for shared formulas
+    
+    Returns:
+        The formula text as written in a cell drow rows and dcol columns away
+    """
+    def shift(m):
+        if m.group(2):
+            col = column_number(m.group(2).upper())
+            if not m.group(1):
+                col += dcol
+            if not 1 <= col <= MAX_COL:
+                raise ValueError
+            return m.group(1) + column_letter(col)
+        row = int(m.group(4))
+        if not m.group(3):
+            row += drow
+        if not 1 <= row <= MAX_ROW:
+            raise ValueError
+        return m.group(3) + str(row)
+    
+    pieces = []
+    for m in _tokenize(text):
+        pieces.append(text[len(''.join(pieces)):m.start()])
+        if m.lastgroup == 'ref':
+            try:
+                area = AREA_PART_RE.sub(shift, m.group('area'))
+            except ValueError:
+                pieces.append('#REF!')
+                continue
+            pieces.append((m.group('sheet') or '') + area)
+        else:
+            pieces.append(m.group())
+    pieces.append(text[len(''.join(pieces)):])
+    return ''.join(pieces)
+
+
+@functools.lru_cache(maxsize=None)
+def _column(letters):
+    return column_number(letters.upper())
+
+
+def _parse_area(area):
+    """Parse 'A1', 'A1:B2', 'A:B' or '1:2' into (r1, c1, r2, c2), 1-based and inclusive"""
+    corners = []
+    for part in area.split(':'):
+        m = CELL_PART_RE.fullmatch(part)
+        corners.append((int(m.group(2)) if m.group(2) else None, _column(m.group(1)) if m.group(1) else None))
+    
+    (r1, c1), (r2, c2) = corners[0], corners[-1]
+    if r1 is None:
+        r1, r2 = 1, MAX_ROW
+    if c1 is None:
+        c1, c2 = 1, MAX_COL
+    return min(r1, r2), min(c1, c2), max(r1, r2), max(c1, c2)
+
+
+class _Parser:
+    """
+    Recursive descent parser producing a tuple AST
+    
+    Nodes: ('n', number), ('s', text), ('b', bool), ('e', code),
+    ('r', sheet, r1, c1, r2, c2), ('op', operator, left, right), ('neg', x),
+    ('pct', x), ('f', NAME, args) and ('missing',). Defined names are
+    replaced by the AST of what they refer to.
+    """
+    
+    def __init__(self, engine, sheet, text, depth=0):
+        self.engine = engine
+        self.sheet = sheet
+        self.tokens = list(_tokenize(text))
+        self.pos = 0
+        self.refs = []
+        self.depth = depth
+    
+    def parse(self):
+        node = self.comparison()
+        if self.pos != len(self.tokens):
+            raise UnsupportedFormula(f"unexpected '{self.tokens[self.pos].group()}'")
+        return node
+    
+    def peek_op(self, *ops):
+        if self.pos < len(self.tokens):
+            token = self.tokens[self.pos]
+            if token.lastgroup == 'op' and token.group() in ops:
+                self.pos += 1
+                return token.group()
+        return None
+    
+    def binary(self, operand, ops):
+        left = operand()
+        while True:
+            op = self.peek_op(*ops)
+            if op is None:
+                return left
+            left = ('op', op, left, operand())
+    
+    def comparison(self):
+        return self.binary(self.concat, COMPARISONS)
+    
+    def concat(self):
+        return self.binary(self.additive, ('&',))
+    
+    def additive(self):
+        return self.binary(self.multiplicative, ('+', '-'))
+    
+    def multiplicative(self):
+        return self.binary(self.power, ('*', '/'))
+    
+    def power(self):
+        # Negation binds tighter than ^ in Excel: -2^2 is 4
+        return self.binary(self.unary, ('^',))
+    
+    def unary(self):
+        op = self.peek_op('-', '+')
+        if op == '-':
+            return ('neg', self.unary())
+        if op == '+':
+            return self.unary()
+        node = self.primary()
+        while self.peek_op('%'):
+            node = ('pct', node)
+        return node
+    
+    def primary(self):
+        if self.pos >= len(self.tokens):
+            raise UnsupportedFormula('incomplete formula')
+        token = self.tokens[self.pos]
+        self.pos += 1
+        kind = token.lastgroup
+        
+        if kind == 'number':
+            return ('n', float(token.group()))
+        if kind == 'string':
+            return ('s', token.group()[1:-1].replace('""', '"'))
+        if kind == 'bool':
+            return ('b', token.group().upper() == 'TRUE')
+        if kind == 'error':
+            return ('e', token.group()[token.group().index('#'):])
+        if kind == 'ref':
+            return self.reference(token)
+        if kind == 'func':
+            return self.call(token.group()[:-1].upper())
+        if kind == 'name':
+            return self.defined_name(token.group())
+        if kind == 'op' and token.group() == '(':
+            node = self.comparison()
+            if not self.peek_op(')'):
+                raise UnsupportedFormula('unbalanced parentheses')
+            return node
+        if kind == 'op' and token.group() == '{':
+            raise UnsupportedFormula('array constants')
+        raise UnsupportedFormula(f"unexpected '{token.group()}'")
+    
+    def reference(self, token):
+        sheet = self.sheet
+        if token.group('sheet'):
+            sheet = self.engine.sheet_index(_unquote_sheet(token.group('sheet')))
+            if sheet is None:
+                return ('e', '#REF!')
+        node = ('r', sheet) + _parse_area(token.group('area'))
+        self.refs.append(node[1:])
+        return node
+    
+    def call(self, name):
+        for prefix in FUNCTION_PREFIXES:
+            if name.startswith(prefix):
+                name = name[len(prefix):]
+        if name not in FUNCTIONS and name not in REFERENCE_FUNCTIONS:
+            raise UnsupportedFormula(f'function {name}')
+        
+        args = []
+        if not self.peek_op(')'):
+            while True:
+                if self.pos < len(self.tokens) and self.tokens[self.pos].group() in (',', ')'):
+                    args.append(('missing',))
+                else:
+                    args.append(self.comparison())
+                if self.peek_op(')'):
+                    break
+                if not self.peek_op(','):
+                    raise UnsupportedFormula(f'malformed arguments to {name}')
+        
+        if name in REFERENCE_FUNCTIONS and any(arg[0] not in ('r', 'missing') for arg in args):
+            raise UnsupportedFormula(f'{name} of a computed reference')
+        return ('f', name, tuple(args))
+    
+    def defined_name(self, text):
+        sheet = self.sheet
+        if '!' in text:
+            prefix, _, text = text.rpartition('!')
+            sheet = self.engine.sheet_index(_unquote_sheet(prefix + '!'))
+        definition = self.engine.defined_name(text, sheet)
+        if definition is None:
+            raise UnsupportedFormula(f'name {text}')
+        if self.depth > 20:
+            raise UnsupportedFormula(f'name {text} refers to itself')
+        
+        parser = _Parser(self.engine, sheet, definition, self.depth + 1)
+        node = parser.parse()
+        self.refs.extend(parser.refs)
+        return node
+
+
+# --- Values and coercion ---
+
+class Range:
+    """
+    A rectangular block of cells passed to a function
+    
+    Iteration is limited to the used area of the sheet, so whole-column
+    references cost as much as the filled rows.
+    """
+    
+    __slots__ = ('cells', 'sheet', 'r1', 'c1', 'rows', 'cols', 'used_rows', 'used_cols')
+    
+    def __init__(self, cells, sheet, r1, c1, r2, c2, bounds):
+        self.cells = cells
+        self.sheet = sheet
+        self.r1, self.c1 = r1, c1
+        self.rows, self.cols = r2 - r1 + 1, c2 - c1 + 1
+        max_row, max_col = bounds
+        self.used_rows = max(0, min(r2, max_row) - r1 + 1)
+        self.used_cols = max(0, min(c2, max_col) - c1 + 1)
+    
+    def get(self, i, j):
+        return self.cells.get((self.sheet, self.r1 + i, self.c1 + j))
+    
+    def __iter__(self):
+        for i in range(self.used_rows):
+            for j in range(self.used_cols):
+                yield self.get(i, j)
+    
+    def vector(self):
+        """Return the values of a single row or column"""
+        if self.rows == 1:
+            return [self.get(0, j) for j in range(self.used_cols)]
+        if self.cols == 1:
+            return [self.get(i, 0) for i in range(self.used_rows)]
+        raise ExcelError('#N/A')
+
+
+def _scalar(value):
+    """Reduce a function argument to a single value"""
+    if isinstance(value, Range):
+        if value.rows == 1 and value.cols == 1:
+            return value.get(0, 0)
+        raise UnsupportedFormula('range used as a single value')
+    return value
+
+
+def _num(value):
+    """Coerce a value to a number, raising ExcelError"""
+    value = _scalar(value)
+    if isinstance(value, bool):
+        return int(value)
+    if isinstance(value, (int, float)):
+        return value
+    if value is None or value is MISSING:
+        return 0
+    if isinstance(value, ExcelError):
+        raise ExcelError(value.code)
+    try:
+        return float(value.strip())
+    except ValueError:
+        raise ExcelError('#VALUE!') from None
+
+
+def _int(value):
+    """Coerce a value to an integer, truncating like Excel index arguments"""
+    return int(_num(value))
+
+
+def _number_text(x):
+    """Format a number the way Excel converts it to text"""
+    if isinstance(x, float) and x.is_integer() and abs(x) < 1e15:
+        return str(int(x))
+    if isinstance(x, int):
+        return str(x)
+    return '%.15G' % x
+
+
+def _text(value):
+    """Coerce a value to text, raising ExcelError"""
+    value = _scalar(value)
+    if value is None or value is MISSING:
+        return ''
+    if isinstance(value, bool):
+        return 'TRUE' if value else 'FALSE'
+    if isinstance(value, (int, float)):
+        return _number_text(value)
+    if isinstance(value, ExcelError):
+        raise ExcelError(value.code)
+    return value
+
+
+def _truth(value):
+    """Coerce a value to a boolean condition, raising ExcelError"""
+    value = _scalar(value)
+    if isinstance(value, ExcelError):
+        raise ExcelError(value.code)
+    if isinstance(value, str):
+        if value.upper() in ('TRUE', 'FALSE'):
+            return value.upper() == 'TRUE'
+        raise ExcelError('#VALUE!')
+    if value is None or value is MISSING:
+        return False
+    return bool(value)
+
+
+def _type_rank(value):
+    # Excel orders numbers before text before booleans
+    if isinstance(value, bool):
+        return 2
+    if isinstance(value, str):
+        return 1
+    return 0
+
+
+def _compare(a, b):
+    """Compare two scalars like Excel's comparison operators; returns -1, 0 or 1"""
+    if a is None or a is MISSING:
+        a = '' if isinstance(b, str) else (False if isinstance(b, bool) else 0)
+    if b is None or b is MISSING:
+        b = '' if isinstance(a, str) else (False if isinstance(a, bool) else 0)
+    rank_a, rank_b = _type_rank(a), _type_rank(b)
+    if rank_a != rank_b:
+        return -1 if rank_a < rank_b else 1
+    if rank_a == 1:
+        a, b = a.casefold(), b.casefold()
+    return (a > b) - (a < b)
+
+
+def _finite(x):
+    if isinstance(x, float) and not math.isfinite(x):
+        raise ExcelError('#NUM!')
+    return x
+
+
+def _power(x, y):
+    if x == 0 and y < 0:
+        raise ExcelError('#DIV/0!')
+    try:
+        result = x ** y
+    except OverflowError:
+        raise ExcelError('#NUM!') from None
+    if isinstance(result, complex):
+        raise ExcelError('#NUM!')
+    return _finite(result)
+
+
+def _binary(op, a, b):
+    a, b = _scalar(a), _scalar(b)
+    if isinstance(a, ExcelError):
+        return a
+    if isinstance(b, ExcelError):
+        return b
+    if op in COMPARISONS:
+        c = _compare(a, b)
+        return {'=': c == 0, '<>': c != 0, '<': c < 0, '>': c > 0, '<=': c <= 0, '>=': c >= 0}[op]
+    if op == '&':
+        return _text(a) + _text(b)
+    
+    x, y = _num(a), _num(b)
+    if op == '+':
+        return _finite(x + y)
+    if op == '-':
+        return _finite(x - y)
+    if op == '*':
+        return _finite(x * y)
+    if op == '/':
+        if y == 0:
+            raise ExcelError('#DIV/0!')
+        return _finite(x / y)
+    return _power(x, y)
+
+
+def _wildcard_re(pattern):
+    """Compile an Excel wildcard pattern (* ? and ~ escapes), case-insensitive"""
+    parts = []
+    i = 0
+    while i < len(pattern):
+        ch = pattern[i]
+        if ch == '~' and i + 1 < len(pattern):
+            parts.append(re.escape(pattern[i + 1]))
+            i += 2
+            continue
+        parts.append('.*' if ch == '*' else '.' if ch == '?' else re.escape(ch))
+        i += 1
+    return re.compile(''.join(parts), re.IGNORECASE | re.DOTALL)
+
+
+def _lookup_equal(value, target, wildcards):
+    """Check an exact lookup match, with wildcards when target is text"""
+    if isinstance(target, str) and wildcards and any(ch in target for ch in '*?~'):
+        return isinstance(value, str) and _wildcard_re(target).fullmatch(value) is not None
+    if value is None or _type_rank(value) != _type_rank(target):
+        return False
+    return _compare(value, target) == 0
+
+
+def _criteria(criterion):
+    """Build the predicate of a COUNTIF/SUMIF style criterion"""
+    criterion = _scalar(criterion)
+    if isinstance(criterion, ExcelError):
+        raise ExcelError(criterion.code)
+    if not isinstance(criterion, str):
+        if criterion is None or criterion is MISSING:
+            criterion = 0
+        return lambda v: v is not None and not isinstance(v, ExcelError) and _type_rank(v) == _type_rank(criterion) and _compare(v, criterion) == 0
+    
+    op = '='
+    for candidate in ('<=', '>=', '<>', '<', '>', '='):
+        if criterion.startswith(candidate):
+            op, criterion = candidate, criterion[len(candidate):]
+            break
+    
+    try:
+        number = float(criterion)
+    except ValueError:
+        number = None
+    
+    if number is not None:
+        def matches_number(v):
+            if isinstance(v, str):
+                try:
+                    v = float(v)
+                except ValueError:
+                    return op == '<>'
+            if v is None or isinstance(v, (bool, ExcelError)):
+                return op == '<>'
+            c = (v > number) - (v < number)
+            return {'=': c == 0, '<>': c != 0, '<': c < 0, '>': c > 0, '<=': c <= 0, '>=': c >= 0}[op]
+        return matches_number
+    
+    if op in ('=', '<>'):
+        if criterion == '':
+            # "" and "=" match empty cells, "<>" matches non-empty ones
+            blank = lambda v: v is None or v == ''  # noqa: E731
+            return blank if op == '=' else (lambda v: not blank(v))
+        pattern = _wildcard_re(criterion)
+        
+        def matches_text(v):
+            hit = isinstance(v, str) and pattern.fullmatch(v) is not None
+            return hit if op == '=' else not hit
+        return matches_text
+    
+    def compares_text(v):
+        if not isinstance(v, str):
+            return False
+        c = _compare(v, criterion)
+        return {'<': c < 0, '>': c > 0, '<=': c <= 0, '>=': c >= 0}[op]
+    return compares_text
+
+
+# --- Functions ---
+
+def _iter_args(args):
+    """Yield (value, from_range) for every value of every argument"""
+    for arg in args:
+        if isinstance(arg, Range):
+            for value in arg:
+                yield value, True
+        else:
+            yield arg, False
+
+
+def _numbers(args):
+    """Collect the numbers SUM-like functions use, raising the first error"""
+    numbers = []
+    for value, from_range in _iter_args(args):
+        if isinstance(value, ExcelError):
+            raise ExcelError(value.code)
+        if from_range:
+            if isinstance(value, (int, float)) and not isinstance(value, bool):
+                numbers.append(value)
+        elif value is not MISSING:
+            numbers.append(_num(value))
+    return numbers
+
+
+def fn_sum(*args):
+    return _finite(math.fsum(_numbers(args))) if args else 0
+
+
+def fn_product(*args):
+    numbers = _numbers(args)
+    return _finite(math.prod(numbers)) if numbers else 0
+
+
+def fn_average(*args):
+    numbers = _numbers(args)
+    if not numbers:
+        raise ExcelError('#DIV/0!')
+    return math.fsum(numbers) / len(numbers)
+
+
+def fn_min(*args):
+    numbers = _numbers(args)
+    return min(numbers) if numbers else 0
+
+
+def fn_max(*args):
+    numbers = _numbers(args)
+    return max(numbers) if numbers else 0
+
+
+def fn_count(*args):
+    count = 0
+    for value, from_range in _iter_args(args):
+        if isinstance(value, (int, float)) and not (from_range and isinstance(value, bool)):
+            count += 1
+        elif not from_range and isinstance(value, str):
+            try:
+                float(value)
+                count += 1
+            except ValueError:
+                pass
+    return count
+
+
+def fn_counta(*args):
+    return sum(1 for value, _ in _iter_args(args) if value is not None and value is not MISSING)
+
+
+def fn_countblank(rng):
+    if not isinstance(rng, Range):
+        return int(rng is None or rng == '')
+    filled = sum(1 for value in rng if value is not None and value != '')
+    return rng.rows * rng.cols - filled
+
+
+def _round(number, digits, rounding):
+    # Decimal from the shortest repr avoids binary artifacts like ROUND(2.675, 2) = 2.67
+    number, digits = Decimal(repr(float(_num(number)))), _int(digits)
+    return float(number.scaleb(digits).quantize(Decimal(1), rounding=rounding).scaleb(-digits))
+
+
+def fn_round(number, digits=0):
+    return _round(number, digits, ROUND_HALF_UP)
+
+
+def fn_roundup(number, digits=0):
+    return _round(number, digits, ROUND_UP)
+
+
+def fn_rounddown(number, digits=0):
+    return _round(number, digits, ROUND_DOWN)
+
+
+def fn_int(number):
+    return float(math.floor(_num(number)))
+
+
+def fn_mod(number, divisor):
+    x, y = _num(number), _num(divisor)
+    if y == 0:
+        raise ExcelError('#DIV/0!')
+    return x - y * math.floor(x / y)
+
+
+def fn_power(number, power):
+    return _power(_num(number), _num(power))
+
+
+def fn_sqrt(number):
+    x = _num(number)
+    if x < 0:
+        raise ExcelError('#NUM!')
+    return math.sqrt(x)
+
+
+def fn_abs(number):
+    return abs(_num(number))
+
+
+def fn_sign(number):
+    x = _num(number)
+    return (x > 0) - (x < 0)
+
+
+def fn_sumproduct(*arrays):
+    shapes = set()
+    grids = []
+    for array in arrays:
+        if isinstance(array, Range):
+            shapes.add((array.rows, array.cols))
+            grids.append(array)
+        else:
+            shapes.add((1, 1))
+            grids.append(_scalar(array))
+    if len(shapes) != 1:
+        raise ExcelError('#VALUE!')
+    
+    rows, cols = shapes.pop()
+    used_rows = min([g.used_rows for g in grids if isinstance(g, Range)] or [rows])
+    used_cols = min([g.used_cols for g in grids if isinstance(g, Range)] or [cols])
+    total = []
+    for i in range(used_rows):
+        for j in range(used_cols):
+            product = 1
+            for grid in grids:
+                value = grid.get(i, j) if isinstance(grid, Range) else grid
+                if isinstance(value, ExcelError):
+                    raise ExcelError(value.code)
+                product *= value if isinstance(value, (int, float)) and not isinstance(value, bool) else 0
+            total.append(product)
+    return _finite(math.fsum(total))
+
+
+def _matching_cells(criteria_pairs):
+    """
+    Yield (i, j) of cells meeting every (range, criterion) pair
+    
+    Blank cells outside the used area are not visited; callers that count
+    blanks add them separately.
+    """
+    ranges = [rng if isinstance(rng, Range) else None for rng, _ in criteria_pairs]
+    if any(rng is None for rng in ranges):
+        raise UnsupportedFormula('criteria on a value instead of a range')
+    if len({(rng.rows, rng.cols) for rng in ranges}) != 1:
+        raise ExcelError('#VALUE!')
+    predicates = [_criteria(criterion) for _, criterion in criteria_pairs]
+    
+    used_rows = max(rng.used_rows for rng in ranges)
+    used_cols = max(rng.used_cols for rng in ranges)
+    for i in range(min(used_rows, ranges[0].rows)):
+        for j in range(min(used_cols, ranges[0].cols)):
+            if all(pred(rng.get(i, j)) for rng, pred in zip(ranges, predicates)):
+                yield i, j
+
+
+def _count_matching(criteria_pairs):
+    cells = list(_matching_cells(criteria_pairs))
+    ranges = [rng for rng, _ in criteria_pairs]
+    visited = min(max(rng.used_rows for rng in ranges), ranges[0].rows) * min(
+        max(rng.used_cols for rng in ranges), ranges[0].cols
+    )
+    unvisited = ranges[0].rows * ranges[0].cols - visited
+    if unvisited and all(_criteria(criterion)(None) for _, criterion in criteria_pairs):
+        return len(cells) + unvisited
+    return len(cells)
+
+
+def _values_at(rng, cells):
+    """Yield the numbers of a (sum or average) range at the given offsets"""
+    for i, j in cells:
+        value = rng.get(i, j)
+        if isinstance(value, ExcelError):
+            raise ExcelError(value.code)
+        if isinstance(value, (int, float)) and not isinstance(value, bool):
+            yield value
+
+
+def _if_ranges(rng, criterion, target):
+    if target is MISSING:
+        target = rng
+    if not isinstance(target, Range):
+        raise UnsupportedFormula('criteria on a value instead of a range')
+    return list(_values_at(target, _matching_cells([(rng, criterion)])))
+
+
+def fn_sumif(rng, criterion, sum_range=MISSING):
+    return math.fsum(_if_ranges(rng, criterion, sum_range))
+
+
+def fn_averageif(rng, criterion, average_range=MISSING):
+    values = _if_ranges(rng, criterion, average_range)
+    if not values:
+        raise ExcelError('#DIV/0!')
+    return math.fsum(values) / len(values)
+
+
+def fn_countif(rng, criterion):
+    return _count_matching([(rng, criterion)])
+
+
+def _pairs(args):
+    if len(args) % 2:
+        raise ExcelError('#VALUE!')
+    return list(zip(args[::2], args[1::2]))
+
+
+def _ifs_values(target, args):
+    if not isinstance(target, Range):
+        raise UnsupportedFormula('criteria on a value instead of a range')
+    pairs = _pairs(args)
+    if any(isinstance(rng, Range) and (rng.rows, rng.cols) != (target.rows, target.cols) for rng, _ in pairs):
+        raise ExcelError('#VALUE!')
+    return list(_values_at(target, _matching_cells(pairs)))
+
+
+def fn_sumifs(sum_range, *args):
+    return math.fsum(_ifs_values(sum_range, args))
+
+
+def fn_averageifs(average_range, *args):
+    values = _ifs_values(average_range, args)
+    if not values:
+        raise ExcelError('#DIV/0!')
+    return math.fsum(values) / len(values)
+
+
+def fn_maxifs(max_range, *args):
+    values = _ifs_values(max_range, args)
+    return max(values) if values else 0
+
+
+def fn_minifs(min_range, *args):
+    values = _ifs_values(min_range, args)
+    return min(values) if values else 0
+
+
+def fn_countifs(*args):
+    return _count_matching(_pairs(args))
+
+
+def fn_if(condition, if_true, if_false=False):
+    result = if_true if _truth(condition) else if_false
+    return 0 if result is MISSING else result
+
+
+def fn_ifs(*args):
+    for condition, value in _pairs(args):
+        if _truth(condition):
+            return value
+    raise ExcelError('#N/A')
+
+
+def fn_iferror(value, value_if_error):
+    value = _scalar(value)
+    return value_if_error if isinstance(value, ExcelError) else value
+
+
+def fn_ifna(value, value_if_na):
+    value = _scalar(value)
+    return value_if_na if value == ExcelError('#N/A') else value
+
+
+def _booleans(args):
+    result = []
+    for value, from_range in _iter_args(args):
+        if isinstance(value, ExcelError):
+            raise ExcelError(value.code)
+        if isinstance(value, (bool, int, float)):
+            result.append(bool(value))
+        elif not from_range and value is not None and value is not MISSING:
+            result.append(_truth(value))
+    if not result:
+        raise ExcelError('#VALUE!')
+    return result
+
+
+def fn_and(*args):
+    return all(_booleans(args))
+
+
+def fn_or(*args):
+    return any(_booleans(args))
+
+
+def fn_xor(*args):
+    return sum(_booleans(args)) % 2 == 1
+
+
+def fn_not(value):
+    return not _truth(value)
+
+
+def fn_true():
+    return True
+
+
+def fn_false():
+    return False
+
+
+def fn_choose(index, *values):
+    i = _int(index)
+    if not 1 <= i <= len(values):
+        raise ExcelError('#VALUE!')
+    return values[i - 1]
+
+
+def fn_iserror(value):
+    return isinstance(_scalar(value), ExcelError)
+
+
+def fn_iserr(value):
+    value = _scalar(value)
+    return isinstance(value, ExcelError) and value.code != '#N/A'
+
+
+def fn_isna(value):
+    return _scalar(value) == ExcelError('#N/A')
+
+
+def fn_isnumber(value):
+    value = _scalar(value)
+    return isinstance(value, (int, float)) and not isinstance(value, bool)
+
+
+def fn_istext(value):
+    return isinstance(_scalar(value), str)
+
+
+def fn_islogical(value):
+    return isinstance(_scalar(value), bool)
+
+
+def fn_isblank(value):
+    return _scalar(value) is None
+
+
+def fn_na():
+    raise ExcelError('#N/A')
+
+
+def _lookup_vector(value):
+    if isinstance(value, Range):
+        return value.vector()
+    return [_scalar(value)]
+
+
+def _approximate_match(values, target, descending=False):
+    """Position of the last value <= target (or >= target when descending)"""
+    best = None
+    for i, value in enumerate(values):
+        if value is None or _type_rank(value) != _type_rank(target):
+            continue
+        c = _compare(value, target)
+        if (c >= 0) if descending else (c <= 0):
+            best = i
+    return best
+
+
+def fn_match(lookup_value, lookup_array, match_type=1):
+    target = _scalar(lookup_value)
+    if isinstance(target, ExcelError):
+        return target
+    values = _lookup_vector(lookup_array)
+    kind = _int(match_type)
+    if kind == 0:
+        position = next((i for i, v in enumerate(values) if _lookup_equal(v, target, True)), None)
+    else:
+        position = _approximate_match(values, target, descending=kind < 0)
+    if position is None:
+        raise ExcelError('#N/A')
+    return position + 1
+
+
+def _table_lookup(lookup_value, table, index, approximate, by_row):
+    target = _scalar(lookup_value)
+    if isinstance(target, ExcelError):
+        return target
+    if not isinstance(table, Range):
+        raise UnsupportedFormula('lookup in a value instead of a range')
+    index = _int(index)
+    if index < 1:
+        raise ExcelError('#VALUE!')
+    if index > (table.rows if by_row else table.cols):
+        raise ExcelError('#REF!')
+    
+    if by_row:
+        keys = [table.get(0, j) for j in range(table.used_cols)]
+    else:
+        keys = [table.get(i, 0) for i in range(table.used_rows)]
+    if approximate is MISSING or _truth(approximate):
+        position = _approximate_match(keys, target)
+    else:
+        position = next((i for i, v in enumerate(keys) if _lookup_equal(v, target, True)), None)
+    if position is None:
+        raise ExcelError('#N/A')
+    return table.get(index - 1, position) if by_row else table.get(position, index - 1)
+
+
+def fn_vlookup(lookup_value, table, col_index, range_lookup=True):
+    return _table_lookup(lookup_value, table, col_index, range_lookup, by_row=False)
+
+
+def fn_hlookup(lookup_value, table, row_index, range_lookup=True):
+    return _table_lookup(lookup_value, table, row_index, range_lookup, by_row=True)
+
+
+def fn_xlookup(lookup_value, lookup_array, return_array, if_not_found=MISSING, match_mode=0, search_mode=1):
+    target = _scalar(lookup_value)
+    if isinstance(target, ExcelError):
+        return target
+    keys = _lookup_vector(lookup_array)
+    if not isinstance(return_array, Range):
+        return_values = [_scalar(return_array)]
+    elif (return_array.rows, return_array.cols) in ((1, 1),) or 1 in (return_array.rows, return_array.cols):
+        return_values = return_array.vector()
+    else:
+        raise UnsupportedFormula('XLOOKUP returning a row or column')
+    
+    mode = _int(match_mode) if match_mode is not MISSING else 0
+    order = range(len(keys)) if _int(search_mode if search_mode is not MISSING else 1) > 0 else range(len(keys) - 1, -1, -1)
+    position = next((i for i in order if _lookup_equal(keys[i], target, mode == 2)), None)
+    if position is None and mode in (-1, 1):
+        candidates = [
+            i for i in order
+            if keys[i] is not None and _type_rank(keys[i]) == _type_rank(target)
+            and _compare(keys[i], target) == (-1 if mode == -1 else 1)
+        ]
+        if candidates:
+            pick = max if mode == -1 else min
+            best = pick(keys[i] for i in candidates) if _type_rank(target) == 0 else None
+            position = next(i for i in candidates if best is None or keys[i] == best)
+    
+    if position is None:
+        if if_not_found is MISSING:
+            raise ExcelError('#N/A')
+        return if_not_found
+    if position >= len(return_values):
+        # Beyond the used area of the return range
+        return None
+    return return_values[position]
+
+
+def fn_index(array, row_num=MISSING, col_num=MISSING):
+    if not isinstance(array, Range):
+        if _int(row_num if row_num is not MISSING else 1) > 1 or _int(col_num if col_num is not MISSING else 1) > 1:
+            raise ExcelError('#REF!')
+        return array
+    row = _int(row_num) if row_num is not MISSING else 0
+    col = _int(col_num) if col_num is not MISSING else 0
+    if array.rows == 1 and col_num is MISSING:
+        row, col = 1, row
+    elif array.cols == 1 and col == 0:
+        col = 1
+    if row == 0 or col == 0:
+        raise UnsupportedFormula('INDEX returning a row or column')
+    if not (1 <= row <= array.rows and 1 <= col <= array.cols):
+        raise ExcelError('#REF!')
+    return array.get(row - 1, col - 1)
+
+
+def fn_concatenate(*args):
+    return ''.join(_text(arg) for arg in args)
+
+
+def fn_concat(*args):
+    return ''.join(_text(value) for value, _ in _iter_args(args))
+
+
+def fn_textjoin(delimiter, ignore_empty, *args):
+    texts = [_text(value) for value, _ in _iter_args(args)]
+    if _truth(ignore_empty):
+        texts = [text for text in texts if text]
+    return _text(delimiter).join(texts)
+
+
+def fn_len(text):
+    return len(_text(text))
+
+
+def fn_left(text, num_chars=1):
+    n = _int(num_chars)
+    if n < 0:
+        raise ExcelError('#VALUE!')
+    return _text(text)[:n]
+
+
+def fn_right(text, num_chars=1):
+    n = _int(num_chars)
+    if n < 0:
+        raise ExcelError('#VALUE!')
+    return _text(text)[-n:] if n else ''
+
+
+def fn_mid(text, start_num, num_chars):
+    start, n = _int(start_num), _int(num_chars)
+    if start < 1 or n < 0:
+        raise ExcelError('#VALUE!')
+    return _text(text)[start - 1:start - 1 + n]
+
+
+def fn_upper(text):
+    return _text(text).upper()
+
+
+def fn_lower(text):
+    return _text(text).lower()
+
+
+def fn_trim(text):
+    return re.sub(' +', ' ', _text(text).strip(' '))
+
+
+def fn_value(text):
+    value = _scalar(text)
+    if isinstance(value, str):
+        try:
+            return float(value.strip().replace(',', ''))
+        except ValueError:
+            raise ExcelError('#VALUE!') from None
+    return _num(value)
+
+
+def fn_exact(text1, text2):
+    return _text(text1) == _text(text2)
+
+
+def fn_substitute(text, old_text, new_text, instance_num=MISSING):
+    text, old, new = _text(text), _text(old_text), _text(new_text)
+    if not old:
+        return text
+    if instance_num is MISSING:
+        return text.replace(old, new)
+    n = _int(instance_num)
+    if n < 1:
+        raise ExcelError('#VALUE!')
+    start = -1
+    for _ in range(n):
+        start = text.find(old, start + 1)
+        if start < 0:
+            return text
+    return text[:start] + new + text[start + len(old):]
+
+
+def fn_rept(text, number_times):
+    n = _int(number_times)
+    if n < 0:
+        raise ExcelError('#VALUE!')
+    return _text(text) * n
+
+
+FUNCTIONS = {
+    'SUM': fn_sum, 'PRODUCT': fn_product, 'AVERAGE': fn_average, 'MIN': fn_min, 'MAX': fn_max,
+    'COUNT': fn_count, 'COUNTA': fn_counta, 'COUNTBLANK': fn_countblank,
+    'ROUND': fn_round, 'ROUNDUP': fn_roundup, 'ROUNDDOWN': fn_rounddown, 'INT': fn_int,
+    'MOD': fn_mod, 'POWER': fn_power, 'SQRT': fn_sqrt, 'ABS': fn_abs, 'SIGN': fn_sign,
+    'SUMPRODUCT': fn_sumproduct,
+    'SUMIF': fn_sumif, 'SUMIFS': fn_sumifs, 'COUNTIF': fn_countif, 'COUNTIFS': fn_countifs,
+    'AVERAGEIF': fn_averageif, 'AVERAGEIFS': fn_averageifs, 'MAXIFS': fn_maxifs, 'MINIFS': fn_minifs,
+    'IF': fn_if, 'IFS': fn_ifs, 'IFERROR': fn_iferror, 'IFNA': fn_ifna,
+    'AND': fn_and, 'OR': fn_or, 'XOR': fn_xor, 'NOT': fn_not, 'TRUE': fn_true, 'FALSE': fn_false,
+    'CHOOSE': fn_choose,
+    'ISERROR': fn_iserror, 'ISERR': fn_iserr, 'ISNA': fn_isna, 'ISNUMBER': fn_isnumber,
+    'ISTEXT': fn_istext, 'ISLOGICAL': fn_islogical, 'ISBLANK': fn_isblank, 'NA': fn_na,
+    'MATCH': fn_match, 'VLOOKUP': fn_vlookup, 'HLOOKUP': fn_hlookup, 'XLOOKUP': fn_xlookup,
+    'INDEX': fn_index,
+    'CONCATENATE': fn_concatenate, 'CONCAT': fn_concat, 'TEXTJOIN': fn_textjoin,
+    'LEN': fn_len, 'LEFT': fn_left, 'RIGHT': fn_right, 'MID': fn_mid,
+    'UPPER': fn_upper, 'LOWER': fn_lower, 'TRIM': fn_trim, 'VALUE': fn_value,
+    'EXACT': fn_exact, 'SUBSTITUTE': fn_substitute, 'REPT': fn_rept,
+}
+
+# Functions that read the position of their reference argument, not its values
+REFERENCE_FUNCTIONS = ('ROW', 'COLUMN', 'ROWS', 'COLUMNS')
+
+
+# --- Engine ---
+
+class Formula:
+    """A parsed cell formula and the cells and ranges it reads"""
+    
+    __slots__ = ('text', 'ast', 'refs')
+    
+    def __init__(self, text, ast, refs):
+        self.text = text
+        self.ast = ast
+        self.refs = refs  # [(sheet, r1, c1, r2, c2)]
+
+
+def _normalize(value):
+    """Store numbers as floats so values compare by type and value"""
+    if isinstance(value, int) and not isinstance(value, bool):
+        return float(value)
+    return value
+
+
+class FormulaEngine:
+    """
+    Cell values and formulas of a workbook with a dependency graph
+    
+    Cells are keyed by (sheet index, row, column), 1-based. Edit cells with
+    set_value() and set_formula(), then call recalculate() to evaluate the
+    edited formulas and every formula that depends on an edited cell.
+    Formulas the engine cannot evaluate are collected in unsupported.
+    """
+    
+    def __init__(self, sheet_names, defined_names=None):
+        self.sheet_names = list(sheet_names)
+        self._sheet_lookup = {name.casefold(): i for i, name in enumerate(self.sheet_names)}
+        self._names = defined_names or {}  # (name casefold, sheet or None) -> formula text
+        self.values = {}
+        self.formulas = {}  # key -> Formula, or None when unsupported
+        self.unsupported = {}  # key -> reason
+        self._bounds = [[0, 0] for _ in self.sheet_names]
+        self._cell_deps = {}  # cell key -> formula keys reading it
+        self._range_deps = {}  # (sheet, column) -> [(r1, r2, formula key)]
+        self._wide_deps = {}  # sheet -> [(r1, c1, r2, c2, formula key)]
+        self._formula_rows = {}  # sheet -> {column: sorted formula rows}
+        self._unparsed = {}  # key -> formula text loaded but not parsed yet
+        self._dirty = set()
+        self._changed = set()
+    
+    # Lookups used by the parser
+    
+    def sheet_index(self, name):
+        return self._sheet_lookup.get(name.casefold())
+    
+    def defined_name(self, name, sheet):
+        name = name.casefold()
+        local = self._names.get((name, sheet))
+        return local if local is not None else self._names.get((name, None))
+    
+    def references(self, sheet, text, depth=0):
+        """
+        List the ranges a formula reads without parsing it for evaluation
+        
+        Works for formulas the engine cannot evaluate; defined names are
+        followed, unknown names and sheets are skipped.
+        
+        Returns:
+            [(sheet index, r1, c1, r2, c2)]
+        """
+        refs = []
+        try:
+            for token in _tokenize(text):
+                if token.lastgroup == 'ref':
+                    ref_sheet = sheet
+                    if token.group('sheet'):
+                        ref_sheet = self.sheet_index(_unquote_sheet(token.group('sheet')))
+                    if ref_sheet is not None:
+                        refs.append((ref_sheet,) + _parse_area(token.group('area')))
+                elif token.lastgroup == 'name' and depth < 20:
+                    name_sheet = sheet
+                    name = token.group()
+                    if '!' in name:
+                        prefix, _, name = name.rpartition('!')
+                        name_sheet = self.sheet_index(_unquote_sheet(prefix + '!'))
+                    definition = self.defined_name(name, name_sheet)
+                    if definition is not None:
+                        refs.extend(self.references(name_sheet, definition, depth + 1))
+        except UnsupportedFormula:
+            pass
+        return refs
+    
+    # Editing
+    
+    def key(self, sheet, ref):
+        """Convert a sheet name and an 'A1' reference to a cell key"""
+        index = self.sheet_index(sheet)
+        if index is None:
+            raise KeyError(f'No sheet named {sheet}')
+        r1, c1, _, _ = _parse_area(ref)
+        return index, r1, c1
+    
+    def get_value(self, sheet, ref):
+        return self.values.get(self.key(sheet, ref))
+    
+    def set_value(self, sheet, ref, value):
+        """Set a constant, replacing any formula; None clears the cell"""
+        key = self.key(sheet, ref)
+        self._parse_loaded()
+        self._remove_formula(key)
+        if value is None:
+            self.values.pop(key, None)
+        else:
+            self.values[key] = _normalize(value)
+            self._grow(key)
+        self._changed.add(key)
+    
+    def set_formula(self, sheet, ref, text):
+        """Set the formula of a cell, with or without the leading '='"""
+        key = self.key(sheet, ref)
+        self._parse_loaded()
+        self._add_formula(key, text[1:] if text.startswith('=') else text)
+        self._dirty.add(key)
+    
+    def _grow(self, key):
+        bounds = self._bounds[key[0]]
+        bounds[0] = max(bounds[0], key[1])
+        bounds[1] = max(bounds[1], key[2])
+    
+    def _parse_loaded(self):
+        # Formulas from a file are parsed on first use, so runs without
+        # changes never build the dependency graph
+        loaded, self._unparsed = self._unparsed, {}
+        for key, text in loaded.items():
+            self._add_formula(key, text)
+    
+    def _add_formula(self, key, text):
+        self._remove_formula(key)
+        self._grow(key)
+        try:
+            parser = _Parser(self, key[0], text)
+            formula = Formula(text, parser.parse(), parser.refs)
+        except UnsupportedFormula as e:
+            self.formulas[key] = Formula(text, None, [])
+            self.unsupported[key] = str(e)
+            return
+        except RecursionError:
+            self.formulas[key] = Formula(text, None, [])
+            self.unsupported[key] = 'formula nested too deeply'
+            return
+        
+        self.formulas[key] = formula
+        sheet, row, col = key
+        bisect.insort(self._formula_rows.setdefault(sheet, {}).setdefault(col, []), row)
+        for ref in formula.refs:
+            self._index_ref(ref, key, add=True)
+    
+    def _remove_formula(self, key):
+        formula = self.formulas.pop(key, None)
+        if formula is None:
+            return
+        self.unsupported.pop(key, None)
+        sheet, row, col = key
+        rows = self._formula_rows.get(sheet, {}).get(col)
+        if rows:
+            i = bisect.bisect_left(rows, row)
+            if i < len(rows) and rows[i] == row:
+                del rows[i]
+        for ref in formula.refs:
+            self._index_ref(ref, key, add=False)
+    
+    def _index_ref(self, ref, key, add):
+        sheet, r1, c1, r2, c2 = ref
+        if (r2 - r1 + 1) * (c2 - c1 + 1) <= RANGE_EXPAND_LIMIT:
+            for row in range(r1, r2 + 1):
+                for col in range(c1, c2 + 1):
+                    deps = self._cell_deps.setdefault((sheet, row, col), set())
+                    if add:
+                        deps.add(key)
+                    else:
+                        deps.discard(key)
+        elif c2 - c1 < RANGE_BUCKET_COLUMNS:
+            for col in range(c1, c2 + 1):
+                bucket = self._range_deps.setdefault((sheet, col), [])
+                if add:
+                    bucket.append((r1, r2, key))
+                else:
+                    bucket[:] = [entry for entry in bucket if entry[2] != key]
+        else:
+            wide = self._wide_deps.setdefault(sheet, [])
+            if add:
+                wide.append((r1, c1, r2, c2, key))
+            else:
+                wide[:] = [entry for entry in wide if entry[4] != key]
+    
+    # Evaluation
+    
+    def _dependents(self, key):
+        """Yield the formulas that read a cell"""
+        yield from self._cell_deps.get(key, ())
+        sheet, row, col = key
+        for r1, r2, formula_key in self._range_deps.get((sheet, col), ()):
+            if r1 <= row <= r2:
+                yield formula_key
+        for r1, c1, r2, c2, formula_key in self._wide_deps.get(sheet, ()):
+            if r1 <= row <= r2 and c1 <= col <= c2:
+                yield formula_key
+    
+    def _formula_precedents(self, key, pending):
+        """Yield the pending formulas a formula reads"""
+        for sheet, r1, c1, r2, c2 in self.formulas[key].refs:
+            if r1 == r2 and c1 == c2:
+                if (sheet, r1, c1) in pending:
+                    yield (sheet, r1, c1)
+                continue
+            for col, rows in self._formula_rows.get(sheet, {}).items():
+                if c1 <= col <= c2:
+                    for row in rows[bisect.bisect_left(rows, r1):bisect.bisect_right(rows, r2)]:
+                        if (sheet, row, col) in pending:
+                            yield (sheet, row, col)
+    
+    def mark_all_dirty(self):
+        self._dirty.update(self.formulas)
+    
+    def affected(self):
+        """Return the edited formulas and all formulas depending on an edited cell"""
+        pending = {key for key in self._dirty if key in self.formulas}
+        queue = list(pending) + list(self._changed)
+        while queue:
+            for dependent in self._dependents(queue.pop()):
+                if dependent not in pending:
+                    pending.add(dependent)
+                    queue.append(dependent)
+        return pending
+    
+    def _evaluation_order(self, pending):
+        """Order pending formulas so that each comes after the formulas it reads"""
+        order = []
+        state = {}  # key -> 1 while being visited, 2 when done
+        for root in pending:
+            if root in state:
+                continue
+            state[root] = 1
+            stack = [(root, self._formula_precedents(root, pending))]
+            while stack:
+                key, precedents = stack[-1]
+                for precedent in precedents:
+                    if precedent not in state:
+                        state[precedent] = 1
+                        stack.append((precedent, self._formula_precedents(precedent, pending)))
+                        break
+                    if state[precedent] == 1:
+                        self.unsupported[precedent] = 'circular reference'
+                        self.unsupported[key] = 'circular reference'
+                else:
+                    stack.pop()
+                    state[key] = 2
+                    order.append(key)
+        return order
+    
+    def recalculate(self):
+        """
+        Evaluate every formula affected by edits since the last call
+        
+        Returns:
+            The keys of the formulas that were evaluated, in evaluation order
+        """
+        if not self._dirty and not self._changed:
+            return []
+        self._parse_loaded()
+        order = self._evaluation_order(self.affected())
+        for key in order:
+            if self.formulas[key].ast is None or key in self.unsupported:
+                continue
+            try:
+                self.values[key] = self._evaluate(key)
+            except UnsupportedFormula as e:
+                self.unsupported[key] = str(e)
+            except RecursionError:
+                self.unsupported[key] = 'formula nested too deeply'
+        self._dirty.clear()
+        self._changed.clear()
+        return order
+    
+    def _evaluate(self, key):
+        try:
+            value = self._eval(self.formulas[key].ast, key)
+        except ExcelError as e:
+            value = ExcelError(e.code)
+        value = _scalar(value)
+        if value is None or value is MISSING:
+            # A formula pointing at an empty cell shows 0
+            return 0.0
+        return _normalize(value)
+    
+    def _eval(self, node, key):
+        kind = node[0]
+        if kind in ('n', 's', 'b'):
+            return node[1]
+        if kind == 'r':
+            _, sheet, r1, c1, r2, c2 = node
+            if r1 == r2 and c1 == c2:
+                return self.values.get((sheet, r1, c1))
+            return Range(self.values, sheet, r1, c1, r2, c2, self._bounds[sheet])
+        if kind == 'op':
+            return _binary(node[1], self._argument(node[2], key), self._argument(node[3], key))
+        if kind == 'f':
+            name, args = node[1], node[2]
+            if name in REFERENCE_FUNCTIONS:
+                return self._reference_function(name, args, key)
+            values = [
+                self._range(arg) if arg[0] == 'r' else self._argument(arg, key) for arg in args
+            ]
+            try:
+                return FUNCTIONS[name](*values)
+            except TypeError:
+                raise ExcelError('#VALUE!') from None
+        if kind == 'neg':
+            value = _scalar(self._eval(node[1], key))
+            return value if isinstance(value, ExcelError) else -_num(value)
+        if kind == 'pct':
+            value = _scalar(self._eval(node[1], key))
+            return value if isinstance(value, ExcelError) else _num(value) / 100
+        if kind == 'e':
+            return ExcelError(node[1])
+        return MISSING
+    
+    def _range(self, node):
+        # Functions get references as ranges, even single cells: SUM(A1) skips
+        # text and booleans in A1 where SUM("3") and SUM(TRUE) count them
+        _, sheet, r1, c1, r2, c2 = node
+        return Range(self.values, sheet, r1, c1, r2, c2, self._bounds[sheet])
+    
+    def _argument(self, node, key):
+        # Errors are values to functions such as IFERROR and ISERROR
+        try:
+            return self._eval(node, key)
+        except ExcelError as e:
+            return ExcelError(e.code)
+    
+    def _reference_function(self, name, args, key):
+        if not args or args[0][0] == 'missing':
+            if name in ('ROWS', 'COLUMNS'):
+                raise ExcelError('#VALUE!')
+            return float(key[1] if name == 'ROW' else key[2])
+        _, _, r1, c1, r2, c2 = args[0]
+        return float({'ROW': r1, 'COLUMN': c1, 'ROWS': r2 - r1 + 1, 'COLUMNS': c2 - c1 + 1}[name])
+    
+    # Results
+    
+    def cell_name(self, key):
+        sheet, row, col = key
+        return f'{self.sheet_names[sheet]}!{column_letter(col)}{row}'
+    
+    def error_summary(self):
+        """Summarize error values with the same rules and schema as recalc()"""
+        found = []
+        for key, value in self.values.items():
+            if isinstance(value, ExcelError):
+                if value.code in EXCEL_ERRORS:
+                    found.append((key, value.code))
+            elif isinstance(value, str):
+                err = error_in_text(value)
+                if err:
+                    found.append((key, err))
+        
+        error_counts = dict.fromkeys(EXCEL_ERRORS, 0)
+        error_details = {err: [] for err in EXCEL_ERRORS}
+        for key, err in sorted(found):
+            error_counts[err] += 1
+            if len(error_details[err]) < MAX_LOCATIONS:
+                error_details[err].append(self.cell_name(key))
+        
+        def precedent_ranges(key):
+            formula = self.formulas.get(key)
+            if formula is None:
+                return ()
+            # Unparsed and unsupported formulas have no refs yet
+            return formula.refs if formula.ast is not None else self.references(key[0], formula.text)
+        
+        errors = dict(found)
+        root_causes = []
+        for key, count, complete in error_root_causes(errors, precedent_ranges):
+            record = {'cell': self.cell_name(key), 'error': errors[key], 'downstream': count}
+            if not complete:
+                record['downstream_complete'] = False
+            if key in self.formulas:
+                record['formula'] = f'={self.formulas[key].text}'
+            root_causes.append(record)
+        return build_summary(error_counts, error_details, len(self.formulas), root_causes)
+    
+    @classmethod
+    def load(cls, filename):
+        """
+        Load the values and formulas of an .xlsx file
+        
+        Formula cells keep their cached values when the file has them.
+        
+        Returns:
+            (engine, {formula key: cached value}, [sheet part names])
+        """
+        with zipfile.ZipFile(filename) as zf:
+            ns, sheets, shared_strings_part = workbook_parts(zf)
+            engine = cls([name for name, _ in sheets], read_defined_names(zf, ns))
+            shared = _read_shared_strings(zf, shared_strings_part, ns) if shared_strings_part else []
+            cached = {}
+            masters = {}  # (sheet, si) -> (text, row, col)
+            f_tag, v_tag, t_tag = f'{ns}f', f'{ns}v', f'{ns}t'
+            
+            for sheet_name, ref, cell, _ in iter_cells(zf):
+                sheet = engine.sheet_index(sheet_name)
+                _, row, col = key = (sheet,) + _parse_area(ref)[:2]
+                cell_type = cell.get('t', 'n')
+                v = cell.find(v_tag)
+                text = v.text if v is not None else None
+                
+                if cell_type == 'inlineStr':
+                    value = ''.join(t.text or '' for t in cell.iter(t_tag))
+                elif text is None:
+                    value = None
+                elif cell_type == 'n':
+                    value = float(text)
+                elif cell_type == 's':
+                    value = shared[int(text)]
+                elif cell_type == 'b':
+                    value = text == '1'
+                elif cell_type == 'e':
+                    value = ExcelError(text)
+                else:
+                    value = text
+                
+                f = cell.find(f_tag)
+                if f is None:
+                    if value is not None:
+                        engine.values[key] = value
+                        engine._grow(key)
+                    continue
+                
+                formula_type = f.get('t')
+                formula_text = f.text
+                if formula_type == 'shared':
+                    si = (sheet, f.get('si'))
+                    if formula_text:
+                        masters[si] = (formula_text, row, col)
+                    elif si in masters:
+                        master_text, master_row, master_col = masters[si]
+                        formula_text = translate_formula(master_text, row - master_row, col - master_col)
+                
+                if formula_type in ('array', 'dataTable') or formula_text is None:
+                    engine.formulas[key] = Formula(formula_text or '', None, [])
+                    engine.unsupported[key] = f'{formula_type or "shared"} formula'
+                else:
+                    engine.formulas[key] = Formula(formula_text, None, [])
+                    engine._unparsed[key] = formula_text
+                if value is not None:
+                    engine.values[key] = value
+                    cached[key] = value
+        
+        return engine, cached, [part for _, part in sheets]
+
+
+def read_defined_names(zf, ns):
+    """Map (name casefold, local sheet index or None) to the formula text of each defined name"""
+    workbook = ElementTree.fromstring(zf.read('xl/workbook.xml'))
+    defined_names = {}
+    for defined in workbook.iter(f'{ns}definedName'):
+        if defined.text and not defined.get('name', '').startswith('_xlnm.'):
+            local = defined.get('localSheetId')
+            sheet = int(local) if local is not None else None
+            defined_names[(defined.get('name').casefold(), sheet)] = defined.text
+    return defined_names
+
+
+def _read_shared_strings(zf, part_name, ns):
+    """Read the full shared string table"""
+    strings = []
+    with zf.open(part_name) as f:
+        root = None
+        for event, elem in ElementTree.iterparse(f, events=('start', 'end')):
+            if event == 'start':
+                if root is None:
+                    root = elem
+                continue
+            if elem.tag == f'{ns}si':
+                strings.append(''.join(t.text or '' for t in elem.iter(f'{ns}t')))
+                root.remove(elem)
+    return strings
+
+
+# --- Writing cached values ---
+
+CELL_RE = re.compile(r'<(?P<p>(?:\w+:)?)c\b(?P<attrs>[^>]*?)(?:/>|>(?P<body>.*?)</(?P=p)c>)', re.S)
+REF_ATTR_RE = re.compile(r'\sr="([A-Za-z]+[0-9]+)"')
+TYPE_ATTR_RE = re.compile(r'\st="[^"]*"')
+VALUE_RE = re.compile(r'<(?:\w+:)?v>.*?</(?:\w+:)?v>|<(?:\w+:)?v/>', re.S)
+
+
+def _cell_xml_value(value):
+    """Return (t attribute or None, <v> text) for a computed value"""
+    if isinstance(value, bool):
+        return 'b', '1' if value else '0'
+    if isinstance(value, ExcelError):
+        return 'e', value.code
+    if isinstance(value, str):
+        return 'str', value
+    if float(value).is_integer() and abs(value) < 1e15:
+        return None, str(int(value))
+    return None, repr(float(value))
+
+
+def write_cached_values(filename, updates):
+    """
+    Store computed formula results as cached values in an .xlsx file
+    
+    Args:
+        filename: Path to the workbook, replaced atomically
+        updates: {sheet part name: {'A1': value}}
+    
+    Returns:
+        Number of cells written; cells missing from the sheet XML are skipped
+    """
+    written = 0
+    with zipfile.ZipFile(filename) as src:
+        new_parts = {}
+        for part_name, cells in updates.items():
+            def replace(m):
+                nonlocal written
+                ref = REF_ATTR_RE.search(m.group('attrs'))
+                if not ref or ref.group(1) not in cells:
+                    return m.group(0)
+                cell_type, text = _cell_xml_value(cells[ref.group(1)])
+                prefix = m.group('p')
+                attrs = TYPE_ATTR_RE.sub('', m.group('attrs'))
+                if cell_type:
+                    attrs += f' t="{cell_type}"'
+                body = VALUE_RE.sub('', m.group('body') or '')
+                v = f'<{prefix}v>{escape(text)}</{prefix}v>'
+                ext = body.find(f'<{prefix}extLst')
+                body = body + v if ext < 0 else body[:ext] + v + body[ext:]
+                written += 1
+                return f'<{prefix}c{attrs}>{body}</{prefix}c>'
+            
+            xml = src.read(part_name).decode('utf-8')
+            new_parts[part_name] = CELL_RE.sub(replace, xml).encode('utf-8')
+        
+        fd, tmp_path = tempfile.mkstemp(dir=Path(filename).absolute().parent, suffix='.tmp')
+        try:
+            with open(fd, 'wb') as f, zipfile.ZipFile(f, 'w') as dst:
+                for info in src.infolist():
+                    dst.writestr(info, new_parts.get(info.filename) or src.read(info))
+        except BaseException:
+            os.remove(tmp_path)
+            raise
+    os.replace(tmp_path, filename)
+    return written
+
+
+# --- State between runs ---
+
+def default_state_dir():
+    """Return the directory holding per-workbook evaluation state"""
+    base = os.environ.get('XDG_CACHE_HOME') or Path.home() / '.cache'
+    return Path(base) / 'xlsx-skill' / 'formulas'
+
+
+def _state_path(filename, state_dir):
+    digest = hashlib.blake2b(str(Path(filename).absolute()).encode(), digest_size=16)
+    return state_dir / f'{digest.hexdigest()}.json'
+
+
+def _encode(value):
+    return {'e': value.code} if isinstance(value, ExcelError) else value
+
+
+def _decode(value):
+    return ExcelError(value['e']) if isinstance(value, dict) else value
+
+
+def _cell_contents(engine):
+    """Map cell keys to [kind, content] for every value and formula cell"""
+    contents = {key: ['v', _encode(value)] for key, value in engine.values.items()}
+    for key, formula in engine.formulas.items():
+        contents[key] = ['f', formula.text]
+    return contents
+
+
+def _defined_names_state(engine):
+    # JSON has no tuple keys, so store [name, local sheet, formula] rows
+    return sorted([name, sheet, text] for (name, sheet), text in engine._names.items())
+
+
+def apply_state(engine, state):
+    """
+    Mark what changed since the state was saved and restore unchanged results
+    
+    Cells whose value or formula differs from the state are edits. Formulas
+    that did not change take their last computed value when the file has no
+    cached value for them; everything else is evaluated again. If the sheet
+    list or any defined name changed, every formula is evaluated again.
+    
+    Returns:
+        True if any cell differs from the state
+    """
+    # A renamed sheet or repointed name can change any formula
+    if state.get('sheets') != engine.sheet_names or state.get('names') != _defined_names_state(engine):
+        engine.mark_all_dirty()
+        return True
+    saved = {tuple(cell[:3]): cell[3:] for cell in state['cells']}
+    contents = _cell_contents(engine)
+    changed = False
+    
+    for key, entry in contents.items():
+        previous = saved.get(key)
+        if previous is None or previous[:2] != entry:
+            changed = True
+            if entry[0] == 'f':
+                engine._dirty.add(key)
+            else:
+                engine._changed.add(key)
+        elif entry[0] == 'f' and key not in engine.values:
+            if len(previous) > 2:
+                engine.values[key] = _decode(previous[2])
+            else:
+                engine._dirty.add(key)
+    
+    # Cells that were cleared
+    for key in saved.keys() - contents.keys():
+        changed = True
+        engine._changed.add(key)
+    return changed
+
+
+def load_state(filename, state_dir=None):
+    try:
+        with open(_state_path(filename, state_dir or default_state_dir()), encoding='utf-8') as f:
+            state = json.load(f)
+    except (OSError, ValueError):
+        return None
+    return state if state.get('version') == STATE_VERSION else None
+
+
+def touch_state(filename, state_dir=None):
+    """Mark the state of a workbook as recently used"""
+    try:
+        os.utime(_state_path(filename, state_dir or default_state_dir()))
+    except OSError:
+        pass
+
+
+def save_state(filename, engine, state_dir=None):
+    """Save the cell contents and computed values of a workbook, evicting old state files"""
+    state_dir = state_dir or default_state_dir()
+    cells = []
+    for key, entry in _cell_contents(engine).items():
+        if entry[0] == 'f' and key in engine.values:
+            entry.append(_encode(engine.values[key]))
+        cells.append(list(key) + entry)
+    try:
+        state_dir.mkdir(parents=True, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=state_dir, suffix='.tmp')
+        with open(fd, 'w', encoding='utf-8') as f:
+            state = {
+                'version': STATE_VERSION,
+                'sheets': engine.sheet_names,
+                'names': _defined_names_state(engine),
+                'cells': cells
+            }
+            json.dump(state, f, ensure_ascii=False)
+        os.replace(tmp_path, _state_path(filename, state_dir))
+        
+        entries = sorted(
+            (entry.stat().st_mtime_ns, entry.stat().st_size, entry.path)
+            for entry in os.scandir(state_dir) if entry.name.endswith('.json')
+        )
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in entries:
+            if total <= STATE_MAX_BYTES:
+                break
+            os.remove(path)
+            total -= size
+    except OSError:
+        # Without state the next run evaluates every formula
+        pass
+
+
+def evaluate_workbook(filename, timeout=30, use_state=True):
+    """
+    Evaluate the formulas of an Excel file in Python, falling back to LibreOffice
+    
+    Only formulas affected by changes since the previous run are evaluated
+    (all of them on the first run or with use_state=False). The results are
+    stored as cached values in the file, like a LibreOffice recalculation.
+    
+    Args:
+        filename: Path to Excel file
+        timeout: Timeout for the LibreOffice fallback (seconds)
+        use_state: Reuse results of unchanged formulas from the previous run
+    
+    Returns:
+        dict in the recalc() schema, plus 'engine' ('python' or 'libreoffice'),
+        'evaluated' (formulas computed) or 'unsupported' (why Python was not enough)
+    """
+    if not Path(filename).exists():
+        return {'error': f'File {filename} does not exist'}
+    
+    try:
+        engine, cached, sheet_parts = FormulaEngine.load(filename)
+        state = load_state(filename) if use_state else None
+        if state is None:
+            engine.mark_all_dirty()
+            changed = True
+        else:
+            changed = apply_state(engine, state)
+        if changed:
+            engine._parse_loaded()
+        evaluated = [] if engine.unsupported else engine.recalculate()
+    except Exception as e:
+        return {'error': str(e)}
+    
+    if engine.unsupported:
+        result = recalc(filename, timeout)
+        result['engine'] = 'libreoffice'
+        result['unsupported'] = [
+            {'cell': engine.cell_name(key), 'reason': reason}
+            for key, reason in sorted(engine.unsupported.items())[:MAX_LOCATIONS]
+        ]
+        return result
+    
+    updates = {}
+    for key in engine.formulas:
+        value = engine.values.get(key)
+        previous = cached.get(key)
+        if previous is None or type(previous) is not type(value) or previous != value:
+            sheet, row, col = key
+            updates.setdefault(sheet_parts[sheet], {})[f'{column_letter(col)}{row}'] = value
+    
+    try:
+        if updates:
+            write_cached_values(filename, updates)
+    except Exception as e:
+        return {'error': str(e)}
+    if use_state and (changed or evaluated):
+        save_state(filename, engine)
+    elif use_state:
+        touch_state(filename)
+    
+    result = engine.error_summary()
+    result['engine'] = 'python'
+    result['evaluated'] = len(evaluated)
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description='Evaluate the formulas of an Excel file in Python, falling back to LibreOffice '
+                    'for unsupported functions. Prints the same JSON as recalc.py.'
+    )
+    parser.add_argument('file', help='Excel file (.xlsx)')
+    parser.add_argument('timeout', nargs='?', type=int, default=30,
+                        help='Timeout for the LibreOffice fallback in seconds (default: 30)')
+    parser.add_argument('--no-state', action='store_true',
+                        help='Evaluate every formula instead of only those affected by changes')
+    args = parser.parse_args()
+    
+    result = evaluate_workbook(args.file, args.timeout, use_state=not args.no_state)
+    print(json.dumps(result, indent=2))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,52 @@
+import unittest
+from formulas import ExcelError, FormulaEngine
+
+
+# Currently this is not run automatically in CI; it's just for documentation and manual checking.
+class TestReferenceArguments(unittest.TestCase):
+    
+    def setUp(self):
+        """A1 = 1, A2 = 'n/a', A3 = TRUE, A4 = =IF(A1>0,""), A5 = '3'"""
+        self.engine = FormulaEngine(['S'])
+        self.engine.set_value('S', 'A1', 1)
+        self.engine.set_value('S', 'A2', 'n/a')
+        self.engine.set_value('S', 'A3', True)
+        self.engine.set_formula('S', 'A4', '=IF(A1>0,"")')
+        self.engine.set_value('S', 'A5', '3')
+    
+    def evaluate(self, formula):
+        self.engine.set_formula('S', 'B1', formula)
+        self.engine.recalculate()
+        return self.engine.get_value('S', 'B1')
+    
+    def test_text_cells_are_skipped(self):
+        """Aggregates ignore text in referenced cells instead of failing"""
+        self.assertEqual(self.evaluate('=SUM(A1,A2)'), 1)
+        self.assertEqual(self.evaluate('=SUM(A1,A4)'), 1)
+        self.assertEqual(self.evaluate('=MAX(A1,A4)'), 1)
+        self.assertEqual(self.evaluate('=AVERAGE(A1,A2,A4)'), 1)
+        self.assertEqual(self.evaluate('=PRODUCT(A1,A2)'), 1)
+    
+    def test_referenced_booleans_and_numeric_text_are_skipped(self):
+        """TRUE and '3' count when typed as arguments but not when referenced"""
+        self.assertEqual(self.evaluate('=SUM(A3)'), 0)
+        self.assertEqual(self.evaluate('=SUM(A5)'), 0)
+        self.assertEqual(self.evaluate('=COUNT(A2,A5)'), 0)
+        self.assertEqual(self.evaluate('=SUM(TRUE,"3")'), 4)
+        self.assertEqual(self.evaluate('=COUNT(1,"3")'), 2)
+    
+    def test_operators_use_cell_values(self):
+        """Operators still coerce referenced values"""
+        self.assertEqual(self.evaluate('=A1+A5'), 4)
+        self.assertEqual(self.evaluate('=A3+1'), 2)
+        self.assertEqual(self.evaluate('=A1+A2'), ExcelError('#VALUE!'))
+    
+    def test_referenced_errors_propagate(self):
+        """An error in a referenced cell is the result of SUM"""
+        self.engine.set_formula('S', 'A6', '=1/0')
+        self.assertEqual(self.evaluate('=SUM(A1,A6)'), ExcelError('#DIV/0!'))
+        self.assertEqual(self.evaluate('=IFERROR(A6,0)'), 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -2,15 +2,50 @@
 """
 Excel Formula Recalculation Script
 Recalculates all formulas in an Excel file using LibreOffice
+
+Batch mode recalculates many workbooks through long-lived LibreOffice
+instances driven over UNO, writing one JSON line per workbook:
+    python recalc.py --batch models/ extra.xlsx --instances 4 > results.ndjson
 """
 
+import argparse
+import bisect
 import json
+import queue
+import shutil
 import sys
 import subprocess
 import os
 import platform
+import posixpath
+import tempfile
+import threading
+import time
+import zipfile
 from pathlib import Path
-from openpyxl import load_workbook
+from xml.etree import ElementTree
+
+EXCEL_ERRORS = ['#VALUE!', '#DIV/0!', '#REF!', '#NAME?', '#NULL!', '#NUM!', '#N/A']
+MAX_LOCATIONS = 20  # Locations listed per error type
+
+# Root cause analysis keeps the formula of every error cell, so it is skipped
+# for workbooks with more error cells (plus shared formulas) than this
+ROOT_CAUSE_MAX_CELLS = 50000
+# Dependency lookups spent counting the error cells downstream of origins
+ROOT_CAUSE_MAX_STEPS = 1000000
+# Ranges with at most this many cells are indexed cell by cell for dependency lookups
+RANGE_EXPAND_LIMIT = 64
+# Ranges at most this many columns wide are indexed per column
+RANGE_BUCKET_COLUMNS = 16
+# Rows in a worksheet, the leaves of the segment trees indexing tall ranges
+SEGMENT_LEAVES = 1 << 20
+
+REL_NS = '{http://schemas.openxmlformats.org/officeDocument/2006/relationships}'
+PKG_REL_NS = '{http://schemas.openxmlformats.org/package/2006/relationships}'
+
+WORKBOOK_SUFFIXES = ('.xlsx', '.xlsm')
+DEFAULT_INSTANCES = min(4, os.cpu_count() or 1)
+STARTUP_TIMEOUT = 60  # Seconds to wait for a LibreOffice instance to accept connections
 
 
 def setup_libreoffice_macro():
@@ -50,20 +85,34 @@ def setup_libreoffice_macro():
         return False
 
 
-def recalc(filename, timeout=30):
+def recalc(filename, timeout=30, force=False):
     """
     Recalculate formulas in Excel file and report any errors
     
+    Workbooks whose cached values are already current (e.g. saved by Excel or
+    recalculated before) are only scanned, unless force is set.
+    
     Args:
         filename: Path to Excel file
         timeout: Maximum time to wait for recalculation (seconds)
+        force: Recalculate even if the cached values are current
     
     Returns:
-        dict with error locations and counts
+        dict with error locations and counts, and whether LibreOffice recalculated
     """
     if not Path(filename).exists():
         return {'error': f'File {filename} does not exist'}
     
+    if not force:
+        try:
+            result = scan_workbook(filename, require_current=True)
+        except Exception:
+            # Let LibreOffice deal with files the scan cannot read
+            result = None
+        if result is not None:
+            result['recalculated'] = False
+            return result
+    
     abs_path = str(Path(filename).absolute())
     
     if not setup_libreoffice_macro():
@@ -100,77 +149,842 @@ def recalc(filename, timeout=30):
     
     # Check for Excel errors in the recalculated file - scan ALL cells
     try:
-        wb = load_workbook(filename, data_only=True)
-        
-        excel_errors = ['#VALUE!', '#DIV/0!', '#REF!', '#NAME?', '#NULL!', '#NUM!', '#N/A']
-        error_details = {err: [] for err in excel_errors}
-        total_errors = 0
+        result = scan_workbook(filename)
+    except Exception as e:
+        return {'error': str(e)}
+    result['recalculated'] = True
+    return result
+
+
+def _read_rels(zf, part_name):
+    """Map relationship ids of a part to (type, target part name)"""
+    directory, file_name = posixpath.split(part_name)
+    try:
+        rels = ElementTree.fromstring(zf.read(f'{directory}/_rels/{file_name}.rels'))
+    except KeyError:
+        return {}
+    
+    result = {}
+    for rel in rels.iter(f'{PKG_REL_NS}Relationship'):
+        target = rel.get('Target', '')
+        if target.startswith('/'):
+            target = target.lstrip('/')
+        else:
+            target = posixpath.normpath(posixpath.join(directory, target))
+        result[rel.get('Id')] = (rel.get('Type', ''), target)
+    return result
+
+
+def workbook_parts(zf):
+    """
+    Find the worksheets and shared string table of a workbook package
+    
+    Returns:
+        (namespace, [(sheet name, sheet part name)], shared strings part name or None)
+    """
+    workbook = ElementTree.fromstring(zf.read('xl/workbook.xml'))
+    # Transitional and strict files use different namespaces
+    ns = workbook.tag[:workbook.tag.index('}') + 1]
+    rels = _read_rels(zf, 'xl/workbook.xml')
+    
+    sheets = []
+    for sheet in workbook.iter(f'{ns}sheet'):
+        rel_type, target = rels.get(sheet.get(f'{REL_NS}id'), ('', ''))
+        # Chartsheets and dialog sheets have no cells
+        if rel_type.endswith('/worksheet'):
+            sheets.append((sheet.get('name'), target))
+    
+    shared_strings = next(
+        (target for rel_type, target in rels.values() if rel_type.endswith('/sharedStrings')),
+        None
+    )
+    return ns, sheets, shared_strings
+
+
+def error_in_text(text):
+    """Return the first error value contained in a text value, or None"""
+    if text and '#' in text:
+        for err in EXCEL_ERRORS:
+            if err in text:
+                return err
+    return None
+
+
+def _scan_shared_strings(zf, part_name, ns):
+    """Map indices of shared strings that contain an error value to that error"""
+    errors = {}
+    with zf.open(part_name) as f:
+        root = None
+        index = 0
+        for event, elem in ElementTree.iterparse(f, events=('start', 'end')):
+            if event == 'start':
+                if root is None:
+                    root = elem
+                continue
+            if elem.tag == f'{ns}si':
+                err = error_in_text(''.join(t.text or '' for t in elem.iter(f'{ns}t')))
+                if err:
+                    errors[index] = err
+                index += 1
+                root.remove(elem)
+    return errors
+
+
+def column_letter(col):
+    """Convert a 1-based column number to letters"""
+    letters = ''
+    while col:
+        col, rem = divmod(col - 1, 26)
+        letters = chr(65 + rem) + letters
+    return letters
+
+
+def column_number(letters):
+    """Convert column letters to a 1-based column number"""
+    col = 0
+    for ch in letters:
+        col = col * 26 + ord(ch) - 64
+    return col
+
+
+def iter_cells(zf):
+    """
+    Stream the cells of every worksheet in an open .xlsx package
+    
+    Sheets are read with iterparse one row at a time and each row is discarded
+    once processed, so memory stays constant regardless of workbook size.
+    
+    Yields:
+        (sheet name, cell reference, cell element, namespace) in sheet and row order;
+        the element is only valid until the next cell is requested
+    """
+    ns, sheets, _ = workbook_parts(zf)
+    row_tag, c_tag = f'{ns}row', f'{ns}c'
+    
+    for sheet_name, part_name in sheets:
+        with zf.open(part_name) as f:
+            sheet_data = None
+            row_num = 0
+            for event, elem in ElementTree.iterparse(f, events=('start', 'end')):
+                if event == 'start':
+                    if elem.tag == f'{ns}sheetData':
+                        sheet_data = elem
+                    continue
+                if elem.tag != row_tag:
+                    continue
+                
+                # Row and cell references are optional and default to the next position
+                row_num = int(elem.get('r') or row_num + 1)
+                col_num = 0
+                for cell in elem.iter(c_tag):
+                    ref = cell.get('r')
+                    if ref:
+                        col_num = column_number(ref.rstrip('0123456789'))
+                    else:
+                        col_num += 1
+                        ref = f'{column_letter(col_num)}{row_num}'
+                    yield sheet_name, ref, cell, ns
+                
+                elem.clear()
+                if sheet_data is not None:
+                    sheet_data.remove(elem)
+
+
+def build_summary(error_counts, error_details, formula_count, root_causes=None):
+    """
+    Build the recalc() result from error counts and locations
+    
+    Args:
+        error_counts: Error value -> number of cells holding it
+        error_details: Error value -> first MAX_LOCATIONS cell locations
+        formula_count: Number of formula cells
+        root_causes: Origin records from error_root_causes(), largest impact first
+    
+    Returns:
+        dict with status, total_errors, error_summary and total_formulas, plus
+        root_causes and total_root_causes when there are errors
+    """
+    total_errors = sum(error_counts.values())
+    
+    # Build result summary
+    result = {
+        'status': 'success' if total_errors == 0 else 'errors_found',
+        'total_errors': total_errors,
+        'error_summary': {}
+    }
+    
+    # Add non-empty error categories
+    for err_type, locations in error_details.items():
+        if locations:
+            result['error_summary'][err_type] = {
+                'count': error_counts[err_type],
+                'locations': locations  # Show up to MAX_LOCATIONS locations
+            }
+    
+    result['total_formulas'] = formula_count
+    
+    if root_causes:
+        result['total_root_causes'] = len(root_causes)
+        result['root_causes'] = root_causes[:MAX_LOCATIONS]
+    
+    return result
+
+
+def _row_segments(r1, r2):
+    """Return the nodes of a bottom-up segment tree over rows that exactly cover r1..r2"""
+    nodes = []
+    lo, hi = r1 - 1 + SEGMENT_LEAVES, r2 + SEGMENT_LEAVES
+    while lo < hi:
+        if lo & 1:
+            nodes.append(lo)
+            lo += 1
+        if hi & 1:
+            hi -= 1
+            nodes.append(hi)
+        lo >>= 1
+        hi >>= 1
+    return nodes
+
+
+def error_root_causes(errors, precedent_ranges):
+    """
+    Collapse error cells into the cells their errors originate from
+    
+    Errors propagate: one #REF! can turn thousands of dependent cells into
+    errors. An origin is an error cell that reads no other error cell, so
+    fixing the origins fixes everything downstream of them. Error cells caught
+    in a reference cycle with no origin are reported through their first cell.
+    
+    Dependents are indexed per range rather than per cell, and counting the
+    cells downstream of each origin stops after ROOT_CAUSE_MAX_STEPS lookups;
+    counts cut short are lower bounds.
+    
+    Args:
+        errors: (sheet index, row, col) -> error value, for every error cell
+        precedent_ranges: Function returning the (sheet index, r1, c1, r2, c2)
+            ranges read by the formula of an error cell
+    
+    Returns:
+        [(cell, downstream, complete)] for every origin, where downstream is the
+        number of other error cells depending on it, largest first
+    """
+    # Sorted error rows per column, for finding the error cells inside a range
+    rows_by_column = {}
+    for sheet, row, col in errors:
+        rows_by_column.setdefault((sheet, col), []).append(row)
+    columns_by_sheet = {}
+    for (sheet, col), rows in rows_by_column.items():
+        rows.sort()
+        columns_by_sheet.setdefault(sheet, []).append(col)
+    for cols in columns_by_sheet.values():
+        cols.sort()
+    
+    def reads_error(cell, sheet, r1, c1, r2, c2):
+        cols = columns_by_sheet.get(sheet, ())
+        for col in cols[bisect.bisect_left(cols, c1):bisect.bisect_right(cols, c2)]:
+            rows = rows_by_column[(sheet, col)]
+            found = bisect.bisect_right(rows, r2) - bisect.bisect_left(rows, r1)
+            # A formula reading its own cell is a cycle, not a precedent
+            if (sheet, col) == (cell[0], cell[2]) and r1 <= cell[1] <= r2:
+                found -= 1
+            if found:
+                return True
+        return False
+    
+    # Reverse index of the error cells reading each cell: small ranges per
+    # cell, taller ranges per column in a segment tree over rows, and ranges
+    # too wide to index per column
+    cell_deps = {}
+    column_deps = {}  # (sheet, col) -> {segment tree node: [dependent cells]}
+    wide_deps = {}
+    origins = []
+    for cell in sorted(errors):
+        ranges = list(precedent_ranges(cell))
+        if not any(reads_error(cell, *ref) for ref in ranges):
+            origins.append(cell)
+        for sheet, r1, c1, r2, c2 in ranges:
+            if (r2 - r1 + 1) * (c2 - c1 + 1) <= RANGE_EXPAND_LIMIT:
+                for row in range(r1, r2 + 1):
+                    for col in range(c1, c2 + 1):
+                        cell_deps.setdefault((sheet, row, col), []).append(cell)
+            elif c2 - c1 < RANGE_BUCKET_COLUMNS:
+                nodes = _row_segments(r1, r2)
+                for col in range(c1, c2 + 1):
+                    tree = column_deps.setdefault((sheet, col), {})
+                    for node in nodes:
+                        tree.setdefault(node, []).append(cell)
+            else:
+                wide_deps.setdefault(sheet, []).append((r1, c1, r2, c2, cell))
+    
+    steps = 0
+    
+    def walk(origin, reached):
+        # Returns the number of cells newly reached, and False if cut short
+        nonlocal steps
+        count = 0
+        # Every range stored at a node contains the rows below it, so once a
+        # node has been read its cells are reached for the rest of this walk
+        consumed = set()
+        stack = [origin]
+        while stack:
+            sheet, row, col = cell = stack.pop()
+            dependents = list(cell_deps.get(cell, ()))
+            tree = column_deps.get((sheet, col))
+            if tree:
+                node = row - 1 + SEGMENT_LEAVES
+                while node:
+                    if node in tree and (sheet, col, node) not in consumed:
+                        consumed.add((sheet, col, node))
+                        dependents.extend(tree[node])
+                    node >>= 1
+            for r1, c1, r2, c2, dep in wide_deps.get(sheet, ()):
+                if r1 <= row <= r2 and c1 <= col <= c2:
+                    dependents.append(dep)
+            steps += len(dependents) + len(wide_deps.get(sheet, ())) + 1
+            
+            for dependent in dependents:
+                if dependent not in reached:
+                    reached.add(dependent)
+                    stack.append(dependent)
+                    count += 1
+            if steps > ROOT_CAUSE_MAX_STEPS:
+                return count, False
+        return count, True
+    
+    # Origins may share downstream cells, so each one is walked separately
+    result = []
+    covered = set(origins)
+    complete = True
+    for origin in origins:
+        reached = {origin}
+        count, complete_walk = walk(origin, reached) if complete else (0, False)
+        complete = complete and complete_walk
+        result.append((origin, count, complete_walk))
+        covered |= reached
+    
+    # Whatever no origin reaches is part of an error cycle; only known when
+    # every walk finished
+    if complete:
+        for cell in sorted(errors.keys() - covered):
+            if cell not in covered:
+                covered.add(cell)
+                count, complete_walk = walk(cell, covered)
+                result.append((cell, count, complete_walk))
+    
+    result.sort(key=lambda item: -item[1])
+    return result
+
+
+def _scan_root_causes(zf, ns, sheet_names, error_cells, shared_masters):
+    """
+    Find the origins of the error cells found by scan_workbook()
+    
+    Returns:
+        list of {'cell', 'error', 'downstream', 'formula'} records, largest impact
+        first; 'downstream_complete' is False where the count is a lower bound
+    """
+    from formulas import FormulaEngine, read_defined_names, translate_formula
+    
+    engine = FormulaEngine(sheet_names, read_defined_names(zf, ns))
+    formulas = {}
+    for cell, (_, text, shared_index) in error_cells.items():
+        if text is None and shared_index is not None and shared_index in shared_masters:
+            master_text, master_row, master_col = shared_masters[shared_index]
+            text = translate_formula(master_text, cell[1] - master_row, cell[2] - master_col)
+        if text is not None:
+            formulas[cell] = text
+    
+    def precedent_ranges(cell):
+        text = formulas.get(cell)
+        return engine.references(cell[0], text) if text is not None else ()
+    
+    errors = {cell: err for cell, (err, _, _) in error_cells.items()}
+    root_causes = []
+    for cell, count, complete in error_root_causes(errors, precedent_ranges):
+        sheet, row, col = cell
+        record = {
+            'cell': f'{sheet_names[sheet]}!{column_letter(col)}{row}',
+            'error': errors[cell],
+            'downstream': count
+        }
+        if not complete:
+            record['downstream_complete'] = False
+        if cell in formulas:
+            record['formula'] = f'={formulas[cell]}'
+        root_causes.append(record)
+    return root_causes
+
+
+def _calc_settings_stale(zf):
+    """
+    Check the workbook calculation settings for a pending recalculation
+    
+    Returns:
+        (True if the cached values must not be trusted, {sheet name: sheetId})
+    """
+    workbook = ElementTree.fromstring(zf.read('xl/workbook.xml'))
+    ns = workbook.tag[:workbook.tag.index('}') + 1]
+    sheet_ids = {sheet.get('name'): sheet.get('sheetId') for sheet in workbook.iter(f'{ns}sheet')}
+    
+    calc_pr = workbook.find(f'{ns}calcPr')
+    if calc_pr is None:
+        return False, sheet_ids
+    # Writers that leave values stale (openpyxl among them) ask for a full
+    # calculation on load; manual mode may have skipped recalculating edits
+    stale = (
+        calc_pr.get('fullCalcOnLoad') in ('1', 'true')
+        or calc_pr.get('calcMode') == 'manual'
+    )
+    return stale, sheet_ids
+
+
+def _cell_digest(sheet_id, ref):
+    return hash((sheet_id, ref)) & 0xFFFFFFFFFFFFFFFF
+
+
+def _calc_chain_digest(zf):
+    """
+    Summarize calcChain.xml as (cell count, order-independent digest of its cells)
+    
+    Returns None when the workbook has no calculation chain.
+    """
+    try:
+        f = zf.open('xl/calcChain.xml')
+    except KeyError:
+        return None
+    
+    count = digest = 0
+    sheet_id = None
+    with f:
+        for _, elem in ElementTree.iterparse(f):
+            if elem.tag.endswith('}c'):
+                # Cells without i belong to the sheet of the previous entry
+                sheet_id = elem.get('i', sheet_id)
+                count += 1
+                digest = (digest + _cell_digest(sheet_id, elem.get('r'))) & 0xFFFFFFFFFFFFFFFF
+                elem.clear()
+    return count, digest
+
+
+def scan_workbook(filename, require_current=False):
+    """
+    Find error values and count formulas in one streaming pass over an .xlsx file
+    
+    Error cells are cells of type "e" with one of EXCEL_ERRORS as their value.
+    Text cells that contain an error value are reported as well; the shared
+    string table is only read if the workbook has shared string cells, and only
+    the strings containing an error value are kept.
+    
+    With require_current, the scan also checks that the cached values are up to
+    date: the workbook must not request a recalculation in its calcPr, every
+    formula cell must carry a cached value, and if there is a calcChain.xml it
+    must list exactly the formula cells (tools that edit formulas without
+    recalculating leave it out of step). The scan stops as soon as a check fails.
+    
+    Error cells are then grouped by origin (see error_root_causes()), using the
+    formulas of the error cells and the shared formulas they are based on.
+    Above ROOT_CAUSE_MAX_CELLS of those the formulas are dropped and no root
+    causes are reported, keeping the scan's memory bounded.
+    
+    Args:
+        filename: Path to Excel file
+        require_current: Return None if the workbook needs recalculation
+    
+    Returns:
+        dict with status, total_errors, error_summary and total_formulas (and
+        root causes when errors were found), or None
+    """
+    error_details = {err: [] for err in EXCEL_ERRORS}
+    error_counts = dict.fromkeys(EXCEL_ERRORS, 0)
+    formula_count = 0
+    shared_errors = None
+    error_cells = {}  # (sheet index, row, col) -> (error, formula text, shared formula key)
+    shared_masters = {}  # (sheet index, si) -> (formula text, row, col)
+    collect_formulas = True
+    
+    with zipfile.ZipFile(filename) as zf:
+        ns, sheets, shared_strings = workbook_parts(zf)
+        sheet_names = [name for name, _ in sheets]
+        sheet_index = {name: i for i, name in enumerate(sheet_names)}
         
-        for sheet_name in wb.sheetnames:
-            ws = wb[sheet_name]
-            # Check ALL rows and columns - no limits
-            for row in ws.iter_rows():
-                for cell in row:
-                    if cell.value is not None and isinstance(cell.value, str):
-                        for err in excel_errors:
-                            if err in cell.value:
-                                location = f"{sheet_name}!{cell.coordinate}"
-                                error_details[err].append(location)
-                                total_errors += 1
-                                break
+        chain = None
+        if require_current:
+            stale, sheet_ids = _calc_settings_stale(zf)
+            if stale:
+                return None
+            chain = _calc_chain_digest(zf)
+            formula_digest = 0
         
-        wb.close()
+        for sheet_name, ref, cell, ns in iter_cells(zf):
+            if collect_formulas and len(error_cells) + len(shared_masters) > ROOT_CAUSE_MAX_CELLS:
+                collect_formulas = False
+                error_cells.clear()
+                shared_masters.clear()
+            
+            f = cell.find(f'{ns}f')
+            if f is not None:
+                formula_count += 1
+                if f.get('t') == 'shared' and f.text and collect_formulas:
+                    row = int(ref.lstrip('ABCDEFGHIJKLMNOPQRSTUVWXYZ'))
+                    col = column_number(ref.rstrip('0123456789'))
+                    shared_masters[(sheet_index[sheet_name], f.get('si'))] = (f.text, row, col)
+                if require_current:
+                    if cell.find(f'{ns}v') is None:
+                        return None
+                    if chain is not None:
+                        cell_digest = _cell_digest(sheet_ids.get(sheet_name), ref)
+                        formula_digest = (formula_digest + cell_digest) & 0xFFFFFFFFFFFFFFFF
+            
+            cell_type = cell.get('t', 'n')
+            if cell_type == 'n':
+                continue
+            if cell_type == 'inlineStr':
+                text = ''.join(t.text or '' for t in cell.iter(f'{ns}t'))
+            else:
+                v = cell.find(f'{ns}v')
+                text = v.text if v is not None else None
+            
+            if cell_type == 'e':
+                err = text if text in error_counts else None
+            elif cell_type == 's':
+                if shared_errors is None:
+                    shared_errors = (
+                        _scan_shared_strings(zf, shared_strings, ns) if shared_strings else {}
+                    )
+                err = shared_errors.get(int(text)) if text else None
+            else:
+                err = error_in_text(text)
+            
+            if err:
+                error_counts[err] += 1
+                if len(error_details[err]) < MAX_LOCATIONS:
+                    error_details[err].append(f'{sheet_name}!{ref}')
+                
+                if not collect_formulas:
+                    continue
+                sheet = sheet_index[sheet_name]
+                row = int(ref.lstrip('ABCDEFGHIJKLMNOPQRSTUVWXYZ'))
+                col = column_number(ref.rstrip('0123456789'))
+                if f is None:
+                    error_cells[(sheet, row, col)] = (err, None, None)
+                elif f.get('t') == 'shared' and not f.text:
+                    error_cells[(sheet, row, col)] = (err, None, (sheet, f.get('si')))
+                else:
+                    error_cells[(sheet, row, col)] = (err, f.text, None)
         
-        # Build result summary
-        result = {
-            'status': 'success' if total_errors == 0 else 'errors_found',
-            'total_errors': total_errors,
-            'error_summary': {}
-        }
+        if chain is not None and chain != (formula_count, formula_digest):
+            return None
+        root_causes = (
+            _scan_root_causes(zf, ns, sheet_names, error_cells, shared_masters) if error_cells else None
+        )
+    
+    return build_summary(error_counts, error_details, formula_count, root_causes)
+
+
+class OfficeInstance:
+    """
+    A headless LibreOffice process recalculating workbooks over UNO
+    
+    Each instance has its own user profile and pipe name, so several can run
+    side by side. The process is started on first use and can be killed from
+    another thread to abort a call that exceeds its timeout.
+    """
+    
+    def __init__(self, index):
+        self.pipe_name = f'recalc-{os.getpid()}-{index}'
+        self.process = None
+        self.profile_dir = None
+        self.desktop = None
+        self.killed = False
+    
+    def start(self):
+        """Launch LibreOffice and connect to its desktop"""
+        import uno
+        from com.sun.star.connection import NoConnectException
         
-        # Add non-empty error categories
-        for err_type, locations in error_details.items():
-            if locations:
-                result['error_summary'][err_type] = {
-                    'count': len(locations),
-                    'locations': locations[:20]  # Show up to 20 locations
-                }
+        self.profile_dir = tempfile.mkdtemp(prefix='recalc-profile-')
+        connection = f'pipe,name={self.pipe_name};urp;StarOffice.ComponentContext'
+        self.process = subprocess.Popen(
+            [
+                'soffice', '--headless', '--invisible', '--norestore', '--nologo',
+                '--nodefault', '--nolockcheck',
+                f'-env:UserInstallation={Path(self.profile_dir).as_uri()}',
+                f'--accept={connection}'
+            ],
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL
+        )
+        self.killed = False
         
-        # Add formula count for context - also check ALL cells
-        wb_formulas = load_workbook(filename, data_only=False)
-        formula_count = 0
-        for sheet_name in wb_formulas.sheetnames:
-            ws = wb_formulas[sheet_name]
-            for row in ws.iter_rows():
-                for cell in row:
-                    if cell.value and isinstance(cell.value, str) and cell.value.startswith('='):
-                        formula_count += 1
-        wb_formulas.close()
+        local_context = uno.getComponentContext()
+        resolver = local_context.ServiceManager.createInstanceWithContext(
+            'com.sun.star.bridge.UnoUrlResolver', local_context
+        )
+        deadline = time.monotonic() + STARTUP_TIMEOUT
+        while True:
+            try:
+                context = resolver.resolve(f'uno:{connection}')
+                break
+            except NoConnectException:
+                if self.process.poll() is not None or time.monotonic() > deadline:
+                    self.stop()
+                    raise RuntimeError('LibreOffice did not start')
+                time.sleep(0.2)
         
-        result['total_formulas'] = formula_count
+        self.desktop = context.ServiceManager.createInstanceWithContext(
+            'com.sun.star.frame.Desktop', context
+        )
+    
+    def recalculate(self, path):
+        """Load a workbook, recalculate all formulas and store it in place"""
+        import uno
+        from com.sun.star.beans import PropertyValue
         
-        return result
+        hidden = PropertyValue()
+        hidden.Name = 'Hidden'
+        hidden.Value = True
+        doc = self.desktop.loadComponentFromURL(
+            uno.systemPathToFileUrl(str(Path(path).absolute())), '_blank', 0, (hidden,)
+        )
+        if doc is None:
+            raise RuntimeError('LibreOffice could not open the file')
+        try:
+            doc.calculateAll()
+            doc.store()
+        finally:
+            doc.close(True)
+    
+    def kill(self):
+        """Abort the running call by killing the process"""
+        self.killed = True
+        if self.process is not None:
+            self.process.kill()
+    
+    def stop(self):
+        """Shut LibreOffice down and remove the profile"""
+        if self.desktop is not None:
+            try:
+                self.desktop.terminate()
+            except Exception:
+                # The process may already be gone
+                pass
+            self.desktop = None
+        if self.process is not None:
+            try:
+                self.process.wait(timeout=10)
+            except subprocess.TimeoutExpired:
+                self.process.kill()
+                self.process.wait()
+            self.process = None
+        if self.profile_dir is not None:
+            shutil.rmtree(self.profile_dir, ignore_errors=True)
+            self.profile_dir = None
+
+
+def iter_workbook_paths(paths):
+    """Expand files and directories (searched recursively) into workbook paths"""
+    for path in map(Path, paths):
+        if path.is_dir():
+            for child in sorted(path.rglob('*')):
+                if (child.suffix.lower() in WORKBOOK_SUFFIXES
+                        and not child.name.startswith('~$') and child.is_file()):
+                    yield child
+        else:
+            yield path
+
+
+def recalc_with_instance(instance, path, timeout, force=False):
+    """
+    Recalculate one workbook on a LibreOffice instance and scan it for errors
+    
+    Workbooks with current cached values are only scanned unless force is set,
+    and the instance is not started for them. The instance is restarted on the
+    next call after a failure or timeout.
+    
+    Returns:
+        dict with the file name, the recalc() result fields and timings in seconds
+    """
+    record = {'file': str(path)}
+    if not path.exists():
+        record['error'] = f'File {path} does not exist'
+        return record
+    
+    start = time.monotonic()
+    if not force:
+        try:
+            result = scan_workbook(path, require_current=True)
+        except Exception:
+            result = None
+        if result is not None:
+            record.update(result)
+            record['recalculated'] = False
+            record['scan_seconds'] = record['total_seconds'] = round(time.monotonic() - start, 3)
+            return record
+    
+    try:
+        if instance.desktop is None:
+            instance.start()
+        record['startup_seconds'] = round(time.monotonic() - start, 3)
         
+        recalc_start = time.monotonic()
+        timer = threading.Timer(timeout, instance.kill)
+        timer.start()
+        try:
+            instance.recalculate(path)
+        finally:
+            timer.cancel()
+        record['recalc_seconds'] = round(time.monotonic() - recalc_start, 3)
     except Exception as e:
-        return {'error': str(e)}
+        if instance.killed:
+            record['error'] = f'Recalculation timed out after {timeout} seconds'
+        else:
+            record['error'] = f'Recalculation failed: {e}'
+        instance.stop()
+        record['total_seconds'] = round(time.monotonic() - start, 3)
+        return record
+    
+    scan_start = time.monotonic()
+    try:
+        record.update(scan_workbook(path))
+        record['recalculated'] = True
+    except Exception as e:
+        record['error'] = str(e)
+    record['scan_seconds'] = round(time.monotonic() - scan_start, 3)
+    record['total_seconds'] = round(time.monotonic() - start, 3)
+    return record
+
+
+def batch_recalc(paths, out, instances=DEFAULT_INSTANCES, timeout=120, force=False):
+    """
+    Recalculate many workbooks in parallel on long-lived LibreOffice instances
+    
+    Each instance is driven by its own thread and takes the next workbook as
+    soon as it is done with the previous one. Results are written to out as
+    newline-delimited JSON in completion order, one line per workbook.
+    
+    Args:
+        paths: Workbook paths
+        out: Text stream for the result lines
+        instances: Number of LibreOffice processes to run
+        timeout: Maximum time per workbook (seconds) before its instance is killed
+        force: Recalculate workbooks whose cached values are already current
+    
+    Returns:
+        (workbooks processed, workbooks that failed)
+    """
+    pending = queue.Queue()
+    for path in paths:
+        pending.put(path)
+    results = queue.Queue()
+    
+    def worker(index):
+        instance = OfficeInstance(index)
+        try:
+            while True:
+                try:
+                    path = pending.get_nowait()
+                except queue.Empty:
+                    return
+                results.put(recalc_with_instance(instance, path, timeout, force))
+        finally:
+            instance.stop()
+            results.put(None)
+    
+    threads = [
+        threading.Thread(target=worker, args=(index,), daemon=True)
+        for index in range(max(1, min(instances, pending.qsize())))
+    ]
+    for thread in threads:
+        thread.start()
+    
+    # Write from this thread only, so lines never interleave
+    processed = failed = 0
+    running = len(threads)
+    while running:
+        record = results.get()
+        if record is None:
+            running -= 1
+            continue
+        processed += 1
+        if 'error' in record:
+            failed += 1
+        out.write(json.dumps(record) + '\n')
+        out.flush()
+    
+    for thread in threads:
+        thread.join()
+    return processed, failed
+
+
+def batch_main(argv):
+    parser = argparse.ArgumentParser(
+        prog='recalc.py --batch',
+        description='Recalculate many workbooks over UNO and write one JSON line per workbook'
+    )
+    parser.add_argument('paths', nargs='*', help='Workbooks and directories to search for .xlsx/.xlsm files')
+    parser.add_argument('--files-from', help="File listing one workbook path per line ('-' for stdin)")
+    parser.add_argument(
+        '--instances', type=int, default=DEFAULT_INSTANCES,
+        help=f'Number of LibreOffice instances to run in parallel (default: {DEFAULT_INSTANCES})'
+    )
+    parser.add_argument('--timeout', type=int, default=120, help='Maximum seconds per workbook (default: 120)')
+    parser.add_argument('--output', default='-', help="NDJSON output file ('-' for stdout, the default)")
+    parser.add_argument('--force', action='store_true',
+                        help='Recalculate workbooks even if their cached values are current')
+    args = parser.parse_args(argv)
+    
+    try:
+        import uno  # noqa: F401
+    except ImportError:
+        print("Error: batch mode needs LibreOffice's Python UNO bridge (the 'uno' module); "
+              "run it with LibreOffice's bundled python or install python3-uno", file=sys.stderr)
+        return 1
+    
+    paths = list(args.paths)
+    if args.files_from:
+        with (sys.stdin if args.files_from == '-' else open(args.files_from)) as f:
+            paths.extend(line.strip() for line in f if line.strip())
+    workbooks = list(iter_workbook_paths(paths))
+    if not workbooks:
+        print('Error: no workbooks given', file=sys.stderr)
+        return 1
+    
+    start = time.monotonic()
+    if args.output == '-':
+        processed, failed = batch_recalc(workbooks, sys.stdout, args.instances, args.timeout, args.force)
+    else:
+        with open(args.output, 'w') as out:
+            processed, failed = batch_recalc(workbooks, out, args.instances, args.timeout, args.force)
+    print(f'Recalculated {processed} workbooks ({failed} failed) in '
+          f'{time.monotonic() - start:.1f}s', file=sys.stderr)
+    return 1 if failed else 0
 
 
 def main():
-    if len(sys.argv) < 2:
-        print("Usage: python recalc.py <excel_file> [timeout_seconds]")
+    if len(sys.argv) > 1 and sys.argv[1] == '--batch':
+        sys.exit(batch_main(sys.argv[2:]))
+    
+    args = [arg for arg in sys.argv[1:] if arg != '--force']
+    force = len(args) < len(sys.argv) - 1
+    
+    if not args:
+        print("Usage: python recalc.py <excel_file> [timeout_seconds] [--force]")
+        print("       python recalc.py --batch <files or directories...> [--instances N]")
         print("\nRecalculates all formulas in an Excel file using LibreOffice")
+        print("Workbooks whose cached values are current are only scanned unless --force is given")
         print("\nReturns JSON with error details:")
         print("  - status: 'success' or 'errors_found'")
         print("  - total_errors: Total number of Excel errors found")
         print("  - total_formulas: Number of formulas in the file")
         print("  - error_summary: Breakdown by error type with locations")
         print("    - #VALUE!, #DIV/0!, #REF!, #NAME?, #NULL!, #NUM!, #N/A")
+        print("\nBatch mode writes one such JSON object per line, with 'file' and timings")
         sys.exit(1)
     
-    filename = sys.argv[1]
-    timeout = int(sys.argv[2]) if len(sys.argv) > 2 else 30
+    filename = args[0]
+    timeout = int(args[1]) if len(args) > 1 else 30
     
-    result = recalc(filename, timeout)
+    result = recalc(filename, timeout, force)
     print(json.dumps(result, indent=2))
 
 